@@ -1,255 +1,3245 @@
+from __future__ import annotations
+
 import random
 import os
+import gzip
+import importlib
+import io
+import atexit
+import functools
+import heapq
 import json
-import subprocess
+import re
 import sys
-import tempfile
-from datetime import datetime
+import threading
+import time
+import unicodedata
+import zlib
+from array import array
+from collections import Counter
+from collections.abc import Callable, Iterable, MutableSequence, Sequence
+from typing import Iterator, NamedTuple, TextIO
+
+
+class _LazyModule:
+    """Stands in for a module (or a name in one, e.g. datetime.datetime) and imports it on first
+    attribute access. Setting attributes sets them on the real object, so tests can still
+    monkeypatch e.g. NeoAnki.questionary.select."""
+
+    def __init__(self, name: str, attr: str | None = None) -> None:
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_attr", attr)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        if self._module is None:
+            target = importlib.import_module(self._name)
+            if self._attr is not None:
+                target = getattr(target, self._attr)
+            object.__setattr__(self, "_module", target)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self._load(), attr)
+
+
+# Imported on first use, so starting up (and the CLI subcommands) only pays for what it touches.
+# Only the interactive menus need questionary (and prompt_toolkit under it).
+questionary = _LazyModule("questionary")
+argparse = _LazyModule("argparse")
+datetime = _LazyModule("datetime", "datetime")
+hashlib = _LazyModule("hashlib")
+shutil = _LazyModule("shutil")
+sqlite3 = _LazyModule("sqlite3")
+subprocess = _LazyModule("subprocess")
+tempfile = _LazyModule("tempfile")
+fcntl = _LazyModule("fcntl")
+
+BACKUP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "neoanki_backup.json")
+BACKUP_BACKUP_PATH = BACKUP_PATH + ".bak"
+# How many previous versions to keep: .bak, .bak.2, ... .bak.N (oldest). load_backup walks them in order.
+BACKUP_GENERATIONS = max(1, int(os.environ.get("NEOANKI_BACKUP_GENERATIONS", "1")))
+# Append-only journal of per-board snapshots written between full saves.
+BACKUP_JOURNAL_PATH = BACKUP_PATH + ".journal"
+# Journal is folded into the main file once it grows past this many bytes.
+JOURNAL_COMPACT_BYTES = 256 * 1024
+# Per-board summaries (row counts, preview) so list menus don't parse every table.
+BACKUP_INDEX_PATH = BACKUP_PATH + ".index"
+# Opt-in SQLite storage (NEOANKI_BACKEND=sqlite); imported from BACKUP_PATH on first use.
+BACKUP_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "neoanki_backup.sqlite3")
+# Opt-in per-board layout (NEOANKI_BACKEND=dir): manifest.json plus one file per board in boards/.
+BACKUP_DIR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "neoanki_backup.d")
+BACKUP_BACKEND = os.environ.get("NEOANKI_BACKEND", "json")
+# Encoding used when writing backup files: "pretty" (indented JSON), "compact" (minified JSON),
+# "gzip" or "zlib" (compressed minified JSON). Reading detects the encoding, so any file loads.
+BACKUP_FORMAT = os.environ.get("NEOANKI_BACKUP_FORMAT", "pretty")
+BACKUP_FORMATS = ("pretty", "compact", "gzip", "zlib")
+# What a completed save survives: "none" (process crash only; OS may still lose it on power loss),
+# "file" (fsync written data), "dir" (also fsync the directory, so renames/new files survive power loss).
+BACKUP_DURABILITY = os.environ.get("NEOANKI_DURABILITY", "dir")
+BACKUP_DURABILITY_LEVELS = ("none", "file", "dir")
+# Seconds the background save worker waits for further changes before writing a board.
+SAVE_DEBOUNCE_SECONDS = 0.3
+# Search: hits listed under the prompt while typing, and after Enter.
+SEARCH_COMPLETION_LIMIT = 10
+SEARCH_RESULT_LIMIT = 200
+# Pickers (Remove element, Edit to repeat, Delete tables): terminal lines kept free around a page of choices.
+PICKER_RESERVED_LINES = 8
+# Review table: terminal lines kept free for the menu below it, and the fewest rows ever shown.
+VIEWPORT_RESERVED_LINES = 16
+# Lines a rendered page has besides its rows: the two rules and the "Rows a-b of n" line.
+VIEWPORT_FRAME_LINES = 3
+VIEWPORT_MIN_ROWS = 5
+# Review (SM-2): cards never reviewed that one session introduces, and when a failed card is due again.
+REVIEW_NEW_CARDS = 20
+REVIEW_RELEARN_SECONDS = 600
+# Answer buttons of a review and the SM-2 quality (0-5) they stand for.
+REVIEW_GRADES = {"Again": 1, "Hard": 3, "Good": 4, "Easy": 5}
+# Weighted shuffle: weight of a card marked to repeat (others weigh 1), plus this much per lapse (capped).
+DRAW_REPEAT_WEIGHT = 4.0
+DRAW_LAPSE_WEIGHT = 1.0
+DRAW_MAX_LAPSES = 5
+# Seed for shuffles (NEOANKI_SHUFFLE_SEED): the same seed and the same steps give the same card order.
+SHUFFLE_SEED = os.environ.get("NEOANKI_SHUFFLE_SEED")
+# Append-only log of what happened to cards in Shuffle sessions, and its side index of per-card and
+# per-board totals. Events are buffered and appended this many at a time (and when leaving a session).
+EVENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "neoanki_events.log")
+EVENTS_STATS_PATH = EVENTS_PATH + ".stats"
+EVENT_BUFFER_SIZE = 64
+EVENT_OPS = ("reveal", "mark", "unmark", "add", "remove")
+
+# ANSI: bold + color for backup list titles; yellow for "to repeat"
+_BOLD_CYAN = "\033[1m\033[36m"
+_YELLOW = "\033[1;33m"
+_RESET = "\033[0m"
+
+# Table = list of pairs (word, translation). Translation can be "".
+# Loaded tables are CardStore instances, which behave like such a list.
+TableRow = tuple[str, str]
+Table = list[TableRow]
+
+# Rows shown in a board's preview in list menus.
+BOARD_PREVIEW_ITEMS = 8
+
+
+class BoardSummary(NamedTuple):
+    """What list menus show for a board, without loading its rows.
+    `version` goes up by one with every write that changes the board (see save_board)."""
+    name: str
+    rows: int
+    to_repeat: int
+    modified: float
+    preview: str
+    version: int = 0
+
+
+class CardSchedule(NamedTuple):
+    """SM-2 state of one card. `due` is a Unix time; `interval` is in days."""
+    ease: float = 2.5
+    interval: float = 0.0
+    due: float = 0.0
+    reps: int = 0
+    lapses: int = 0
+
+
+def review_card(schedule: CardSchedule | None, quality: int, now: float) -> CardSchedule:
+    """Next schedule after an answer of `quality` (0-5), following SM-2: a failed card (quality < 3)
+    starts over (due again after REVIEW_RELEARN_SECONDS, ease unchanged); otherwise the interval
+    goes 1 day, 6 days, then grows by the ease factor, which moves with the quality (minimum 1.3)."""
+    s = schedule or CardSchedule()
+    if quality < 3:
+        return CardSchedule(s.ease, 0.0, now + REVIEW_RELEARN_SECONDS, 0, s.lapses + 1)
+    reps = s.reps + 1
+    interval = 1.0 if reps == 1 else 6.0 if reps == 2 else round(s.interval * s.ease, 2)
+    ease = max(1.3, s.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return CardSchedule(round(ease, 4), interval, now + interval * 86400, reps, s.lapses)
+
+
+def _check_row(row: object) -> TableRow:
+    if not isinstance(row, (list, tuple)) or len(row) != 2:
+        raise TypeError(f"Table row must be a (word, translation) pair, got {row!r}")
+    w, t = row
+    if not isinstance(w, str) or not isinstance(t, str):
+        raise TypeError(f"Table row must hold two strings, got {row!r}")
+    return w, t
+
+
+class CardStore(MutableSequence):
+    """Table rows kept as two parallel lists of strings instead of one (word, translation) tuple per
+    row, which drops the tuple (~56 bytes) from every card; see benchmarks/bench_memory.py.
+    Rows read back as tuples and it compares equal to a list of the same tuples, so it can be used
+    wherever a Table is expected.
+
+    Every card also gets an id (card_id) that stays with it while rows move (shuffle, insert, delete),
+    so state such as RepeatSet can refer to cards rather than to their text. Assigning to a position
+    replaces the card there with a new one.
+
+    Review schedules (CardSchedule) are kept by card id as well, only for cards that have been reviewed.
+
+    shuffle() is lazy; reading a position settles the shuffle up to it (see shuffle)."""
+
+    __slots__ = ("_words", "_trans", "_ids", "_next_id", "_sched", "_draw", "_settled")
+
+    def __init__(self, rows: Iterable[TableRow] = ()) -> None:
+        # Pending lazy shuffle: (rng, sampler or None), positions below _settled are final.
+        self._draw: tuple | None = None
+        self._settled = 0
+        if isinstance(rows, CardStore):
+            rows._settle()
+            self._words = rows._words[:]
+            self._trans = rows._trans[:]
+            self._ids = array("I", rows._ids)
+            self._next_id = rows._next_id
+            self._sched = dict(rows._sched)
+            return
+        self._words: list[str] = []
+        self._trans: list[str] = []
+        self._ids = array("I")
+        self._next_id = 0
+        self._sched: dict[int, CardSchedule] = {}
+        self.extend(rows)
+
+    def _new_ids(self, count: int) -> array:
+        ids = array("I", range(self._next_id, self._next_id + count))
+        self._next_id += count
+        return ids
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def _settle(self, count: int | None = None) -> None:
+        """Finishes the lazy shuffle for positions < count (all positions if None)."""
+        if self._draw is None:
+            return
+        n = len(self._words)
+        count = n if count is None else min(count, n)
+        k = self._settled
+        if k >= count:
+            return
+        rng, sampler = self._draw
+        words, trans, ids = self._words, self._trans, self._ids
+        while k < count:
+            j = sampler.draw(rng) if sampler is not None else rng.randrange(k, n)
+            words[k], words[j] = words[j], words[k]
+            trans[k], trans[j] = trans[j], trans[k]
+            ids[k], ids[j] = ids[j], ids[k]
+            k += 1
+        self._settled = k
+        if k == n:
+            self._draw = None
+
+    def _settle_index(self, i) -> None:
+        """Settles what reading index (or slice) i needs."""
+        self._settle(i + 1 if isinstance(i, int) and i >= 0 else None)
+
+    def __getitem__(self, i):
+        if self._draw is not None:
+            self._settle_index(i)
+        if isinstance(i, slice):
+            return list(zip(self._words[i], self._trans[i]))
+        return (self._words[i], self._trans[i])
+
+    def _drop_schedules(self, i) -> None:
+        if self._sched:
+            for card in (self._ids[i] if isinstance(i, slice) else (self._ids[i],)):
+                self._sched.pop(card, None)
+
+    def __setitem__(self, i, row) -> None:
+        self._settle()
+        self._drop_schedules(i)
+        if isinstance(i, slice):
+            rows = [_check_row(r) for r in row]
+            self._ids[i] = self._new_ids(len(rows))
+            self._words[i] = [w for w, _ in rows]
+            self._trans[i] = [t for _, t in rows]
+        else:
+            self._words[i], self._trans[i] = _check_row(row)
+            self._ids[i] = self._new_ids(1)[0]
+
+    def __delitem__(self, i) -> None:
+        self._settle()
+        self._drop_schedules(i)
+        del self._words[i]
+        del self._trans[i]
+        del self._ids[i]
+
+    def __iter__(self) -> Iterator[TableRow]:
+        self._settle()
+        return zip(self._words, self._trans)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CardStore):
+            self._settle()
+            other._settle()
+            return (
+                self._words == other._words and self._trans == other._trans
+                and self.schedules() == other.schedules()
+            )
+        if isinstance(other, (list, tuple)):
+            return len(other) == len(self) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # mutable, like list
+
+    def __repr__(self) -> str:
+        return f"CardStore({list(self)!r})"
+
+    def insert(self, i: int, row: TableRow) -> None:
+        self._settle()
+        w, t = _check_row(row)
+        self._words.insert(i, w)
+        self._trans.insert(i, t)
+        self._ids.insert(i, self._new_ids(1)[0])
+
+    def append(self, row: TableRow) -> None:
+        self._settle()
+        w, t = _check_row(row)
+        self._words.append(w)
+        self._trans.append(t)
+        self._ids.append(self._new_ids(1)[0])
+
+    def extend(self, rows: Iterable[TableRow]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def copy(self) -> "CardStore":
+        return CardStore(self)
+
+    def card_id(self, i: int) -> int:
+        if self._draw is not None:
+            self._settle_index(i)
+        return self._ids[i]
+
+    def schedule(self, i: int) -> CardSchedule | None:
+        """Review schedule of the card at position i; None if it was never reviewed."""
+        return self._sched.get(self.card_id(i))
+
+    def set_schedule(self, i: int, schedule: CardSchedule) -> None:
+        self._sched[self.card_id(i)] = schedule
+
+    def schedules(self) -> list[tuple[int, CardSchedule]]:
+        """(position, schedule) of every reviewed card, in table order."""
+        if not self._sched:
+            return []
+        self._settle()
+        sched = self._sched
+        return [(i, sched[card]) for i, card in enumerate(self._ids) if card in sched]
+
+    def shuffle(self, rng: random.Random | None = None, sampler: WeightedSampler | None = None) -> None:
+        """Shuffles rows in place; cards keep their ids (random.shuffle on a CardStore would not).
+
+        The shuffle is lazy (Fisher-Yates one position at a time): nothing moves until a position is
+        read, and reading position k settles positions 0..k only. Starting a pass is O(1) and
+        revealing the first cards of a huge board does not permute the rest. With a sampler (a
+        WeightedSampler over the same rows), each position is settled by a weighted draw instead."""
+        if sampler is not None:
+            sampler.reset()
+        self._draw = (rng or random, sampler)
+        self._settled = 0
+
+    def _append_pooled(self, w: str, t: str, pool: dict[str, str]) -> None:
+        """Appends a row whose strings were already type-checked, sharing equal strings via `pool`."""
+        self._words.append(pool.setdefault(w, w))
+        self._trans.append(pool.setdefault(t, t))
+        self._ids.append(self._next_id)
+        self._next_id += 1
+
+
+class SessionOrder(Sequence):
+    """The order in which one review session shows the rows of a CardStore, kept as an array of
+    positions into it. Shuffling moves positions instead of rows, so the board keeps its order and
+    saving it after a shuffle writes nothing new.
+
+    Indexes are session positions; rows, card_id and schedule read through to the table, so it can
+    stand in for the table in RepeatSet, TableViewport and the pickers. shuffle() is lazy like
+    CardStore.shuffle; append and pop change the table as well."""
+
+    __slots__ = ("_cards", "_order", "_draw", "_settled")
+
+    def __init__(self, cards: CardStore) -> None:
+        self._cards = cards
+        self._order = array("I", range(len(cards)))
+        self._draw: tuple | None = None
+        self._settled = 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _settle(self, count: int | None = None) -> None:
+        """Finishes the lazy shuffle for positions < count (all positions if None)."""
+        if self._draw is None:
+            return
+        order = self._order
+        n = len(order)
+        count = n if count is None else min(count, n)
+        k = self._settled
+        rng, sampler = self._draw
+        while k < count:
+            j = sampler.draw(rng) if sampler is not None else rng.randrange(k, n)
+            order[k], order[j] = order[j], order[k]
+            k += 1
+        self._settled = k
+        if k == n:
+            self._draw = None
+
+    def position(self, i: int) -> int:
+        """Position in the table of the row at session position i."""
+        if self._draw is not None:
+            self._settle(i + 1 if i >= 0 else None)
+        return self._order[i]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            self._settle()
+            return [self._cards[p] for p in self._order[i]]
+        return self._cards[self.position(i)]
+
+    def __iter__(self) -> Iterator[TableRow]:
+        self._settle()
+        cards = self._cards
+        return (cards[p] for p in self._order)
+
+    def card_id(self, i: int) -> int:
+        return self._cards.card_id(self.position(i))
+
+    def schedule(self, i: int) -> CardSchedule | None:
+        return self._cards.schedule(self.position(i))
+
+    def set_schedule(self, i: int, schedule: CardSchedule) -> None:
+        self._cards.set_schedule(self.position(i), schedule)
+
+    def shuffle(self, rng: random.Random | None = None, sampler: WeightedSampler | None = None) -> None:
+        """Starts a new order (see CardStore.shuffle); the sampler, if any, is over session positions."""
+        if sampler is not None:
+            sampler.reset()
+        self._draw = (rng or random, sampler)
+        self._settled = 0
+
+    def append(self, row: TableRow) -> None:
+        """Adds a row to the end of the table and of the session."""
+        self._settle()
+        self._cards.append(row)
+        self._order.append(len(self._cards) - 1)
+
+    def pop(self, i: int = -1) -> TableRow:
+        """Removes the row at session position i from the table."""
+        self._settle()
+        p = self._order[i]
+        row = self._cards.pop(p)
+        del self._order[i]
+        self._order = array("I", (q - 1 if q > p else q for q in self._order))
+        return row
+
+
+class RepeatRows(list):
+    """to_repeat rows that also know which cards they are: `positions[k]` is the position of row k in
+    the table it was taken from. _repeat_positions uses them while they still match the table, so of
+    equal rows the flagged one stays flagged, not the first. Built by RepeatSet.rows() and by loading."""
+
+    __slots__ = ("positions",)
+
+    def __init__(self, rows: Iterable[TableRow] = (), positions: Iterable[int] = ()) -> None:
+        super().__init__(rows)
+        self.positions = list(positions)
+
+    def copy(self) -> RepeatRows:
+        return RepeatRows(self, self.positions)
+
+
+def _copy_repeat(to_repeat: Iterable[TableRow]) -> list[TableRow]:
+    """A copy of a to_repeat list that keeps RepeatRows positions."""
+    return to_repeat.copy() if isinstance(to_repeat, RepeatRows) else list(to_repeat)
+
+
+class RepeatSet:
+    """Cards of one CardStore (or SessionOrder) marked "to repeat", keyed by card id.
+
+    flag / unflag / is_flagged take a position and are O(1); equal rows are separate cards, so
+    marking one duplicate does not mark the others. Flagged cards are kept in marking order together
+    with their positions in the table, updated by flag / unflag / delete, so rows() does not scan the
+    table. If the table was reordered or changed some other way, rows() finds the cards again once."""
+
+    __slots__ = ("_cards", "_rows", "_where")
+
+    def __init__(self, cards: CardStore | SessionOrder, rows: Iterable[TableRow] = ()) -> None:
+        """Starts with the cards matching `rows` (as stored by save_board); a row listed twice flags two equal cards."""
+        self._cards = cards
+        self._rows: dict[int, TableRow] = {}
+        self._where: dict[int, int] = {}  # card id -> position in the table
+        table = self._table()
+        for p in _repeat_positions(table, rows):
+            cid = table.card_id(p)
+            self._rows[cid] = table[p]
+            self._where[cid] = p
+
+    def _table(self) -> CardStore:
+        return self._cards._cards if isinstance(self._cards, SessionOrder) else self._cards
+
+    def _position(self, i: int) -> int:
+        """Position in the table of the card at position i."""
+        if isinstance(self._cards, SessionOrder):
+            return self._cards.position(i)
+        return i if i >= 0 else len(self._cards) + i
+
+    def flag(self, i: int) -> None:
+        p = self._position(i)
+        table = self._table()
+        cid = table.card_id(p)
+        self._rows[cid] = table[p]
+        self._where[cid] = p
+
+    def unflag(self, i: int) -> None:
+        cid = self._cards.card_id(i)
+        self._rows.pop(cid, None)
+        self._where.pop(cid, None)
+
+    def is_flagged(self, i: int) -> bool:
+        return self._cards.card_id(i) in self._rows
+
+    def set_flags(self, positions: Iterable[int]) -> None:
+        self._rows.clear()
+        self._where.clear()
+        for i in positions:
+            self.flag(i)
+
+    def delete(self, i: int) -> TableRow:
+        """Removes the card at position i from the cards (and their table); flagged cards after it move up."""
+        p = self._position(i)
+        self.unflag(i)
+        row = self._cards.pop(i)
+        where = self._where
+        for cid, q in where.items():
+            if q > p:
+                where[cid] = q - 1
+        return row
+
+    def rows(self) -> RepeatRows:
+        """Flagged rows in marking order, with the positions of their cards in the table (not the session)."""
+        if not self._rows:
+            return RepeatRows()
+        table = self._table()
+        n = len(table)
+        if any(p >= n or table.card_id(p) != cid for cid, p in self._where.items()):
+            self._where = {}
+            for p in range(n):
+                cid = table.card_id(p)
+                if cid in self._rows:
+                    self._where[cid] = p
+            self._rows = {cid: row for cid, row in self._rows.items() if cid in self._where}
+        return RepeatRows(self._rows.values(), (self._where[cid] for cid in self._rows))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+def _repeat_positions(table: Table, to_repeat: Iterable[TableRow]) -> list[int]:
+    """Positions in `table` of the to_repeat rows, in table order. RepeatRows give their positions if those
+    still hold the same rows. Otherwise each listed row claims the first free matching position, so
+    duplicates in the table are only all flagged if listed that many times."""
+    if isinstance(to_repeat, RepeatRows) and len(to_repeat.positions) == len(to_repeat):
+        n = len(table)
+        positions = to_repeat.positions
+        if len(set(positions)) == len(positions) and all(
+            0 <= p < n and tuple(table[p]) == tuple(row) for p, row in zip(positions, to_repeat)
+        ):
+            return sorted(positions)
+    wanted: dict[TableRow, int] = {}
+    for row in to_repeat:
+        row = tuple(row)
+        wanted[row] = wanted.get(row, 0) + 1
+    if not wanted:
+        return []
+    positions: list[int] = []
+    for i, row in enumerate(table):
+        row = tuple(row)
+        left = wanted.get(row)
+        if left:
+            wanted[row] = left - 1
+            positions.append(i)
+    return positions
+
+
+class ReviewQueue:
+    """Positions of the cards of one CardStore that are due for review, in a heap keyed on due time.
+
+    Only cards due at `now` are taken in: every reviewed card that is due, plus up to `new_limit`
+    cards never reviewed (which come first). pop / push are O(log n). Positions are only valid while
+    the table is not reordered."""
+
+    def __init__(self, cards: CardStore, now: float, new_limit: int = REVIEW_NEW_CARDS) -> None:
+        self._heap: list[tuple[float, int]] = []
+        new = 0
+        for i in range(len(cards)):
+            s = cards.schedule(i)
+            if s is None:
+                if new < new_limit:
+                    new += 1
+                    self._heap.append((0.0, i))
+            elif s.due <= now:
+                self._heap.append((s.due, i))
+        heapq.heapify(self._heap)
+
+    def pop(self) -> int:
+        """Position of the card due first (IndexError if the queue is empty)."""
+        return heapq.heappop(self._heap)[1]
+
+    def push(self, i: int, due: float) -> None:
+        heapq.heappush(self._heap, (due, i))
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class WeightedSampler:
+    """Picks positions of a table at random, each with probability proportional to its weight.
+
+    Weights live in a Fenwick (binary indexed) tree: building is O(n); draw, set_weight, append
+    and swapping two positions are O(log n). draw() is one step of a weighted shuffle without
+    replacement: the chosen position is swapped with the next undrawn one, which then stops
+    counting until reset(), so the caller applies the same swap to the table rows."""
+
+    __slots__ = ("_tree", "_weights", "_drawn")
+
+    def __init__(self, weights: Iterable[float]) -> None:
+        self._weights = array("d", weights)
+        tree = array("d", [0.0]) + self._weights  # 1-based
+        n = len(self._weights)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._drawn = 0
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    @property
+    def drawn(self) -> int:
+        """Positions already drawn this pass (0 .. drawn-1)."""
+        return self._drawn
+
+    def _add(self, i: int, delta: float) -> None:
+        tree = self._tree
+        i += 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i: int) -> float:
+        """Sum of the counted weights of positions < i."""
+        tree = self._tree
+        total = 0.0
+        while i:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def weight(self, i: int) -> float:
+        return self._weights[i]
+
+    def set_weight(self, i: int, weight: float) -> None:
+        if i >= self._drawn:
+            self._add(i, weight - self._weights[i])
+        self._weights[i] = weight
+
+    def append(self, weight: float) -> None:
+        n = len(self._weights) + 1
+        # Node n covers positions (n - lowbit(n), n].
+        self._tree.append(weight + self._prefix(n - 1) - self._prefix(n - (n & -n)))
+        self._weights.append(weight)
+
+    def draw(self, rng: random.Random | None = None) -> int:
+        """Chooses one of the undrawn positions by weight and swaps it into position `drawn`.
+        Returns the chosen position (the one the table row must be swapped with)."""
+        k = self._drawn
+        n = len(self._weights)
+        if k >= n:
+            raise IndexError("all positions drawn")
+        x = (rng or random).random() * self._prefix(n)
+        # Descend the tree to the first position whose running total exceeds x.
+        pos, step = 0, 1 << n.bit_length()
+        while step:
+            if pos + step <= n and self._tree[pos + step] <= x:
+                pos += step
+                x -= self._tree[pos]
+            step >>= 1
+        j = min(max(pos, k), n - 1)
+        weights = self._weights
+        wk, wj = weights[k], weights[j]
+        if j != k:
+            self._add(j, wk - wj)
+            weights[j], weights[k] = wk, wj
+        self._add(k, -wk)  # position k now holds the drawn card, which stops counting
+        self._drawn = k + 1
+        return j
+
+    def reset(self) -> None:
+        """Makes every position drawable again (O(drawn log n))."""
+        for i in range(self._drawn):
+            self._add(i, self._weights[i])
+        self._drawn = 0
+
+
+def _draw_weight(cards: CardStore | SessionOrder, to_repeat: RepeatSet, i: int) -> float:
+    """Weight of the card at position i in a weighted shuffle: higher if marked to repeat or often failed."""
+    schedule = cards.schedule(i)
+    lapses = min(schedule.lapses, DRAW_MAX_LAPSES) if schedule else 0
+    return (DRAW_REPEAT_WEIGHT if to_repeat.is_flagged(i) else 1.0) + DRAW_LAPSE_WEIGHT * lapses
+
+
+def _row_to_display(row: TableRow | str) -> str:
+    """Accepts (word, trans) or legacy: single string (treated as word without translation)."""
+    if isinstance(row, str):
+        return row
+    w, t = row
+    return f"{w} ({t})" if t else w
+
+
+def _table_display(table: Table, max_items: int | None = None) -> str:
+    part = table[:max_items] if max_items else table
+    return ", ".join(_row_to_display(r) for r in part) + ("..." if max_items and len(table) > max_items else "")
+
+
+def _table_display_words_only(table: Table, max_items: int | None = None) -> str:
+    """Words only (no translations) — for shuffle view."""
+    part = table[:max_items] if max_items else table
+    return ", ".join(r[0] for r in part) + ("..." if max_items and len(table) > max_items else "")
+
+
+def _table_display_with_revealed(
+    table: Table, revealed: int, to_repeat: set[TableRow] | RepeatSet | None = None
+) -> str:
+    """Numbered list: first `revealed` with translation, rest word only. Rows in to_repeat
+    (a set of rows, or a RepeatSet over `table`) are yellow."""
+    if not table:
+        return "(empty)"
+    flagged = _repeat_lookup(table, to_repeat)
+    width = len(str(len(table)))
+    lines = [_revealed_line(i, r, i < revealed, flagged(i), width) for i, r in enumerate(table)]
+    header = "─" * (width + 4)
+    return f"  {header}\n" + "\n".join(lines) + f"\n  {header}"
+
+
+def _repeat_lookup(table: Table, to_repeat: set[TableRow] | RepeatSet | None):
+    """Returns position -> bool telling whether that row of `table` is in to_repeat."""
+    if isinstance(to_repeat, RepeatSet):
+        return to_repeat.is_flagged
+    rows = to_repeat or set()
+
+    def flagged(i: int) -> bool:
+        return table[i] in rows
+    return flagged
+
+
+def _revealed_line(i: int, row: TableRow, shown: bool, flagged: bool, width: int) -> str:
+    text = _row_to_display(row) if shown else row[0]
+    if flagged:
+        text = f"{_YELLOW}{text}{_RESET}"
+    return f"  {i + 1:>{width}}. {text}"
+
+
+class TableViewport:
+    """Renders the review table one terminal screen at a time.
+
+    Only rows inside the window are formatted. The window follows the reveal position until
+    scroll() pages elsewhere, and follow() (called on the next reveal) brings it back. Rendered
+    lines are cached per position and rebuilt only when that row, its revealed state or its
+    to_repeat flag changed."""
+
+    def __init__(self) -> None:
+        self._cache: dict[int, tuple[tuple, str]] = {}
+        self._start: int | None = None  # set by scroll(); None = follow the reveal position
+
+    @staticmethod
+    def rows_per_page() -> int:
+        return max(VIEWPORT_MIN_ROWS, shutil.get_terminal_size().lines - VIEWPORT_RESERVED_LINES)
+
+    def paged(self, total: int) -> bool:
+        """True if `total` rows do not fit on one screen (so paging keys are worth offering)."""
+        return total > self.rows_per_page()
+
+    def follow(self) -> None:
+        self._start = None
+
+    def window(self, total: int, revealed: int) -> tuple[int, int]:
+        """[start, end) of the rows shown."""
+        size = self.rows_per_page()
+        # Following: keep the last revealed row in the middle of the screen.
+        start = revealed - size // 2 if self._start is None else self._start
+        start = max(0, min(start, total - size))
+        return start, min(total, start + size)
+
+    def scroll(self, pages: int, total: int, revealed: int) -> None:
+        start, _ = self.window(total, revealed)
+        size = self.rows_per_page()
+        self._start = max(0, min(start + pages * size, total - size))
+
+    def render(self, table: Table, revealed: int, to_repeat: set[TableRow] | RepeatSet | None = None) -> str:
+        """Like _table_display_with_revealed, limited to the window, plus a position line when paged."""
+        if not table:
+            return "(empty)"
+        flagged = _repeat_lookup(table, to_repeat)
+        total = len(table)
+        width = len(str(total))
+        start, end = self.window(total, revealed)
+        lines: list[str] = []
+        for i in range(start, end):
+            row = table[i]
+            key = (row, i < revealed, flagged(i), width)
+            cached = self._cache.get(i)
+            if cached is None or cached[0] != key:
+                cached = (key, _revealed_line(i, row, key[1], key[2], width))
+                self._cache[i] = cached
+            lines.append(cached[1])
+        header = "─" * (width + 4)
+        out = f"  {header}\n" + "\n".join(lines) + f"\n  {header}"
+        if end - start < total:
+            out += f"\n  Rows {start + 1}-{end} of {total}"
+        return out
+
+
+# ANSI: cursor home + clear screen (and scrollback); clear to end of line / of screen.
+_CLEAR = "\033[H\033[2J\033[3J"
+_CLEAR_LINE = "\033[K"
+_CLEAR_BELOW = "\033[J"
+_ANSI_RE = re.compile(r"\033\[[0-9;]*[A-Za-z]")
+_vt_enabled: bool | None = None
+
+
+def _enable_windows_vt() -> bool:
+    """Turns on ANSI escape processing for the Windows console (Windows 10+). False if unsupported."""
+    try:
+        import ctypes  # Windows only
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except (AttributeError, OSError):
+        return False
+
+
+def _ansi_terminal() -> bool:
+    """True if stdout is a terminal that understands ANSI escape sequences."""
+    global _vt_enabled
+    try:
+        if not sys.stdout.isatty():
+            return False
+    except (AttributeError, ValueError):
+        return False
+    if sys.platform != "win32":
+        return True
+    if _vt_enabled is None:
+        _vt_enabled = _enable_windows_vt()
+    return _vt_enabled
+
+
+def _screen_width(line: str) -> int:
+    """Terminal columns `line` occupies: escape sequences take none, wide (e.g. CJK) characters two."""
+    text = _ANSI_RE.sub("", line)
+    if text.isascii():
+        return len(text)
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+
+
+class Screen:
+    """Draws full-screen frames in a single write to stdout.
+
+    On an ANSI terminal draw() homes the cursor, rewrites only the lines that differ from the
+    previous frame and clears everything below the frame (e.g. the answered menu prompt). It falls
+    back to clearing and writing the whole frame when the previous frame is unknown (see reset())
+    or when lines may have wrapped or scrolled. Elsewhere the frame is just printed."""
+
+    def __init__(self) -> None:
+        self._lines: list[str] | None = None
+
+    def reset(self) -> None:
+        """Forgets the previous frame; call when something else has drawn over the screen."""
+        self._lines = None
+
+    def draw(self, text: str, below: int = VIEWPORT_RESERVED_LINES - VIEWPORT_FRAME_LINES) -> None:
+        """Draws `text` as the new frame; `below` is how many lines the caller prints under it (its menu).
+        The default is the menu under a TableViewport page, whose rows already leave room for it."""
+        out = sys.stdout
+        if not _ansi_terminal():
+            out.write(text + "\n")
+            out.flush()
+            return
+        lines = text.split("\n")
+        prev = self._lines
+        size = shutil.get_terminal_size()
+        # The menu below the frame must fit too, or the terminal scrolls and line positions shift.
+        fits = len(lines) + below <= size.lines and all(
+            _screen_width(line) < size.columns for line in lines
+        )
+        if prev is None or not fits:
+            frame = _CLEAR + text + "\n"
+        else:
+            parts = [
+                f"\033[{i + 1};1H{line}{_CLEAR_LINE}"
+                for i, line in enumerate(lines)
+                if i >= len(prev) or prev[i] != line
+            ]
+            parts.append(f"\033[{len(lines) + 1};1H{_CLEAR_BELOW}")
+            frame = "".join(parts)
+        self._lines = lines if fits else None
+        out.write(frame)
+        out.flush()
+
+
+_screen = Screen()
+
+
+def _print_backup_list(backup: dict[str, Table]) -> None:
+    """Prints backup list: title (bold, colored), below table elements."""
+    for name in sorted(backup.keys()):
+        table = backup[name]
+        print(f"{_BOLD_CYAN}{name}{_RESET}")
+        for word, trans in table:
+            print(f"    {word}: {trans if trans else '(no translation)'}")
+        print()
+
+
+def _print_board_summaries(boards: list[BoardSummary]) -> None:
+    """Prints board list from summaries: title (bold, colored), counts and last change, preview."""
+    for b in boards:
+        stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(b.modified))
+        print(f"{_BOLD_CYAN}{b.name}{_RESET}  ({b.rows} rows, {b.to_repeat} to repeat, {stamp})")
+        print(f"    {b.preview if b.preview else '(empty)'}")
+        print()
+
+
+def format_translations_display(table: Table) -> str:
+    """Returns display text: each row '  word: trans' or '  word: (no translation)' in table order."""
+    lines = [
+        f"  {word}: {trans if trans else '(no translation)'}"
+        for word, trans in table
+    ]
+    return "\n".join(lines)
+
+
+def _parse_table_cell(cell: str) -> TableRow:
+    cell = cell.strip()
+    if "|" in cell:
+        w, _, t = cell.partition("|")
+        return (w.strip(), t.strip())
+    return (cell, "")
+
+
+def _validate_backup(data: object) -> dict[str, list[list[str]]] | None:
+    """Accepts dict: values are lists of strings (old format) or lists [word, trans]. Returns normalized [word, trans] lists."""
+    if not isinstance(data, dict):
+        return None
+    out: dict[str, list[list[str]]] = {}
+    for k, v in data.items():
+        if not isinstance(k, str) or not isinstance(v, list):
+            return None
+        rows: list[list[str]] = []
+        for x in v:
+            if isinstance(x, str):
+                rows.append([x, ""])
+            elif isinstance(x, list) and len(x) == 2 and isinstance(x[0], str) and isinstance(x[1], str):
+                rows.append([x[0], x[1]])
+            else:
+                return None
+        out[k] = rows
+    return out
+
+
+def _backup_to_table(rows: list[list[str]]) -> Table:
+    return [ (r[0], r[1]) for r in rows ]
+
+
+def _table_to_backup(table: Table) -> list[list[str]]:
+    return [ [w, t] for w, t in table ]
+
+
+def _board_payload(table: Table, to_repeat: list[TableRow]) -> dict[str, list]:
+    """One board as stored on disk: { table, to_repeat }, to_repeat as positions into table.
+    Boards with reviewed cards also get "schedule": [[position, ease, interval, due, reps, lapses], ...]."""
+    payload = {"table": _table_to_backup(table), "to_repeat": _repeat_positions(table, to_repeat)}
+    schedules = table.schedules() if isinstance(table, CardStore) else []
+    if schedules:
+        payload["schedule"] = [[i, *s] for i, s in schedules]
+    return payload
+
+
+def _board_digest(table: Table, to_repeat: list[TableRow]) -> str:
+    """Content hash of one board (its _board_payload), used to skip saves that would write the same thing."""
+    return _payload_digest(json.dumps(_board_payload(table, to_repeat), ensure_ascii=False, separators=(",", ":")))
+
+
+def _payload_digest(text: str) -> str:
+    """_board_digest of a board whose payload is already dumped minified as `text`."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _rows_digest(table: Table) -> str:
+    """Content hash of a board's rows alone, without to_repeat or schedules."""
+    text = json.dumps([[w, t] for w, t in table], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _parse_schedules(cards: CardStore, v: object) -> None:
+    """Applies a "schedule" list (see _board_payload) to cards; malformed entries are skipped."""
+    if not isinstance(v, list):
+        return
+    for x in v:
+        if not isinstance(x, list) or len(x) != 6:
+            continue
+        i, ease, interval, due, reps, lapses = x
+        if type(i) is not int or not 0 <= i < len(cards) or type(reps) is not int or type(lapses) is not int:
+            continue
+        if not all(type(f) in (int, float) for f in (ease, interval, due)):
+            continue
+        cards.set_schedule(i, CardSchedule(float(ease), float(interval), float(due), reps, lapses))
+
+
+def _board_summary(
+    name: str, table: Table, to_repeat: list[TableRow], modified: float, version: int = 0
+) -> BoardSummary:
+    return BoardSummary(name, len(table), len(to_repeat), modified, _table_display(table, BOARD_PREVIEW_ITEMS), version)
+
+
+def _summary_to_entry(summary: BoardSummary) -> dict:
+    return {
+        "rows": summary.rows, "to_repeat": summary.to_repeat, "modified": summary.modified,
+        "preview": summary.preview, "version": summary.version,
+    }
+
+
+def _summary_from_entry(name: str, entry: object) -> BoardSummary | None:
+    """Reads a persisted summary; None if fields are missing or of the wrong type."""
+    if not isinstance(entry, dict):
+        return None
+    rows, to_repeat, modified, preview = (entry.get(k) for k in ("rows", "to_repeat", "modified", "preview"))
+    if not isinstance(rows, int) or not isinstance(to_repeat, int) or not isinstance(preview, str):
+        return None
+    if not isinstance(modified, (int, float)):
+        return None
+    version = entry.get("version")
+    return BoardSummary(name, rows, to_repeat, float(modified), preview, version if type(version) is int else 0)
+
+
+def _validate_table(table: object) -> bool:
+    """Checks if this is a Table (list of pairs (str, str), or a CardStore)."""
+    if isinstance(table, CardStore):
+        return True  # rows are checked on insertion
+    if not isinstance(table, list):
+        return False
+    for row in table:
+        if not isinstance(row, (list, tuple)) or len(row) != 2:
+            return False
+        if not isinstance(row[0], str) or not isinstance(row[1], str):
+            return False
+    return True
+
+
+def _parse_board_row_list(v: object, pool: dict[str, str] | None = None) -> list[TableRow] | None:
+    """Parses list of [word, trans] or legacy list of str. Returns list of (word, trans) or None.
+    With `pool`, strings equal to ones seen before are replaced by the pooled object."""
+    if not isinstance(v, list):
+        return None
+    if pool is None:
+        pool = {}
+    out: list[TableRow] = []
+    for x in v:
+        if isinstance(x, str):
+            out.append((pool.setdefault(x, x), ""))
+        elif isinstance(x, list) and len(x) == 2 and isinstance(x[0], str) and isinstance(x[1], str):
+            out.append((pool.setdefault(x[0], x[0]), pool.setdefault(x[1], x[1])))
+        else:
+            return None
+    return out
+
+
+def _parse_board_cards(v: object, pool: dict[str, str] | None = None) -> CardStore | None:
+    """Like _parse_board_row_list, but builds a CardStore directly (no intermediate tuples)."""
+    if not isinstance(v, list):
+        return None
+    if pool is None:
+        pool = {}
+    cards = CardStore()
+    for x in v:
+        if isinstance(x, str):
+            cards._append_pooled(x, "", pool)
+        elif isinstance(x, list) and len(x) == 2 and isinstance(x[0], str) and isinstance(x[1], str):
+            cards._append_pooled(x[0], x[1], pool)
+        else:
+            return None
+    return cards
+
+
+# Magic header of zlib-compressed backups (gzip files are recognised by their own header).
+_ZLIB_MAGIC = b"NEOANKI-ZLIB\n"
+_GZIP_MAGIC = b"\x1f\x8b"
+# Errors raised by reading a corrupted backup in any of BACKUP_FORMATS.
+_READ_ERRORS = (ValueError, OSError, EOFError, zlib.error)
+
+
+class _ZlibWriter(io.RawIOBase):
+    """Binary stream that zlib-compresses into `raw` after writing _ZLIB_MAGIC."""
+
+    def __init__(self, raw) -> None:
+        super().__init__()
+        self._raw = raw
+        self._compressor = zlib.compressobj(6)
+        raw.write(_ZLIB_MAGIC)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._raw.write(self._compressor.compress(b))
+        return len(b)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.write(self._compressor.flush())
+            self._raw.close()
+        super().close()
+
+
+class _ZlibReader(io.RawIOBase):
+    """Binary stream decompressing `raw` (positioned after _ZLIB_MAGIC) chunk by chunk."""
+
+    def __init__(self, raw) -> None:
+        super().__init__()
+        self._raw = raw
+        self._decompressor = zlib.decompressobj()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while True:
+            if self._decompressor.eof:
+                return 0
+            data = self._decompressor.unconsumed_tail or self._raw.read(_STREAM_CHUNK)
+            if not data:
+                raise EOFError("Truncated zlib backup")
+            out = self._decompressor.decompress(data, len(b))
+            if out:
+                b[:len(out)] = out
+                return len(out)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+
+class _ClosingGzipFile(gzip.GzipFile):
+    """GzipFile writer that also closes the file object it was given."""
+
+    def __init__(self, raw) -> None:
+        super().__init__(fileobj=raw, mode="wb", compresslevel=6, mtime=0)
+        self._raw = raw
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._raw.close()
+
+
+def _open_backup_text(path: str) -> TextIO:
+    """Opens a backup file for reading as text, detecting pretty/compact JSON, gzip or zlib by its header."""
+    raw = open(path, "rb")
+    try:
+        head = raw.read(len(_ZLIB_MAGIC))
+        if head.startswith(_GZIP_MAGIC):
+            raw.close()
+            return gzip.open(path, "rt", encoding="utf-8")
+        if head == _ZLIB_MAGIC:
+            return io.TextIOWrapper(io.BufferedReader(_ZlibReader(raw)), encoding="utf-8")
+        raw.seek(0)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    except BaseException:
+        raw.close()
+        raise
+
+
+def _open_backup_writer(raw, fmt: str) -> TextIO:
+    """Wraps a binary file in a text stream that encodes in `fmt` (one of BACKUP_FORMATS)."""
+    if fmt == "gzip":
+        return io.TextIOWrapper(_ClosingGzipFile(raw), encoding="utf-8")
+    if fmt == "zlib":
+        return io.TextIOWrapper(io.BufferedWriter(_ZlibWriter(raw)), encoding="utf-8")
+    return io.TextIOWrapper(raw, encoding="utf-8")
+
+
+def _format_indent(fmt: str) -> int | None:
+    """JSON indent for a backup format: only "pretty" is indented."""
+    return 2 if fmt == "pretty" else None
+
+
+def _read_backup_raw(path: str) -> object:
+    if not os.path.exists(path):
+        return None
+    try:
+        with _open_backup_text(path) as f:
+            return json.load(f)
+    except _READ_ERRORS:
+        return None
+
+
+def _parse_board_payload(v: dict) -> tuple[Table, list[TableRow]] | None:
+    """Parses one board object { table, to_repeat }. Invalid to_repeat yields []; invalid table yields None."""
+    if "table" not in v:
+        return None
+    # to_repeat rows share their strings with the table rows they refer to.
+    pool: dict[str, str] = {}
+    t_rows = _parse_board_cards(v["table"], pool)
+    if t_rows is None:
+        return None
+    if "schedule" in v:
+        _parse_schedules(t_rows, v["schedule"])
+    r_raw = v.get("to_repeat")
+    if isinstance(r_raw, list) and all(type(x) is int for x in r_raw):
+        # Current format: positions into table (out-of-range and repeated ones are ignored).
+        positions = [i for i in sorted(set(r_raw)) if 0 <= i < len(t_rows)]
+        return t_rows, RepeatRows((t_rows[i] for i in positions), positions)
+    r_rows = _parse_board_row_list(r_raw, pool) if isinstance(r_raw, list) else []
+    return t_rows, r_rows if r_rows is not None else []
+
+
+def _parse_backup_data(data: object) -> tuple[dict[str, Table], dict[str, list[TableRow]]]:
+    """Parses backup file. New format: name -> {table: [...], to_repeat: [...]}. Legacy: name -> [...]. Returns (tables, to_repeat_by_name)."""
+    tables: dict[str, Table] = {}
+    to_repeat: dict[str, list[TableRow]] = {}
+    if not isinstance(data, dict):
+        return {}, {}
+    # Legacy: root had "tables" and "to_repeat" as separate top-level keys
+    if "tables" in data and isinstance(data.get("tables"), dict):
+        pool: dict[str, str] = {}
+        for k, v in (data["tables"] or {}).items():
+            if not isinstance(k, str):
+                continue
+            cards = _parse_board_cards(v, pool)
+            if cards is not None:
+                tables[k] = cards
+        for k, v in (data.get("to_repeat") or {}).items():
+            if not isinstance(k, str) or not isinstance(v, list):
+                continue
+            rows = _parse_board_row_list(v, pool)
+            if rows is not None:
+                to_repeat[k] = rows
+        return tables, to_repeat
+    # New format: name -> { table: [...], to_repeat: [...] }  or legacy: name -> [...]
+    for k, v in data.items():
+        _parse_backup_item(k, v, tables, to_repeat)
+    return tables, to_repeat
+
+
+def _parse_backup_item(
+    k: object, v: object, tables: dict[str, Table], to_repeat: dict[str, list[TableRow]]
+) -> None:
+    """Adds one top-level entry (board name -> board) to tables / to_repeat; invalid entries are skipped."""
+    if not isinstance(k, str):
+        return
+    if isinstance(v, list):
+        cards = _parse_board_cards(v)
+        if cards is not None:
+            tables[k] = cards
+            # legacy: no to_repeat key for this board
+    elif isinstance(v, dict):
+        board = _parse_board_payload(v)
+        if board is not None:
+            tables[k], to_repeat[k] = board
+
+
+# Characters read per chunk by the streaming loader; grows while a single value is still incomplete.
+_STREAM_CHUNK = 1 << 16
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WS = " \t\n\r"
+
+
+def _iter_json_object(f: TextIO) -> Iterator[tuple[object, object]]:
+    """Yields (key, value) pairs of the top-level JSON object in `f` one at a time, so only one
+    value is held in memory. Raises ValueError (json.JSONDecodeError) on invalid JSON or non-object."""
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> None:
+        # Read at least as much as is already buffered: re-decoding a long value stays linear overall.
+        nonlocal buf, pos, eof
+        chunk = f.read(max(_STREAM_CHUNK, len(buf) - pos))
+        buf = buf[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+    def skip_ws() -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _JSON_WS:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def expect(chars: str) -> str:
+        skip_ws()
+        if pos >= len(buf) or buf[pos] not in chars:
+            raise json.JSONDecodeError(f"Expected one of {chars!r}", buf, pos)
+        return buf[pos]
+
+    def decode() -> object:
+        nonlocal pos
+        while True:
+            skip_ws()
+            try:
+                value, end = _JSON_DECODER.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if end == len(buf) and not eof:
+                # A number or literal may continue in the next chunk.
+                fill()
+                continue
+            pos = end
+            return value
+
+    expect("{")
+    pos += 1
+    if expect('}"') == "}":
+        pos += 1
+    else:
+        while True:
+            key = decode()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expected property name", buf, pos)
+            expect(":")
+            pos += 1
+            yield key, decode()
+            if expect(",}") == "}":
+                pos += 1
+                break
+            pos += 1
+    skip_ws()
+    if pos < len(buf):
+        raise json.JSONDecodeError("Extra data", buf, pos)
+
+
+def _stream_backup(path: str) -> tuple[dict[str, Table], dict[str, list[TableRow]], int] | None:
+    """Parses a backup file board by board (see _iter_json_object), converting rows as it goes.
+    Returns (tables, to_repeat_by_name, top_level_entries) or None if the file is missing or not a JSON object."""
+    if not os.path.exists(path):
+        return None
+    tables: dict[str, Table] = {}
+    to_repeat: dict[str, list[TableRow]] = {}
+    legacy: dict[str, object] = {}
+    count = 0
+    try:
+        with _open_backup_text(path) as f:
+            for k, v in _iter_json_object(f):
+                count += 1
+                # Legacy root {"tables": {...}, "to_repeat": {...}} is resolved once the whole object is read.
+                if k in ("tables", "to_repeat") and isinstance(v, dict):
+                    legacy[k] = v
+                _parse_backup_item(k, v, tables, to_repeat)
+    except _READ_ERRORS:
+        return None
+    if "tables" in legacy:
+        tables, to_repeat = _parse_backup_data(legacy)
+    return tables, to_repeat, count
+
+
+def _write_backup_stream(
+    f: TextIO,
+    tables: dict[str, Table],
+    to_repeat_by_name: dict[str, list[TableRow]],
+    indent: int | None = 2,
+    digests: dict[str, str] | None = None,
+) -> None:
+    """Writes the backup one board at a time; output is identical to json.dump(payload, indent=indent)
+    (minified when indent is None). Boards missing from `digests` get their _board_digest added to it;
+    minified output is hashed as written, so only indented boards are dumped a second time."""
+    if not tables:
+        f.write("{}")
+        return
+    if indent is None:
+        sep, open_item, colon, close = ",", "", ":", "}"
+    else:
+        sep, open_item, colon, close = ",", "\n" + " " * indent, ": ", "\n}"
+    separators = (",", ":") if indent is None else None
+    f.write("{")
+    for i, (name, table) in enumerate(tables.items()):
+        payload = _board_payload(table, to_repeat_by_name.get(name, []))
+        board = json.dumps(payload, ensure_ascii=False, indent=indent, separators=separators)
+        if digests is not None and name not in digests:
+            if indent is None:
+                digests[name] = _payload_digest(board)
+            else:
+                digests[name] = _payload_digest(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+        if indent is not None:
+            board = board.replace("\n", open_item)
+        f.write((sep if i else "") + open_item + json.dumps(name, ensure_ascii=False) + colon + board)
+    f.write(close)
+
+
+def _read_journal(path: str) -> list[dict]:
+    """Reads journal records (one JSON object per line). Torn or invalid lines are skipped."""
+    if not os.path.exists(path):
+        return []
+    records: list[dict] = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(rec, dict):
+                    records.append(rec)
+    except OSError:
+        return []
+    return records
+
+
+def _board_delta(old: Table, old_repeat: list[TableRow], new: Table, new_repeat: list[TableRow]) -> dict | None:
+    """Fields of an "edit" journal record turning board (old, old_repeat) into (new, new_repeat): "remove"
+    (positions in old, ascending), then "add" (rows appended), then "flag" / "unflag" (to_repeat positions in
+    new) and "schedule" (as in _board_payload, for cards whose schedule changed); plus the new "rows",
+    "repeat" and "preview" of the board summary. None if the change is too large to be worth it."""
+    a = list(old) if isinstance(old, CardStore) else [tuple(row) for row in old]
+    b = list(new) if isinstance(new, CardStore) else [tuple(row) for row in new]
+    limit = max(8, len(b) // 4)
+    remove: list[int] = []
+    j = 0
+    for i, row in enumerate(a):
+        if j < len(b) and b[j] == row:
+            j += 1
+        else:
+            remove.append(i)
+            if len(remove) > limit:
+                return None
+    add = b[j:]
+    if len(add) > limit:
+        return None
+    # Position in new of each kept row of old.
+    moved: dict[int, int] = {}
+    removed = set(remove)
+    k = 0
+    for i in range(len(a)):
+        if i in removed:
+            continue
+        moved[i] = k
+        k += 1
+    was = {moved[p] for p in _repeat_positions(old, old_repeat) if p in moved}
+    now = _repeat_positions(new, new_repeat)
+    now_set = set(now)
+    flag, unflag = sorted(now_set - was), sorted(was - now_set)
+    old_s = {moved[p]: sch for p, sch in old.schedules() if p in moved} if isinstance(old, CardStore) else {}
+    new_s = dict(new.schedules()) if isinstance(new, CardStore) else {}
+    if any(p not in new_s for p in old_s):
+        return None  # a schedule was dropped: not expressible as an edit
+    schedule = [[p, *sch] for p, sch in new_s.items() if old_s.get(p) != sch]
+    if len(remove) + len(add) + len(flag) + len(unflag) + len(schedule) > limit:
+        return None
+    delta: dict = {"remove": remove, "add": [[w, t] for w, t in add], "flag": flag, "unflag": unflag}
+    if schedule:
+        delta["schedule"] = schedule
+    delta.update(rows=len(b), repeat=len(now), preview=_table_display(new, BOARD_PREVIEW_ITEMS))
+    return delta
+
+
+def _apply_board_delta(
+    table: Table, to_repeat: list[TableRow], rec: dict
+) -> tuple[CardStore, RepeatRows] | None:
+    """Replays an "edit" journal record (see _board_delta) on a board; None if it does not fit the board."""
+    remove, add, flag, unflag = (rec.get(k) for k in ("remove", "add", "flag", "unflag"))
+    if not all(isinstance(x, list) and all(type(p) is int for p in x) for x in (remove, flag, unflag)):
+        return None
+    cards = table if isinstance(table, CardStore) else CardStore(table)
+    n = len(cards)
+    if remove != sorted(set(remove)) or (remove and not 0 <= remove[0] <= remove[-1] < n):
+        return None
+    added = _parse_board_row_list(add)
+    if added is None:
+        return None
+    removed = set(remove)
+    shift = 0
+    flagged: set[int] = set()
+    old_flags = set(_repeat_positions(cards, to_repeat))
+    for i in range(n):
+        if i in removed:
+            shift += 1
+        elif i in old_flags:
+            flagged.add(i - shift)
+    for p in reversed(remove):
+        del cards[p]
+    cards.extend(added)
+    n = len(cards)
+    if any(not 0 <= p < n for p in flag + unflag):
+        return None
+    flagged = (flagged | set(flag)) - set(unflag)
+    if "schedule" in rec:
+        _parse_schedules(cards, rec["schedule"])
+    positions = sorted(flagged)
+    return cards, RepeatRows((cards[p] for p in positions), positions)
+
+
+def _apply_journal(
+    tables: dict[str, Table], to_repeat: dict[str, list[TableRow]], records: list[dict]
+) -> None:
+    """Replays journal records in order: "put" replaces one board, "edit" changes one (see _board_delta),
+    "del" removes one."""
+    for rec in records:
+        name = rec.get("name")
+        if not isinstance(name, str):
+            continue
+        if rec.get("op") == "put":
+            board = _parse_board_payload(rec)
+            if board is not None:
+                tables[name], to_repeat[name] = board
+        elif rec.get("op") == "edit":
+            board = _apply_board_delta(tables[name], to_repeat.get(name, []), rec) if name in tables else None
+            if board is not None:
+                tables[name], to_repeat[name] = board
+        elif rec.get("op") == "del":
+            tables.pop(name, None)
+            to_repeat.pop(name, None)
+
+
+def _load_backup_files() -> tuple[dict[str, Table], dict[str, list[TableRow]], bool]:
+    """Reads backup from disk; if main file is corrupted tries .bak generations, newest first.
+    Repairs main from the first usable one.
+    Journal records written since the last full save are replayed on top.
+    Returns (tables, to_repeat_by_name, recovered_from_bak)."""
+    journal = _read_journal(BACKUP_JOURNAL_PATH)
+    main = _stream_backup(BACKUP_PATH)
+    if main is not None:
+        tables, to_repeat, count = main
+        if tables or count == 0:
+            _apply_journal(tables, to_repeat, journal)
+            return tables, to_repeat, False
+    for candidate in _bak_generations(BACKUP_BACKUP_PATH):
+        bak = _stream_backup(candidate)
+        if bak is None:
+            continue
+        tables, to_repeat, _ = bak
+        try:
+            _atomic_write(
+                BACKUP_PATH,
+                lambda f: _write_backup_stream(f, tables, to_repeat, _format_indent(BACKUP_FORMAT)),
+                BACKUP_FORMAT,
+            )
+        except OSError:
+            pass
+        _apply_journal(tables, to_repeat, journal)
+        return tables, to_repeat, True
+    tables, to_repeat = {}, {}
+    _apply_journal(tables, to_repeat, journal)
+    return tables, to_repeat, False
+
+
+def _bak_generations(bak_path: str) -> list[str]:
+    """Paths of kept versions, newest first: bak_path, bak_path.2, ... (BACKUP_GENERATIONS in total)."""
+    return [bak_path] + [f"{bak_path}.{n}" for n in range(2, BACKUP_GENERATIONS + 1)]
+
+
+def _rotate_bak(path: str, bak_path: str) -> None:
+    """Keeps the current version of `path` as `bak_path` before `path` is replaced (best effort).
+    Older versions shift one generation down by rename; the newest is a hardlink to `path`,
+    so no data is copied. Relies on `path` only ever being replaced (os.replace), never rewritten in place."""
+    if not os.path.exists(path):
+        return
+    generations = _bak_generations(bak_path)
+    try:
+        for newer, older in zip(reversed(generations[:-1]), reversed(generations[1:])):
+            if os.path.exists(newer):
+                os.replace(newer, older)
+        tmp = bak_path + ".tmp"
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        try:
+            os.link(path, tmp)
+        except OSError:
+            # No hardlinks on this filesystem: fall back to copying.
+            shutil.copyfile(path, tmp)
+            if _durability() != "none":
+                _fsync_path(tmp)
+        os.replace(tmp, bak_path)
+        # The directory entries changed here are synced together with the following replace of `path`.
+    except OSError:
+        pass
+
+
+def _durability() -> str:
+    if BACKUP_DURABILITY not in BACKUP_DURABILITY_LEVELS:
+        raise ValueError(f"Unknown durability level: {BACKUP_DURABILITY}")
+    return BACKUP_DURABILITY
+
+
+def _fsync_path(path: str) -> None:
+    """Flushes a closed file's data to disk."""
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(path: str) -> None:
+    """Flushes the directory containing `path` (new names, renames, unlinks). No-op on Windows."""
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(path: str, write, fmt: str = "pretty", durable: bool = True) -> None:
+    """Calls write(file) on a temp file next to `path`, then replaces `path` with it.
+    `fmt` (one of BACKUP_FORMATS) selects compression of what write() produces.
+    Syncs to disk per BACKUP_DURABILITY unless durable=False (rebuildable caches)."""
+    if fmt not in BACKUP_FORMATS:
+        raise ValueError(f"Unknown backup format: {fmt}")
+    level = _durability() if durable else "none"
+    # Not ".json": a temp file left by a crash must not look like a backup or shard file.
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path) or ".")
+    try:
+        with _open_backup_writer(os.fdopen(fd, "wb"), fmt) as f:
+            write(f)
+        if level != "none":
+            # Compressed streams are only complete once closed, so sync the file by path.
+            _fsync_path(tmp)
+        os.replace(tmp, path)
+        if level == "dir":
+            _fsync_dir(path)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _file_signature(path: str) -> tuple[int, int, int] | None:
+    """(mtime_ns, size, inode) of a file, None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class BackupStore:
+    """Parsed backup kept in memory for the whole session.
+
+    Files are re-read only when the stat signature (mtime, size, inode) of the main file,
+    .bak or journal (or the manifest, for the directory layout) changes. Writes made through save_backup / journal_board update the
+    store directly, so they never trigger a re-read either."""
+
+    def __init__(self) -> None:
+        self._paths: tuple[str, ...] = ()
+        self._signature: tuple | None = None
+        self._tables: dict[str, Table] = {}
+        self._to_repeat: dict[str, list[TableRow]] = {}
+        self._digests: dict[str, str] = {}  # _board_digest per board, filled in as needed
+        self._recovered = False
+
+    def _current_paths(self) -> tuple[str, ...]:
+        if BACKUP_BACKEND == "dir":
+            # Every write in the directory layout rewrites the manifest.
+            return (_dir_manifest_path(),)
+        return (BACKUP_PATH, BACKUP_BACKUP_PATH, BACKUP_JOURNAL_PATH)
+
+    def _current_signature(self) -> tuple:
+        return tuple(_file_signature(p) for p in self._current_paths())
+
+    def is_fresh(self) -> bool:
+        """True if the in-memory copy matches the files on disk."""
+        return (
+            self._signature is not None
+            and self._paths == self._current_paths()
+            and self._signature == self._current_signature()
+        )
+
+    def load(self, shared: bool = False) -> tuple[dict[str, Table], dict[str, list[TableRow]], bool]:
+        """Returns copies of the cached backup, re-reading only if stale. With `shared`, the tables are the
+        store's own (only the mappings are copied), for callers that never mutate them."""
+        if not self.is_fresh():
+            loader = _dir_load_all if BACKUP_BACKEND == "dir" else _load_backup_files
+            self._tables, self._to_repeat, self._recovered = loader()
+            self._digests = {}
+            if BACKUP_BACKEND == "json" and not os.path.exists(BACKUP_JOURNAL_PATH):
+                # The index records the digest of every board in the main file it was written for.
+                self._digests = {n: d for n, d in (_json_read_hashes() or {}).items() if n in self._tables}
+            self._remember_files()
+            # Files changed outside this process's own saves.
+            _search_index.invalidate()
+        recovered, self._recovered = self._recovered, False
+        if shared:
+            return dict(self._tables), dict(self._to_repeat), recovered
+        tables = {name: CardStore(t) for name, t in self._tables.items()}
+        return tables, {name: _copy_repeat(rows) for name, rows in self._to_repeat.items()}, recovered
+
+    def replace_all(
+        self, tables: dict[str, Table], to_repeat: dict[str, list[TableRow]], digests: dict[str, str] | None = None
+    ) -> None:
+        """Records the state just written by a full save; `digests` are the _board_digest of its boards, if known."""
+        self._tables = {name: CardStore(t) for name, t in tables.items()}
+        self._to_repeat = {name: _copy_repeat(to_repeat.get(name, [])) for name in tables}
+        self._digests = dict(digests or {})
+        self._recovered = False
+        self._remember_files()
+
+    def put_board(
+        self, name: str, table: Table, to_repeat: list[TableRow], was_fresh: bool, digest: str | None = None
+    ) -> None:
+        """Records one board just appended to the journal. `was_fresh` is is_fresh() from before the write;
+        if the store was already stale, it is invalidated instead. `digest` is its _board_digest, if known."""
+        if not was_fresh:
+            self.invalidate()
+            return
+        self._tables[name] = CardStore(table)
+        self._to_repeat[name] = _copy_repeat(to_repeat)
+        if digest is None:
+            self._digests.pop(name, None)
+        else:
+            self._digests[name] = digest
+        self._remember_files()
+
+    def drop_board(self, name: str, was_fresh: bool) -> None:
+        """Records removal of one board (see put_board)."""
+        if not was_fresh:
+            self.invalidate()
+            return
+        self._tables.pop(name, None)
+        self._to_repeat.pop(name, None)
+        self._digests.pop(name, None)
+        self._remember_files()
+
+    def unchanged_boards(self, boards: dict[str, Table], to_repeat_by_name: dict[str, list[TableRow]]) -> set[str]:
+        """Names of boards whose table and to_repeat equal what the store holds (empty set if stale)."""
+        if not self.is_fresh():
+            return set()
+        return {
+            name for name, table in boards.items()
+            if self._tables.get(name) == table
+            and _repeat_positions(table, self._to_repeat.get(name, []))
+            == _repeat_positions(table, to_repeat_by_name.get(name, []))
+        }
+
+    def stored_board(self, name: str) -> tuple[Table, list[TableRow]] | None:
+        """The board as the files hold it (shared, not copied); None if there is no such board or the store is stale."""
+        if not self.is_fresh() or name not in self._tables:
+            return None
+        return self._tables[name], self._to_repeat.get(name, [])
+
+    def cached_digests(self, names: Iterable[str]) -> dict[str, str]:
+        """The digests already known for `names`, without computing missing ones (empty if stale)."""
+        if not self.is_fresh():
+            return {}
+        return {name: self._digests[name] for name in names if name in self._digests}
+
+    def board_digest(self, name: str) -> str | None:
+        """_board_digest of the board as the files hold it; None if there is no such board or the store is stale."""
+        if not self.is_fresh() or name not in self._tables:
+            return None
+        digest = self._digests.get(name)
+        if digest is None:
+            digest = self._digests[name] = _board_digest(self._tables[name], self._to_repeat.get(name, []))
+        return digest
+
+    def invalidate(self) -> None:
+        self._signature = None
+
+    def _remember_files(self) -> None:
+        self._paths = self._current_paths()
+        self._signature = self._current_signature()
+
+
+_backup_store = BackupStore()
+
+
+class _StorageLock:
+    """Re-entrant lock serialising storage access between threads (the UI and the background SaveWorker)
+    and, through an flock on `<backup location>.lock`, between NeoAnki processes sharing a backup.
+    The file lock is taken by the outermost acquire only; on Windows only threads are serialised."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self) -> "_StorageLock":
+        self._lock.acquire()
+        if self._depth == 0 and sys.platform != "win32":
+            try:
+                self._file = open(_backup_location() + ".lock", "a")
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except OSError:
+                self._close()  # e.g. the backup directory does not exist yet: nothing to share
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._close()
+        self._lock.release()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()  # releases the flock
+            self._file = None
+
+
+_STORAGE_LOCK = _StorageLock()
+
+
+def _storage_locked(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _STORAGE_LOCK:
+            return func(*args, **kwargs)
+    return wrapper
+
+
+_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    rows_count INTEGER NOT NULL DEFAULT 0,
+    repeat_count INTEGER NOT NULL DEFAULT 0,
+    modified REAL NOT NULL DEFAULT 0,
+    preview TEXT NOT NULL DEFAULT '',
+    content_hash TEXT NOT NULL DEFAULT '',
+    version INTEGER NOT NULL DEFAULT 0,
+    rows_hash TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS rows (
+    board_id INTEGER NOT NULL REFERENCES boards(id) ON DELETE CASCADE,
+    pos INTEGER NOT NULL,
+    word TEXT NOT NULL,
+    trans TEXT NOT NULL,
+    to_repeat INTEGER NOT NULL DEFAULT 0,
+    ease REAL,
+    interval REAL,
+    due REAL,
+    reps INTEGER,
+    lapses INTEGER,
+    PRIMARY KEY (board_id, pos)
+) WITHOUT ROWID;
+"""
+
+
+# (database path, process id, connection): the connection reused by every SQLite access of this process.
+# Calls are serialised by _STORAGE_LOCK, so the UI thread and the SaveWorker can share it.
+_db_conn: tuple[str, int, sqlite3.Connection] | None = None
+
+
+def _db_connect() -> sqlite3.Connection:
+    """The SQLite backup connection (WAL mode, synchronous per BACKUP_DURABILITY), opened on first use and
+    kept open; reopened if BACKUP_DB_PATH changes or the file disappears, and in a forked child."""
+    global _db_conn
+    if _db_conn is not None and _db_conn[:2] == (BACKUP_DB_PATH, os.getpid()) and os.path.exists(BACKUP_DB_PATH):
+        conn = _db_conn[2]
+    else:
+        if _db_conn is not None and _db_conn[1] == os.getpid():
+            _db_conn[2].close()  # a parent's connection must not be touched in a forked child
+        conn = _db_open()
+        _db_conn = (BACKUP_DB_PATH, os.getpid(), conn)
+    # FULL syncs the WAL on every commit; EXTRA also syncs the directory when journal files change.
+    conn.execute("PRAGMA synchronous = " + {"none": "OFF", "file": "FULL", "dir": "EXTRA"}[_durability()])
+    return conn
+
+
+def _db_open() -> sqlite3.Connection:
+    """Opens the SQLite backup, creating or migrating the schema. A new database is seeded from the
+    JSON backup if one exists."""
+    is_new = not os.path.exists(BACKUP_DB_PATH)
+    conn = sqlite3.connect(BACKUP_DB_PATH, check_same_thread=False)
+    conn.execute("PRAGMA foreign_keys = ON")
+    if is_new:
+        conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(_DB_SCHEMA)
+    _db_migrate(conn)
+    if is_new and os.path.exists(BACKUP_PATH):
+        tables, to_repeat, _ = _load_backup_files()
+        with conn:
+            _db_write_all(conn, tables, to_repeat)
+    return conn
+
+
+# PRAGMA user_version of the current schema. 2: summary columns on boards. 3: schedule columns on rows.
+# 4: content hash (_board_digest) on boards. 5: version on boards. 6: rows hash (_rows_digest) on boards
+# and the rows_marked index.
+_DB_VERSION = 6
+
+# Schedule columns of rows, in CardSchedule order; NULL for cards never reviewed.
+_DB_SCHEDULE_COLUMNS = ("ease", "interval", "due", "reps", "lapses")
+
+
+def _db_migrate(conn: sqlite3.Connection) -> None:
+    """Brings databases created by older versions up to _DB_VERSION."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= _DB_VERSION:
+        return
+    with conn:
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(boards)")}
+        for column, decl in (
+            ("rows_count", "INTEGER NOT NULL DEFAULT 0"),
+            ("repeat_count", "INTEGER NOT NULL DEFAULT 0"),
+            ("modified", "REAL NOT NULL DEFAULT 0"),
+            ("preview", "TEXT NOT NULL DEFAULT ''"),
+            ("content_hash", "TEXT NOT NULL DEFAULT ''"),
+            ("version", "INTEGER NOT NULL DEFAULT 0"),
+            ("rows_hash", "TEXT NOT NULL DEFAULT ''"),
+        ):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE boards ADD COLUMN {column} {decl}")
+        row_columns = {r[1] for r in conn.execute("PRAGMA table_info(rows)")}
+        for column, decl in zip(_DB_SCHEDULE_COLUMNS, ("REAL", "REAL", "REAL", "INTEGER", "INTEGER")):
+            if column not in row_columns:
+                conn.execute(f"ALTER TABLE rows ADD COLUMN {column} {decl}")
+        # Flagged or reviewed rows of a board, read when only those changed (see _db_update_marks).
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS rows_marked ON rows(board_id, pos) WHERE to_repeat = 1 OR ease IS NOT NULL"
+        )
+        if version < 2:
+            for name in [r[0] for r in conn.execute("SELECT name FROM boards")]:
+                board_id = _db_board_id(conn, name)
+                rows = conn.execute(
+                    "SELECT word, trans, to_repeat FROM rows WHERE board_id = ? ORDER BY pos", (board_id,)
+                ).fetchall()
+                table = [(w, t) for w, t, _ in rows]
+                flagged = [(w, t) for w, t, flag in rows if flag]
+                _db_write_summary(conn, board_id, _board_summary(name, table, flagged, time.time()))
+        conn.execute(f"PRAGMA user_version = {_DB_VERSION}")
+
+
+def _db_write_summary(conn: sqlite3.Connection, board_id: int, summary: BoardSummary) -> None:
+    conn.execute(
+        "UPDATE boards SET rows_count = ?, repeat_count = ?, modified = ?, preview = ?, version = ? WHERE id = ?",
+        (summary.rows, summary.to_repeat, summary.modified, summary.preview, summary.version, board_id),
+    )
+
+
+def _db_list_boards() -> dict[str, BoardSummary]:
+    conn = _db_connect()
+    cur = conn.execute("SELECT name, rows_count, repeat_count, modified, preview, version FROM boards")
+    return {row[0]: BoardSummary(*row) for row in cur}
+
+
+def _db_delete_boards(names: list[str]) -> None:
+    conn = _db_connect()
+    with conn:
+        conn.executemany("DELETE FROM boards WHERE name = ?", ((n,) for n in names))
+
+
+def _db_board_id(conn: sqlite3.Connection, name: str, create: bool = False) -> int | None:
+    if create:
+        conn.execute("INSERT OR IGNORE INTO boards(name) VALUES (?)", (name,))
+    row = conn.execute("SELECT id FROM boards WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def _db_write_board(conn: sqlite3.Connection, name: str, table: Table, to_repeat: list[TableRow]) -> bool:
+    """Writes one board. Rows matched by to_repeat (see _repeat_positions) get the to_repeat flag.
+    Nothing is written if the board's content hash equals the stored one; if only flags or schedules
+    changed (same rows hash), only the rows whose flag or schedule differs are updated. Returns True if written."""
+    board_id = _db_board_id(conn, name, create=True)
+    digest = _board_digest(table, to_repeat)
+    stored, stored_rows, version = conn.execute(
+        "SELECT content_hash, rows_hash, version FROM boards WHERE id = ?", (board_id,)
+    ).fetchone()
+    if stored == digest:
+        return False
+    flagged = set(_repeat_positions(table, to_repeat))
+    schedules = dict(table.schedules()) if isinstance(table, CardStore) else {}
+    rows_digest = _rows_digest(table)
+    if stored_rows == rows_digest:
+        _db_update_marks(conn, board_id, flagged, schedules)
+    else:
+        unscheduled = (None,) * len(_DB_SCHEDULE_COLUMNS)
+        conn.execute("DELETE FROM rows WHERE board_id = ?", (board_id,))
+        conn.executemany(
+            "INSERT INTO rows(board_id, pos, word, trans, to_repeat, ease, interval, due, reps, lapses)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (board_id, i, w, t, int(i in flagged), *schedules.get(i, unscheduled))
+                for i, (w, t) in enumerate(table)
+            ),
+        )
+    repeat_count = len(flagged)
+    _db_write_summary(conn, board_id, BoardSummary(
+        name, len(table), repeat_count, time.time(), _table_display(table, BOARD_PREVIEW_ITEMS), version + 1
+    ))
+    conn.execute("UPDATE boards SET content_hash = ?, rows_hash = ? WHERE id = ?", (digest, rows_digest, board_id))
+    return True
+
+
+def _db_update_marks(
+    conn: sqlite3.Connection, board_id: int, flagged: set[int], schedules: dict[int, CardSchedule]
+) -> None:
+    """Updates to_repeat and schedule columns of the rows (board_id, pos) where they changed. Only rows
+    flagged or scheduled before or after are read (rows_marked index)."""
+    unmarked = (0,) + (None,) * len(_DB_SCHEDULE_COLUMNS)
+    cur = conn.execute(
+        "SELECT pos, to_repeat, ease, interval, due, reps, lapses FROM rows"
+        " WHERE board_id = ? AND (to_repeat = 1 OR ease IS NOT NULL)",
+        (board_id,),
+    )
+    stored = {pos: tuple(marks) for pos, *marks in cur}
+    changed = []
+    for pos in stored.keys() | flagged | schedules.keys():
+        marks = (int(pos in flagged), *schedules.get(pos, unmarked[1:]))
+        if stored.get(pos, unmarked) != marks:
+            changed.append((*marks, board_id, pos))
+    conn.executemany(
+        "UPDATE rows SET to_repeat = ?, ease = ?, interval = ?, due = ?, reps = ?, lapses = ?"
+        " WHERE board_id = ? AND pos = ?",
+        changed,
+    )
+
+
+def _db_write_all(
+    conn: sqlite3.Connection, boards: dict[str, Table], to_repeat_by_name: dict[str, list[TableRow]]
+) -> None:
+    existing = [r[0] for r in conn.execute("SELECT name FROM boards")]
+    conn.executemany("DELETE FROM boards WHERE name = ?", ((n,) for n in existing if n not in boards))
+    for name, table in boards.items():
+        _db_write_board(conn, name, table, to_repeat_by_name.get(name, []))
+
+
+def _db_load_all() -> tuple[dict[str, Table], dict[str, list[TableRow]]]:
+    tables: dict[str, Table] = {}
+    to_repeat: dict[str, list[TableRow]] = {}
+    conn = _db_connect()
+    cur = conn.execute(
+        "SELECT b.name, r.word, r.trans, r.to_repeat, r.ease, r.interval, r.due, r.reps, r.lapses FROM boards b"
+        " LEFT JOIN rows r ON r.board_id = b.id ORDER BY b.name, r.pos"
+    )
+    pool: dict[str, str] = {}
+    for name, word, trans, flag, *schedule in cur:
+        table = tables.setdefault(name, CardStore())
+        flagged = to_repeat.setdefault(name, RepeatRows())
+        if word is None:
+            continue
+        table._append_pooled(word, trans, pool)
+        if flag:
+            flagged.append(table[-1])
+            flagged.positions.append(len(table) - 1)
+        if schedule[0] is not None:
+            table.set_schedule(len(table) - 1, CardSchedule(*schedule))
+    return tables, to_repeat
+
+
+def _db_load_board(name: str) -> tuple[Table, list[TableRow]] | None:
+    """Reads one board; only that board's rows are touched (primary key starts with board_id)."""
+    conn = _db_connect()
+    board_id = _db_board_id(conn, name)
+    if board_id is None:
+        return None
+    cur = conn.execute(
+        "SELECT word, trans, to_repeat, ease, interval, due, reps, lapses FROM rows WHERE board_id = ? ORDER BY pos",
+        (board_id,),
+    )
+    table = CardStore()
+    flagged = RepeatRows()
+    pool: dict[str, str] = {}
+    for word, trans, flag, *schedule in cur:
+        table._append_pooled(word, trans, pool)
+        if flag:
+            flagged.append(table[-1])
+            flagged.positions.append(len(table) - 1)
+        if schedule[0] is not None:
+            table.set_schedule(len(table) - 1, CardSchedule(*schedule))
+    return table, flagged
+
+
+def _db_load_repeat(names: Iterable[str]) -> dict[str, list[TableRow]]:
+    """to_repeat of the named boards, as _db_load_board gives it, reading only their marked rows (rows_marked index)."""
+    conn = _db_connect()
+    out: dict[str, list[TableRow]] = {}
+    for name in names:
+        board_id = _db_board_id(conn, name)
+        if board_id is None:
+            continue
+        cur = conn.execute(
+            "SELECT pos, word, trans, to_repeat FROM rows"
+            " WHERE board_id = ? AND (to_repeat = 1 OR ease IS NOT NULL) ORDER BY pos",
+            (board_id,),
+        )
+        flagged = out[name] = RepeatRows()
+        for pos, word, trans, flag in cur:
+            if flag:
+                flagged.append((word, trans))
+                flagged.positions.append(pos)
+    return out
+
+
+def _db_save_board(name: str, table: Table, to_repeat: list[TableRow]) -> bool:
+    conn = _db_connect()
+    with conn:
+        return _db_write_board(conn, name, table, to_repeat)
+
+
+def _db_save_all(boards: dict[str, Table], to_repeat_by_name: dict[str, list[TableRow]]) -> None:
+    conn = _db_connect()
+    with conn:
+        _db_write_all(conn, boards, to_repeat_by_name)
+
+
+def _dir_manifest_path() -> str:
+    return os.path.join(BACKUP_DIR_PATH, "manifest.json")
+
+
+def _dir_shard_path(file_name: str) -> str:
+    return os.path.join(BACKUP_DIR_PATH, "boards", file_name)
+
+
+# Names _dir_shard_file_name gives; _dir_scan_shards reads only these.
+_DIR_SHARD_FILE = re.compile(r"[0-9a-f]{16}\.json")
+
+
+def _dir_shard_file_name(name: str) -> str:
+    """Board names are free text; shard files are named by a digest of the name."""
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()[:16] + ".json"
+
+
+def _dir_ensure() -> None:
+    """Creates the collection directory; a new one is seeded from the JSON backup if one exists."""
+    if os.path.isdir(BACKUP_DIR_PATH):
+        return
+    os.makedirs(os.path.join(BACKUP_DIR_PATH, "boards"))
+    if os.path.exists(BACKUP_PATH):
+        tables, to_repeat, _ = _load_backup_files()
+        _dir_save_all(tables, to_repeat)
+
+
+def _dir_scan_shards() -> dict[str, dict]:
+    """Rebuilds manifest entries from shard files (each shard stores its board name)."""
+    entries: dict[str, dict] = {}
+    boards_dir = os.path.join(BACKUP_DIR_PATH, "boards")
+    try:
+        files = sorted(os.listdir(boards_dir))
+    except OSError:
+        return {}
+    for file_name in files:
+        if not _DIR_SHARD_FILE.fullmatch(file_name):
+            continue  # e.g. temp files of writes interrupted by older versions (tmp*.json)
+        raw = _read_backup_raw(os.path.join(boards_dir, file_name))
+        if isinstance(raw, dict) and isinstance(raw.get("name"), str):
+            entries[raw["name"]] = {"file": file_name}
+    return entries
+
+
+def _dir_read_manifest() -> dict[str, dict]:
+    """Manifest entries name -> {file, hash}; falls back to manifest .bak generations, then to scanning shards."""
+    path = _dir_manifest_path()
+    for candidate in [path] + _bak_generations(path + ".bak"):
+        raw = _read_backup_raw(candidate)
+        if isinstance(raw, dict) and isinstance(raw.get("boards"), dict):
+            return {
+                k: v for k, v in raw["boards"].items()
+                if isinstance(k, str) and isinstance(v, dict) and isinstance(v.get("file"), str)
+            }
+    return _dir_scan_shards()
+
+
+def _dir_write_manifest(entries: dict[str, dict]) -> None:
+    path = _dir_manifest_path()
+    _rotate_bak(path, path + ".bak")
+    _atomic_write(path, lambda f: json.dump({"boards": entries}, f, ensure_ascii=False, indent=2))
+
+
+_dir_recovered = False  # a shard was restored from .bak since backup_recovered() last reported it
+
+
+def _dir_read_shard(file_name: str) -> tuple[Table, list[TableRow], bool] | None:
+    """Reads one shard; if it is corrupted falls back to its own .bak generations and repairs the shard.
+    Returns (table, to_repeat, recovered_from_bak) or None if no copy is usable."""
+    global _dir_recovered
+    path = _dir_shard_path(file_name)
+    candidates = [(path, False)] + [(bak, True) for bak in _bak_generations(path + ".bak")]
+    for candidate, recovered in candidates:
+        raw = _read_backup_raw(candidate)
+        board = _parse_board_payload(raw) if isinstance(raw, dict) else None
+        if board is None:
+            continue
+        if recovered:
+            try:
+                _atomic_write(
+                    path,
+                    lambda f: json.dump(raw, f, ensure_ascii=False, indent=_format_indent(BACKUP_FORMAT)),
+                    BACKUP_FORMAT,
+                )
+            except OSError:
+                pass
+            _dir_recovered = True
+        return board[0], board[1], recovered
+    return None
+
+
+def _dir_load_all() -> tuple[dict[str, Table], dict[str, list[TableRow]], bool]:
+    global _dir_recovered
+    _dir_ensure()
+    tables: dict[str, Table] = {}
+    to_repeat: dict[str, list[TableRow]] = {}
+    for name, entry in _dir_read_manifest().items():
+        shard = _dir_read_shard(entry["file"])
+        if shard is None:
+            continue
+        tables[name], to_repeat[name], _ = shard
+    recovered, _dir_recovered = _dir_recovered, False
+    return tables, to_repeat, recovered
+
+
+def _dir_load_board(name: str) -> tuple[Table, list[TableRow]] | None:
+    """Reads one board's shard, found through the manifest, without reading the others."""
+    _dir_ensure()
+    entry = _dir_read_manifest().get(name)
+    shard = _dir_read_shard(entry["file"]) if entry is not None else None
+    return (shard[0], shard[1]) if shard is not None else None
+
+
+def _dir_write_board(entries: dict[str, dict], name: str, table: Table, to_repeat: list[TableRow]) -> bool:
+    """Writes one shard unless its content hash matches the manifest. Returns True if written."""
+    text = json.dumps(
+        {"name": name, **_board_payload(table, to_repeat)}, ensure_ascii=False, indent=_format_indent(BACKUP_FORMAT)
+    )
+    digest = hashlib.sha1((BACKUP_FORMAT + text).encode("utf-8")).hexdigest()
+    entry = entries.get(name) or {"file": _dir_shard_file_name(name)}
+    path = _dir_shard_path(entry["file"])
+    if entry.get("hash") == digest and os.path.exists(path):
+        return False
+    _rotate_bak(path, path + ".bak")
+    _atomic_write(path, lambda f: f.write(text), BACKUP_FORMAT)
+    version = entry.get("version")
+    summary = _board_summary(name, table, to_repeat, time.time(), (version if type(version) is int else 0) + 1)
+    entries[name] = {"file": entry["file"], "hash": digest, **_summary_to_entry(summary)}
+    return True
+
+
+def _dir_list_boards() -> dict[str, BoardSummary]:
+    """Summaries from the manifest; shards are read only for entries without one (e.g. rebuilt manifest)."""
+    _dir_ensure()
+    out: dict[str, BoardSummary] = {}
+    for name, entry in _dir_read_manifest().items():
+        summary = _summary_from_entry(name, entry)
+        if summary is None:
+            shard = _dir_read_shard(entry["file"])
+            if shard is None:
+                continue
+            path = _dir_shard_path(entry["file"])
+            summary = _board_summary(name, shard[0], shard[1], os.path.getmtime(path))
+        out[name] = summary
+    return out
+
+
+def _dir_delete_boards(names: list[str]) -> None:
+    _dir_ensure()
+    entries = _dir_read_manifest()
+    removed = [entries.pop(name) for name in names if name in entries]
+    if removed:
+        _dir_write_manifest(entries)
+    for entry in removed:
+        _dir_remove_board(entry)
+
+
+def _dir_remove_board(entry: dict) -> None:
+    path = _dir_shard_path(entry["file"])
+    for p in [path] + _bak_generations(path + ".bak"):
+        try:
+            os.unlink(p)
+        except OSError:
+            pass
+
+
+def _dir_save_all(boards: dict[str, Table], to_repeat_by_name: dict[str, list[TableRow]]) -> None:
+    """Writes only boards whose content changed; removes shards of boards no longer present."""
+    os.makedirs(os.path.join(BACKUP_DIR_PATH, "boards"), exist_ok=True)
+    entries = _dir_read_manifest()
+    changed = False
+    for name in [n for n in entries if n not in boards]:
+        _dir_remove_board(entries.pop(name))
+        changed = True
+    for name, table in boards.items():
+        changed = _dir_write_board(entries, name, table, to_repeat_by_name.get(name, [])) or changed
+    if changed or not os.path.exists(_dir_manifest_path()):
+        _dir_write_manifest(entries)
+
+
+def _dir_save_board(name: str, table: Table, to_repeat: list[TableRow]) -> bool:
+    _dir_ensure()
+    entries = _dir_read_manifest()
+    if not _dir_write_board(entries, name, table, to_repeat):
+        return False
+    _dir_write_manifest(entries)
+    return True
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _search_text(row: TableRow) -> str:
+    return f"{row[0]}\n{row[1]}".casefold()
+
+
+class SearchIndex:
+    """Trigram inverted index over the words and translations of every board.
+
+    Built on the first search from load_backup(), then kept current by save_board / save_backup /
+    delete_boards (only boards whose rows changed are re-indexed). Every card is a document id and
+    a board's ids are contiguous; postings are arrays of ids in ascending order. Re-indexing a board
+    retires its old ids, which stay in the postings and are skipped, until more than half of all ids
+    are retired and the index is rebuilt from the live boards."""
+
+    def __init__(self) -> None:
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drops the index; the next search rebuilds it."""
+        self._built = False
+        self._postings: dict[str, array] = {}
+        self._docs: list[tuple[str, TableRow] | None] = []  # id -> (board, row); None once retired
+        self._boards: dict[str, range] = {}
+        self._retired = 0
+
+    def _ensure(self) -> None:
+        if self._built and BACKUP_BACKEND != "sqlite" and not _backup_store.is_fresh():
+            self.invalidate()  # files changed outside this process's own saves
+        if self._built:
+            return
+        tables, _, _ = _load_backup_shared()
+        for name, table in tables.items():
+            self._add(name, table)
+        self._built = True
+
+    def _add(self, name: str, table: Table) -> None:
+        start = len(self._docs)
+        postings = self._postings
+        for doc, row in enumerate(table, start):
+            row = tuple(row)
+            self._docs.append((name, row))
+            for gram in _trigrams(_search_text(row)):
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = array("I")
+                ids.append(doc)
+        self._boards[name] = range(start, len(self._docs))
+
+    def _retire(self, name: str) -> None:
+        ids = self._boards.pop(name, None)
+        if ids is None:
+            return
+        for doc in ids:
+            self._docs[doc] = None
+        self._retired += len(ids)
+        if self._retired * 2 > len(self._docs):
+            live = {n: [self._docs[d][1] for d in r] for n, r in self._boards.items()}
+            self.invalidate()
+            for n, rows in live.items():
+                self._add(n, rows)
+            self._built = True
+
+    def board_rows(self, name: str) -> list[TableRow] | None:
+        ids = self._boards.get(name)
+        return None if ids is None else [self._docs[d][1] for d in ids]
+
+    def put_board(self, name: str, table: Table) -> None:
+        if not self._built or self.board_rows(name) == table:
+            return
+        self._retire(name)
+        self._add(name, table)
+
+    def drop_board(self, name: str) -> None:
+        if self._built:
+            self._retire(name)
+
+    def replace_all(self, boards: dict[str, Table]) -> None:
+        if not self._built:
+            return
+        for name in [n for n in self._boards if n not in boards]:
+            self._retire(name)
+        for name, table in boards.items():
+            self.put_board(name, table)
+
+    def search(self, query: str, limit: int) -> list[tuple[str, TableRow]]:
+        """Up to `limit` (board, row) pairs whose word or translation contains `query` (case-insensitive)."""
+        self._ensure()
+        needle = query.strip().casefold()
+        if not needle:
+            return []
+        grams = _trigrams(needle)
+        if grams:
+            postings = [self._postings.get(g) for g in grams]
+            if not all(postings):
+                return []
+            candidates: Iterable[int] = min(postings, key=len)
+        else:
+            candidates = range(len(self._docs))  # shorter than a trigram: scan
+        hits: list[tuple[str, TableRow]] = []
+        for doc in candidates:
+            entry = self._docs[doc]
+            if entry is not None and needle in _search_text(entry[1]):
+                hits.append(entry)
+                if len(hits) >= limit:
+                    break
+        return hits
+
+
+_search_index = SearchIndex()
+
+
+@_storage_locked
+def search_cards(query: str, limit: int = 50) -> list[tuple[str, TableRow]]:
+    """Cards of all boards whose word or translation contains `query`, as (board, (word, trans))."""
+    return _search_index.search(query, limit)
+
+
+@_storage_locked
+def import_json_backup(path: str) -> None:
+    """Replaces the active backup (any backend) with the contents of a JSON backup file.
+    Raises FileNotFoundError / ValueError, leaving the backup as it was, if the file is missing or unreadable."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No such file: {path}")
+    parsed = _stream_backup(path)
+    if parsed is None:
+        raise ValueError(f"Not a NeoAnki backup: {path}")
+    save_backup(parsed[0], parsed[1])
+
+
+@_storage_locked
+def export_json_backup(path: str) -> None:
+    """Writes the active backup (any backend) out as a JSON backup file (same format as neoanki_backup.json)."""
+    tables, to_repeat, _ = _load_backup_shared()
+    with open(path, "w", encoding="utf-8") as f:
+        _write_backup_stream(f, tables, to_repeat)
+
+
+class _BoardBase(NamedTuple):
+    """What this process last read or wrote for a board: the version in the files at that point and
+    the content the caller had. `clean` is False after a merge, when the files hold more than that."""
+    version: int
+    table: CardStore
+    to_repeat: list[TableRow]
+    clean: bool
+
+
+# (backup location, board name) -> _BoardBase, set by load_board / save_board / save_backup.
+_board_bases: dict[tuple[str, str], _BoardBase] = {}
+
+
+def _backup_location() -> str:
+    """Path of the backup in use (file, directory or database), which also names its lock file."""
+    return {"sqlite": BACKUP_DB_PATH, "dir": BACKUP_DIR_PATH}.get(BACKUP_BACKEND, BACKUP_PATH)
+
+
+def _merged_count(base: int, ours: int, theirs: int) -> int:
+    """How many copies of a row to keep; if both sides added (or both removed) it, the larger change wins."""
+    d_ours, d_theirs = ours - base, theirs - base
+    if d_ours > 0 and d_theirs > 0:
+        return base + max(d_ours, d_theirs)
+    if d_ours < 0 and d_theirs < 0:
+        return base + min(d_ours, d_theirs)
+    return max(0, base + d_ours + d_theirs)
+
+
+def _merge_rows(base: Iterable[TableRow], ours: list[TableRow], theirs: list[TableRow]) -> list[TableRow]:
+    """Three-way merge of row lists as multisets: rows in theirs' order, then rows only we added in ours.
+    Returns plain rows; RepeatRows positions are not carried over."""
+    b, o, t = Counter(base), Counter(ours), Counter(theirs)
+    left = {row: _merged_count(b[row], o[row], t[row]) for row in o.keys() | t.keys()}
+    out: list[TableRow] = []
+    for row in theirs + ours:
+        if left.get(row, 0) > 0:
+            left[row] -= 1
+            out.append(row)
+    return out
+
+
+def _merge_board(
+    base: _BoardBase, table: Table, to_repeat: list[TableRow], their_table: Table, their_to_repeat: list[TableRow]
+) -> tuple[CardStore, list[TableRow]]:
+    """Merges a board changed here (table, to_repeat) and elsewhere (theirs) since `base`, row by row:
+    rows added or removed on either side are added or removed, and so are to_repeat marks. A card
+    keeps our schedule if we reviewed it since `base`, else theirs. The merged to_repeat is a plain
+    list: RepeatRows positions point into the tables before the merge, so of equal rows in the merged
+    table the first ones are flagged (see _repeat_positions)."""
+    rows = _merge_rows(base.table, list(table), list(their_table))
+    merged = CardStore(rows)
+
+    def schedules(cards: Table) -> dict[TableRow, CardSchedule]:
+        if not isinstance(cards, CardStore):
+            return {}
+        out: dict[TableRow, CardSchedule] = {}
+        for i, s in cards.schedules():
+            out.setdefault(cards[i], s)
+        return out
+    base_s, ours_s, theirs_s = schedules(base.table), schedules(table), schedules(their_table)
+    if ours_s or theirs_s:
+        for i, row in enumerate(merged):
+            mine = ours_s.get(row)
+            s = mine if mine != base_s.get(row) else theirs_s.get(row)
+            if s is not None:
+                merged.set_schedule(i, s)
+    return merged, _merge_rows(base.to_repeat, list(to_repeat), list(their_to_repeat))
+
+
+@_storage_locked
+def load_backup() -> tuple[dict[str, Table], dict[str, list[TableRow]], bool]:
+    """Loads backup; if main file is corrupted tries .bak. Repairs main from .bak if needed.
+    Served from the in-process BackupStore; files are re-parsed only after they change on disk.
+    Returns (tables, to_repeat_by_name, recovered_from_bak)."""
+    if BACKUP_BACKEND == "sqlite":
+        tables, to_repeat = _db_load_all()
+        return tables, to_repeat, False
+    return _backup_store.load()
+
+
+@_storage_locked
+def _load_backup_shared() -> tuple[dict[str, Table], dict[str, list[TableRow]], bool]:
+    """load_backup() for read-only callers: JSON and dir tables are shared with the BackupStore, not copied."""
+    if BACKUP_BACKEND == "sqlite":
+        return load_backup()
+    return _backup_store.load(shared=True)
+
+
+@_storage_locked
+def backup_recovered() -> bool:
+    """True if the backup had to be restored from a .bak copy; each recovery is reported once. Reads only
+    what telling takes: the JSON backup is loaded (into the BackupStore, which then serves the session),
+    while directory shards are checked as they are read, so only shards read so far count. SQLite keeps
+    no .bak copies."""
+    global _dir_recovered
+    if BACKUP_BACKEND == "sqlite":
+        return False
+    if BACKUP_BACKEND == "dir":
+        _dir_ensure()
+        recovered, _dir_recovered = _dir_recovered, False
+        return recovered
+    return _backup_store.load(shared=True)[2]
+
+
+@_storage_locked
+def load_board(name: str) -> tuple[Table, list[TableRow]] | None:
+    """Loads one board as (table, to_repeat); None if there is no such board.
+    The returned table is a copy, safe to shuffle or edit in place."""
+    board = _read_board(name)
+    if board is not None:
+        _board_bases[(_backup_location(), name)] = _BoardBase(
+            _board_version(name) or 0, CardStore(board[0]), _copy_repeat(board[1]), True
+        )
+    return board
+
+
+def _read_board(name: str) -> tuple[Table, list[TableRow]] | None:
+    if BACKUP_BACKEND == "sqlite":
+        return _db_load_board(name)
+    if BACKUP_BACKEND == "dir" and not _backup_store.is_fresh():
+        return _dir_load_board(name)
+    tables, to_repeat, _ = _load_backup_shared()
+    if name not in tables:
+        return None
+    return CardStore(tables[name]), _copy_repeat(to_repeat.get(name, []))
+
+
+def _merge_if_stale(
+    name: str, table: Table, to_repeat: list[TableRow], current: int | None
+) -> tuple[Table, list[TableRow], bool]:
+    """If another process changed the board since this one last read or wrote it (its stored version
+    `current` moved, or our last save was merged), returns the merge of that and ours; else ours.
+    Third item: merged."""
+    base = _board_bases.get((_backup_location(), name))
+    if base is None or current is None or (current == base.version and base.clean):
+        return table, to_repeat, False
+    theirs = _read_board(name)
+    if theirs is None:
+        return table, to_repeat, False
+    merged_table, merged_to_repeat = _merge_board(base, table, to_repeat, *theirs)
+    return merged_table, merged_to_repeat, True
+
+
+@_storage_locked
+def save_board(name: str, table: Table, to_repeat: list[TableRow]) -> None:
+    """Persists one board without rewriting the others (journal append, one SQLite transaction, or one shard).
+    Writes nothing if the board's content hash matches what is already stored. Changes another process
+    saved since this one loaded the board are merged in (see _merge_board) rather than overwritten."""
+    if not isinstance(name, str) or not _validate_table(table) or not _validate_table(to_repeat):
+        raise ValueError("Invalid backup structure")
+    current = _board_version(name)
+    version = current or 0
+    base = _BoardBase(version, CardStore(table), _copy_repeat(to_repeat), True)
+    table, to_repeat, merged = _merge_if_stale(name, table, to_repeat, current)
+    if _write_board(name, table, to_repeat, version + 1):
+        version += 1
+    _board_bases[(_backup_location(), name)] = base._replace(version=version, clean=not merged)
+
+
+def _write_board(name: str, table: Table, to_repeat: list[TableRow], version: int) -> bool:
+    """Writes one board as `version` unless its content hash matches the stored one. Returns True if written."""
+    if BACKUP_BACKEND == "sqlite":
+        written = _db_save_board(name, table, to_repeat)  # compares the hash stored with the board
+    else:
+        digest = _board_digest(table, to_repeat)
+        if _backup_store.board_digest(name) == digest:
+            return False
+        if BACKUP_BACKEND == "json":
+            journal_board(name, table, to_repeat, digest, version)
+            return True
+        was_fresh = _backup_store.is_fresh()
+        written = _dir_save_board(name, table, to_repeat)
+        _backup_store.put_board(name, table, to_repeat, was_fresh, digest)
+    if written:
+        _search_index.put_board(name, table)
+    return written
+
+
+def _summaries_for_save(
+    boards: dict[str, Table], to_repeat_by_name: dict[str, list[TableRow]], previous: dict[str, BoardSummary]
+) -> dict[str, BoardSummary]:
+    """Summaries for a full save; boards that did not change keep their previous modification time and version."""
+    now = time.time()
+    unchanged = _backup_store.unchanged_boards(boards, to_repeat_by_name)
+    out: dict[str, BoardSummary] = {}
+    for name, table in boards.items():
+        prev = previous.get(name)
+        if prev is not None and name in unchanged:
+            modified, version = prev.modified, prev.version
+        else:
+            modified, version = now, (prev.version if prev is not None else 0) + 1
+        out[name] = _board_summary(name, table, to_repeat_by_name.get(name, []), modified, version)
+    return out
+
+
+def _json_read_index_raw() -> dict | None:
+    """The parsed index file, or None if missing or not written for the current main file."""
+    raw = _read_backup_raw(BACKUP_INDEX_PATH)
+    source = _file_signature(BACKUP_PATH)
+    if not isinstance(raw, dict) or source is None or raw.get("source") != list(source):
+        return None
+    return raw
+
+
+def _json_read_index() -> dict[str, BoardSummary] | None:
+    """Index entries, or None if missing or not written for the current main file."""
+    raw = _json_read_index_raw()
+    if raw is None:
+        return None
+    entries = raw.get("boards")
+    if not isinstance(entries, dict):
+        return None
+    out: dict[str, BoardSummary] = {}
+    for name, entry in entries.items():
+        summary = _summary_from_entry(name, entry)
+        if summary is None:
+            return None
+        out[name] = summary
+    return out
+
+
+def _json_read_hashes() -> dict[str, str] | None:
+    """_board_digest of every board in the main file, as recorded by the save that wrote it in the
+    current BACKUP_FORMAT; None if unknown."""
+    raw = _json_read_index_raw()
+    if raw is None or raw.get("format") != BACKUP_FORMAT or not isinstance(raw.get("hashes"), dict):
+        return None
+    return raw["hashes"]
+
+
+def _json_write_index(summaries: dict[str, BoardSummary], hashes: dict[str, str] | None = None) -> None:
+    """Writes the index for the current main file (its stat signature marks the index as valid).
+    `hashes` (board name -> _board_digest) lets the next save_backup skip rewriting identical content."""
+    source = _file_signature(BACKUP_PATH)
+    if source is None:
+        return
+    payload = {"source": list(source), "boards": {n: _summary_to_entry(s) for n, s in summaries.items()}}
+    if hashes is not None:
+        payload["format"] = BACKUP_FORMAT
+        payload["hashes"] = hashes
+    try:
+        _atomic_write(BACKUP_INDEX_PATH, lambda f: json.dump(payload, f, ensure_ascii=False), durable=False)
+    except OSError:
+        pass
+
+
+def _json_list_boards() -> dict[str, BoardSummary]:
+    """Summaries from the index plus journal records; parses the backup only if the index is stale."""
+    summaries = _json_read_index()
+    if summaries is None:
+        tables, to_repeat, _ = _load_backup_shared()
+        modified = os.path.getmtime(BACKUP_PATH) if os.path.exists(BACKUP_PATH) else time.time()
+        summaries = {n: _board_summary(n, t, to_repeat.get(n, []), modified) for n, t in tables.items()}
+        if not os.path.exists(BACKUP_JOURNAL_PATH):
+            _json_write_index(summaries)
+            return summaries
+        versions: dict[str, int] = {}  # the main file has no versions; the journal does
+        for rec in _read_journal(BACKUP_JOURNAL_PATH):
+            if rec.get("op") in ("put", "edit") and isinstance(rec.get("name"), str):
+                version = rec.get("version")
+                versions[rec["name"]] = version if type(version) is int else versions.get(rec["name"], 0) + 1
+        return {n: s._replace(version=versions.get(n, 0)) for n, s in summaries.items()}
+    for rec in _read_journal(BACKUP_JOURNAL_PATH):
+        name = rec.get("name")
+        if not isinstance(name, str):
+            continue
+        ts = rec.get("ts") if isinstance(rec.get("ts"), (int, float)) else time.time()
+        if rec.get("op") == "put":
+            board = _parse_board_payload(rec)
+            if board is not None:
+                version = rec.get("version")
+                if type(version) is not int:  # journals written before versions
+                    version = summaries[name].version + 1 if name in summaries else 1
+                summaries[name] = _board_summary(name, board[0], board[1], ts, version)
+        elif rec.get("op") == "edit" and name in summaries:
+            rows, repeat, preview = rec.get("rows"), rec.get("repeat"), rec.get("preview")
+            if type(rows) is int and type(repeat) is int and isinstance(preview, str):
+                version = rec.get("version")
+                version = version if type(version) is int else summaries[name].version + 1
+                summaries[name] = BoardSummary(name, rows, repeat, ts, preview, version)
+        elif rec.get("op") == "del":
+            summaries.pop(name, None)
+    return summaries
+
+
+class _JournalVersions:
+    """Board versions of the JSON backup, for saves that need only those. Read once from the index and
+    journal (see _json_list_boards), then caught up from where they stopped: only journal records
+    appended since are read, like _EventTotals.catch_up. Starts over when the main file is rewritten."""
+
+    __slots__ = ("versions", "source", "offset")
+
+    def __init__(self) -> None:
+        self.versions: dict[str, int] = {}
+        self.source: tuple | None = None  # main file path and _file_signature the versions were read for
+        self.offset = 0
+
+    def current(self) -> dict[str, int]:
+        # Callers hold the storage lock.
+        source = (BACKUP_PATH, _file_signature(BACKUP_PATH))
+        size = os.path.getsize(BACKUP_JOURNAL_PATH) if os.path.exists(BACKUP_JOURNAL_PATH) else 0
+        if source != self.source or size < self.offset:
+            self.versions = {n: s.version for n, s in _json_list_boards().items()}
+            self.source, self.offset = source, size
+        elif size > self.offset:
+            with open(BACKUP_JOURNAL_PATH, "rb") as f:
+                f.seek(self.offset)
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn line
+                    name = rec.get("name") if isinstance(rec, dict) else None
+                    if not isinstance(name, str):
+                        continue
+                    if rec.get("op") == "del":
+                        self.versions.pop(name, None)
+                    elif rec.get("op") == "edit" or rec.get("op") == "put" and isinstance(rec.get("table"), list):
+                        version = rec.get("version")
+                        self.versions[name] = version if type(version) is int else self.versions.get(name, 0) + 1
+            self.offset = size
+        return self.versions
+
+
+_journal_versions = _JournalVersions()
+
+
+def _board_version(name: str) -> int | None:
+    """Stored version of one board; None if there is no such board."""
+    if BACKUP_BACKEND == "json":
+        return _journal_versions.current().get(name)
+    summary = _list_summaries().get(name)
+    return summary.version if summary is not None else None
+
+
+@_storage_locked
+def list_boards() -> list[BoardSummary]:
+    """Board summaries sorted by name, read from the persisted index/manifest instead of the tables."""
+    summaries = _list_summaries()
+    return [summaries[name] for name in sorted(summaries)]
+
+
+def _list_summaries() -> dict[str, BoardSummary]:
+    if BACKUP_BACKEND == "sqlite":
+        return _db_list_boards()
+    if BACKUP_BACKEND == "dir":
+        return _dir_list_boards()
+    return _json_list_boards()
+
+
+@_storage_locked
+def delete_boards(names: list[str]) -> None:
+    """Removes boards without rewriting the remaining ones."""
+    for name in names:
+        _board_bases.pop((_backup_location(), name), None)
+    if BACKUP_BACKEND == "sqlite":
+        _db_delete_boards(names)
+    elif BACKUP_BACKEND == "dir":
+        was_fresh = _backup_store.is_fresh()
+        _dir_delete_boards(names)
+        for name in names:
+            _backup_store.drop_board(name, was_fresh)
+    else:
+        for name in names:
+            journal_delete(name)
+        return
+    for name in names:
+        _search_index.drop_board(name)
+
+
+@_storage_locked
+def save_backup(boards: dict[str, Table], to_repeat_by_name: dict[str, list[TableRow]] | None = None) -> None:
+    """Saves backup: each board is one object { table, to_repeat }. If to_repeat_by_name is None, keeps current from file.
+    Boards whose content hash is unchanged are not rewritten (SQLite rows, shards); the JSON file is left
+    alone if no board changed. Boards loaded with load_board that another process has changed since are
+    merged as in save_board."""
+    if not isinstance(boards, dict):
+        raise ValueError("Invalid backup structure")
+    for k, v in boards.items():
+        if not isinstance(k, str) or not _validate_table(v):
+            raise ValueError("Invalid backup structure")
+    if to_repeat_by_name is None:
+        if BACKUP_BACKEND == "sqlite":
+            to_repeat_by_name = _db_load_repeat(boards)
+        else:
+            _, to_repeat_by_name, _ = _load_backup_shared()
+    location = _backup_location()
+    summaries = _list_summaries()
+    submitted = {}
+    boards, to_repeat_by_name = dict(boards), dict(to_repeat_by_name)
+    for name in boards:
+        if (location, name) in _board_bases:
+            table, to_repeat = boards[name], to_repeat_by_name.get(name, [])
+            submitted[name] = (CardStore(table), _copy_repeat(to_repeat))
+            current = summaries[name].version if name in summaries else None
+            boards[name], to_repeat_by_name[name], merged = _merge_if_stale(name, table, to_repeat, current)
+            submitted[name] += (merged,)
+    _write_all(boards, to_repeat_by_name)
+    summaries = _list_summaries()
+    for key in [k for k in _board_bases if k[0] == location and k[1] not in boards]:
+        del _board_bases[key]
+    for name, (table, to_repeat, merged) in submitted.items():
+        _board_bases[(location, name)] = _BoardBase(summaries[name].version, table, to_repeat, not merged)
+
+
+def _write_all(boards: dict[str, Table], to_repeat_by_name: dict[str, list[TableRow]]) -> None:
+    """The writing half of save_backup (no merging)."""
+    if BACKUP_BACKEND == "sqlite":
+        _db_save_all(boards, to_repeat_by_name)
+        _search_index.replace_all(boards)
+        return
+    if BACKUP_BACKEND == "dir":
+        _dir_save_all(boards, to_repeat_by_name)
+        _backup_store.replace_all(boards, to_repeat_by_name)
+        _search_index.replace_all(boards)
+        return
+    # Boards the store already holds keep their digest; the rest are hashed while they are written.
+    hashes = _backup_store.cached_digests(_backup_store.unchanged_boards(boards, to_repeat_by_name))
+    if not os.path.exists(BACKUP_JOURNAL_PATH) and len(hashes) == len(boards) and _json_read_hashes() == hashes:
+        return
+    summaries = _summaries_for_save(boards, to_repeat_by_name, _json_list_boards())
+    _rotate_bak(BACKUP_PATH, BACKUP_BACKUP_PATH)
+    _atomic_write(
+        BACKUP_PATH,
+        lambda f: _write_backup_stream(f, boards, to_repeat_by_name, _format_indent(BACKUP_FORMAT), hashes),
+        BACKUP_FORMAT,
+    )
+    # Main file now holds everything the journal recorded.
+    try:
+        os.unlink(BACKUP_JOURNAL_PATH)
+    except OSError:
+        pass
+    _backup_store.replace_all(boards, to_repeat_by_name, hashes)
+    _search_index.replace_all(boards)
+    _json_write_index(summaries, hashes)
+
+
+def journal_board(
+    name: str, table: Table, to_repeat: list[TableRow], digest: str | None = None, version: int | None = None
+) -> None:
+    """Appends one board to the journal instead of rewriting the whole backup: only what changed since
+    the stored board (an "edit" record, see _board_delta) when the BackupStore holds it, else a snapshot.
+    Compacts into the main file once the journal grows past JOURNAL_COMPACT_BYTES."""
+    if not isinstance(name, str) or not _validate_table(table) or not _validate_table(to_repeat):
+        raise ValueError("Invalid backup structure")
+    was_fresh = _backup_store.is_fresh()
+    record = {"op": "put", "name": name, "ts": time.time()}
+    if version is not None:
+        record["version"] = version
+    stored = _backup_store.stored_board(name)
+    delta = _board_delta(*stored, table, to_repeat) if stored is not None else None
+    if delta is not None:
+        record["op"] = "edit"
+        record.update(delta)
+    else:
+        record.update(_board_payload(table, to_repeat))
+    _journal_append(record)
+    _backup_store.put_board(name, table, to_repeat, was_fresh, digest)
+    _search_index.put_board(name, table)
+
+
+def journal_delete(name: str) -> None:
+    """Appends removal of one board to the journal."""
+    was_fresh = _backup_store.is_fresh()
+    _journal_append({"op": "del", "name": name, "ts": time.time()})
+    _backup_store.drop_board(name, was_fresh)
+    _search_index.drop_board(name)
+
+
+def _journal_append(record: dict) -> None:
+    """Appends one record line to the journal; compacts once it grows past JOURNAL_COMPACT_BYTES."""
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+    level = _durability()
+    is_new = not os.path.exists(BACKUP_JOURNAL_PATH)
+    with open(BACKUP_JOURNAL_PATH, "ab+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                # Previous append was torn (crash mid-write): start on a fresh line.
+                line = "\n" + line
+        f.write(line.encode("utf-8"))
+        size = f.tell()
+        if level != "none":
+            f.flush()
+            os.fsync(f.fileno())
+    if is_new and level == "dir":
+        _fsync_dir(BACKUP_JOURNAL_PATH)
+    if size >= JOURNAL_COMPACT_BYTES:
+        compact_journal()
+
+
+@_storage_locked
+def compact_journal() -> None:
+    """Folds journal records into the main backup file (full save) and removes the journal."""
+    if BACKUP_BACKEND != "json" or not os.path.exists(BACKUP_JOURNAL_PATH):
+        return
+    tables, to_repeat, _ = _load_backup_shared()
+    _write_all(tables, to_repeat)
+
 
-import questionary
+class SaveWorker:
+    """Background thread that persists boards off the UI thread.
 
-BACKUP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "neoanki_backup.json")
-BACKUP_BACKUP_PATH = BACKUP_PATH + ".bak"
+    submit() only records a snapshot of the board; the thread writes it with save_board() once no
+    further change has arrived for SAVE_DEBOUNCE_SECONDS, so a burst of edits to one board becomes a
+    single write. flush() waits for everything submitted so far. Write errors are kept for the UI
+    (take_errors) instead of being raised on the worker thread."""
 
-# ANSI: bold + color for backup list titles; yellow for "to repeat"
-_BOLD_CYAN = "\033[1m\033[36m"
-_YELLOW = "\033[1;33m"
-_RESET = "\033[0m"
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._pending: dict[str, tuple[Table, list[TableRow]]] = {}
+        self._errors: list[str] = []
+        self._busy = False
+        self._flush_requested = False
+        self._last_submit = 0.0
+        self._thread: threading.Thread | None = None
 
-# Table = list of pairs (word, translation). Translation can be "".
-TableRow = tuple[str, str]
-Table = list[TableRow]
+    def submit(self, name: str, table: Table, to_repeat: list[TableRow]) -> None:
+        with self._cond:
+            self._pending[name] = (CardStore(table), _copy_repeat(to_repeat))
+            self._last_submit = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="neoanki-save", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
 
+    def flush(self) -> None:
+        """Writes pending boards now (skipping the debounce) and waits until they are on disk."""
+        with self._cond:
+            if not self._pending and not self._busy:
+                return
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._busy:
+                self._cond.wait()
 
-def _row_to_display(row: TableRow | str) -> str:
-    """Accepts (word, trans) or legacy: single string (treated as word without translation)."""
-    if isinstance(row, str):
-        return row
-    w, t = row
-    return f"{w} ({t})" if t else w
+    def take_errors(self) -> list[str]:
+        """Returns and clears messages of failed writes."""
+        with self._cond:
+            errors, self._errors = self._errors, []
+        return errors
 
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                while not self._flush_requested:
+                    remaining = self._last_submit + SAVE_DEBOUNCE_SECONDS - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, {}
+                self._busy = True
+            errors = []
+            for name, (table, to_repeat) in batch.items():
+                try:
+                    save_board(name, table, to_repeat)
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+            with self._cond:
+                self._errors.extend(errors)
+                self._busy = False
+                if not self._pending:
+                    self._flush_requested = False
+                self._cond.notify_all()
 
-def _table_display(table: Table, max_items: int | None = None) -> str:
-    part = table[:max_items] if max_items else table
-    return ", ".join(_row_to_display(r) for r in part) + ("..." if max_items and len(table) > max_items else "")
 
+_save_worker = SaveWorker()
+atexit.register(_save_worker.flush)
 
-def _table_display_words_only(table: Table, max_items: int | None = None) -> str:
-    """Words only (no translations) — for shuffle view."""
-    part = table[:max_items] if max_items else table
-    return ", ".join(r[0] for r in part) + ("..." if max_items and len(table) > max_items else "")
 
+class CardStats(NamedTuple):
+    """Totals of one card (board, word, translation) over the event log."""
+    board: str
+    word: str
+    translation: str
+    reviews: int  # translation revealed
+    misses: int  # marked to repeat
+    last_seen: float  # time of the last reveal or mark, 0 if none
 
-def _table_display_with_revealed(
-    table: Table, revealed: int, to_repeat: set[TableRow] | None = None
-) -> str:
-    """Numbered list: first `revealed` with translation, rest word only. Rows in to_repeat are yellow."""
-    if not table:
-        return "(empty)"
-    to_repeat = to_repeat or set()
-    width = len(str(len(table)))
-    lines: list[str] = []
-    for i, r in enumerate(table):
-        text = _row_to_display(r) if i < revealed else r[0]
-        line = f"  {i + 1:>{width}}. {text}"
-        if r in to_repeat:
-            line = f"  {i + 1:>{width}}. {_YELLOW}{text}{_RESET}"
-        lines.append(line)
-    header = "─" * (width + 4)
-    return f"  {header}\n" + "\n".join(lines) + f"\n  {header}"
+    @property
+    def miss_rate(self) -> float:
+        return self.misses / max(self.reviews, self.misses, 1)
 
 
-def _print_backup_list(backup: dict[str, Table]) -> None:
-    """Prints backup list: title (bold, colored), below table elements."""
-    for name in sorted(backup.keys()):
-        table = backup[name]
-        print(f"{_BOLD_CYAN}{name}{_RESET}")
-        for word, trans in table:
-            print(f"    {word}: {trans if trans else '(no translation)'}")
-        print()
+class BoardStats(NamedTuple):
+    """Totals of one board over the event log; cards removed from it still count."""
+    name: str
+    reviews: int
+    misses: int
+    last_seen: float
 
+    @property
+    def miss_rate(self) -> float:
+        return self.misses / max(self.reviews, self.misses, 1)
 
-def format_translations_display(table: Table) -> str:
-    """Returns display text: each row '  word: trans' or '  word: (no translation)' in table order."""
-    lines = [
-        f"  {word}: {trans if trans else '(no translation)'}"
-        for word, trans in table
-    ]
-    return "\n".join(lines)
 
+class _EventTotals:
+    """Per-card and per-board [reviews, misses, last_seen] of the log up to `offset` bytes."""
 
-def _parse_table_cell(cell: str) -> TableRow:
-    cell = cell.strip()
-    if "|" in cell:
-        w, _, t = cell.partition("|")
-        return (w.strip(), t.strip())
-    return (cell, "")
+    __slots__ = ("cards", "boards", "offset")
 
+    def __init__(self) -> None:
+        self.cards: dict[str, dict[TableRow, list]] = {}
+        self.boards: dict[str, list] = {}
+        self.offset = 0
 
-def _validate_backup(data: object) -> dict[str, list[list[str]]] | None:
-    """Accepts dict: values are lists of strings (old format) or lists [word, trans]. Returns normalized [word, trans] lists."""
-    if not isinstance(data, dict):
-        return None
-    out: dict[str, list[list[str]]] = {}
-    for k, v in data.items():
-        if not isinstance(k, str) or not isinstance(v, list):
+    def apply(self, event: object) -> None:
+        """Adds one log entry [ts, op, board, word, translation]; malformed entries are ignored."""
+        if not isinstance(event, list) or len(event) != 5:
+            return
+        ts, op, board, word, trans = event
+        if not isinstance(ts, (int, float)) or op not in EVENT_OPS or not all(
+            isinstance(x, str) for x in (board, word, trans)
+        ):
+            return
+        cards = self.cards.setdefault(board, {})
+        total = self.boards.setdefault(board, [0, 0, 0.0])
+        if op == "remove":
+            cards.pop((word, trans), None)
+            return
+        card = cards.setdefault((word, trans), [0, 0, 0.0])
+        if op in ("reveal", "mark"):
+            field = 0 if op == "reveal" else 1
+            for totals in (card, total):
+                totals[field] += 1
+                totals[2] = max(totals[2], ts)
+
+    def catch_up(self) -> None:
+        """Adds log lines written after `offset` (by any process). Starts over if the log got shorter."""
+        size = os.path.getsize(EVENTS_PATH) if os.path.exists(EVENTS_PATH) else 0
+        if size < self.offset:
+            self.__init__()
+        if self.offset == size:
+            return
+        with open(EVENTS_PATH, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                try:
+                    self.apply(json.loads(line))
+                except ValueError:
+                    continue  # torn line
+        self.offset = size
+
+    def to_json(self) -> dict:
+        return {
+            "offset": self.offset,
+            "boards": {
+                name: {"totals": total, "cards": [[w, t, *c] for (w, t), c in self.cards.get(name, {}).items()]}
+                for name, total in self.boards.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: object) -> "_EventTotals | None":
+        if not isinstance(data, dict) or type(data.get("offset")) is not int or not isinstance(data.get("boards"), dict):
             return None
-        rows: list[list[str]] = []
-        for x in v:
-            if isinstance(x, str):
-                rows.append([x, ""])
-            elif isinstance(x, list) and len(x) == 2 and isinstance(x[0], str) and isinstance(x[1], str):
-                rows.append([x[0], x[1]])
-            else:
-                return None
-        out[k] = rows
-    return out
+        totals = cls()
+        totals.offset = data["offset"]
+        try:
+            for name, entry in data["boards"].items():
+                totals.boards[name] = list(entry["totals"])
+                totals.cards[name] = {(w, t): [r, m, last] for w, t, r, m, last in entry["cards"]}
+        except (KeyError, TypeError, ValueError):
+            return None
+        return totals
 
 
-def _backup_to_table(rows: list[list[str]]) -> Table:
-    return [ (r[0], r[1]) for r in rows ]
+class EventLog:
+    """Append-only log of what happened to cards in Shuffle sessions (EVENTS_PATH), one compact JSON
+    array per line: [ts, op, board, word, translation], op being one of EVENT_OPS.
 
+    record() only buffers; buffered events are appended in one write once there are EVENT_BUFFER_SIZE
+    of them, on flush() and at exit. Per-card and per-board totals are loaded once from the side index
+    (EVENTS_STATS_PATH, which also records the log size it covers) plus the log lines past it, then
+    kept in memory: each append adds its events, and lines appended by other processes are replayed
+    from where the totals stopped. save_index() writes them back; sessions call it on exit."""
 
-def _table_to_backup(table: Table) -> list[list[str]]:
-    return [ [w, t] for w, t in table ]
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buffer: list[list] = []
+        self._totals: _EventTotals | None = None
+        self._index_offset: int | None = None  # log size covered by the index file, as last read or written
+        self._appended = False  # events appended by this process since the index was last saved
 
+    def record(self, board: str, op: str, row: TableRow, ts: float | None = None) -> None:
+        if op not in EVENT_OPS:
+            raise ValueError(f"Unknown event: {op}")
+        event = [round(time.time() if ts is None else ts, 3), op, board, row[0], row[1]]
+        with self._lock:
+            self._buffer.append(event)
+            full = len(self._buffer) >= EVENT_BUFFER_SIZE
+        if full:
+            self.flush()
 
-def _validate_table(table: object) -> bool:
-    """Checks if this is a Table (list of pairs (str, str))."""
-    if not isinstance(table, list):
-        return False
-    for row in table:
-        if not isinstance(row, (list, tuple)) or len(row) != 2:
-            return False
-        if not isinstance(row[0], str) or not isinstance(row[1], str):
-            return False
-    return True
+    def flush(self) -> None:
+        """Appends buffered events to the log (and to the totals in memory)."""
+        with self._lock:
+            if not self._buffer:
+                return
+            events, self._buffer = self._buffer, []
+        self._append(events)
 
+    def save_index(self) -> None:
+        """Writes the totals to the side index, if they cover more of the log than it does."""
+        if self._totals is not None and self._totals.offset != self._index_offset:
+            self._save_index()
 
-def _parse_board_row_list(v: object) -> list[TableRow] | None:
-    """Parses list of [word, trans] or legacy list of str. Returns list of (word, trans) or None."""
-    if not isinstance(v, list):
-        return None
-    out: list[TableRow] = []
-    for x in v:
-        if isinstance(x, str):
-            out.append((x, ""))
-        elif isinstance(x, list) and len(x) == 2 and isinstance(x[0], str) and isinstance(x[1], str):
-            out.append((x[0], x[1]))
+    def sync(self) -> None:
+        """Flushes, then saves the index if this process appended events; readers (stats) write nothing."""
+        self.flush()
+        if self._appended:
+            self.save_index()
+
+    @_storage_locked
+    def totals(self) -> _EventTotals:
+        """Totals of the whole log, including events still buffered here."""
+        self.flush()
+        return self._current()
+
+    def _current(self) -> _EventTotals:
+        # Callers hold the storage lock.
+        if self._totals is None:
+            self._totals, self._index_offset = _read_event_totals()
         else:
-            return None
-    return out
+            self._totals.catch_up()
+        return self._totals
 
+    @_storage_locked
+    def _append(self, events: list[list]) -> None:
+        totals = self._current()
+        data = "".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in events)
+        level = _durability()
+        is_new = not os.path.exists(EVENTS_PATH)
+        with open(EVENTS_PATH, "ab+") as f:
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = "\n" + data  # torn last line
+            f.write(data.encode("utf-8"))
+            offset = f.tell()
+            if level != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        if is_new and level == "dir":
+            _fsync_dir(EVENTS_PATH)
+        for event in events:
+            totals.apply(event)
+        totals.offset = offset
+        self._appended = True
 
-def _read_backup_raw(path: str) -> object:
-    if not os.path.exists(path):
-        return None
+    @_storage_locked
+    def _save_index(self) -> None:
+        totals = self._current()
+        # Rebuildable from the log, so no fsync.
+        _atomic_write(
+            EVENTS_STATS_PATH,
+            lambda f: f.write(json.dumps(totals.to_json(), ensure_ascii=False, separators=(",", ":"))),
+            "compact",
+            durable=False,
+        )
+        self._index_offset = totals.offset
+        self._appended = False
+
+
+def _read_event_totals() -> tuple[_EventTotals, int | None]:
+    """The side index caught up with the log, and the log size the index file itself covered (None if
+    it was missing or damaged, in which case the totals are rebuilt from the whole log)."""
+    totals = None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return None
+        with open(EVENTS_STATS_PATH, "r", encoding="utf-8") as f:
+            totals = _EventTotals.from_json(json.load(f))
+    except (OSError, ValueError):
+        pass
+    index_offset = totals.offset if totals is not None else None
+    totals = totals or _EventTotals()
+    totals.catch_up()
+    return totals, index_offset
 
 
-def _parse_backup_data(data: object) -> tuple[dict[str, Table], dict[str, list[TableRow]]]:
-    """Parses backup file. New format: name -> {table: [...], to_repeat: [...]}. Legacy: name -> [...]. Returns (tables, to_repeat_by_name)."""
-    tables: dict[str, Table] = {}
-    to_repeat: dict[str, list[TableRow]] = {}
-    if not isinstance(data, dict):
-        return {}, {}
-    # Legacy: root had "tables" and "to_repeat" as separate top-level keys
-    if "tables" in data and isinstance(data.get("tables"), dict):
-        for k, v in (data["tables"] or {}).items():
-            if not isinstance(k, str):
-                continue
-            rows = _parse_board_row_list(v)
-            if rows is not None:
-                tables[k] = rows
-        for k, v in (data.get("to_repeat") or {}).items():
-            if not isinstance(k, str) or not isinstance(v, list):
-                continue
-            rows = _parse_board_row_list(v)
-            if rows is not None:
-                to_repeat[k] = rows
-        return tables, to_repeat
-    # New format: name -> { table: [...], to_repeat: [...] }  or legacy: name -> [...]
-    for k, v in data.items():
-        if not isinstance(k, str):
-            continue
-        if isinstance(v, list):
-            rows = _parse_board_row_list(v)
-            if rows is not None:
-                tables[k] = rows
-                # legacy: no to_repeat key for this board
-        elif isinstance(v, dict) and "table" in v:
-            t_rows = _parse_board_row_list(v["table"])
-            if t_rows is not None:
-                tables[k] = t_rows
-                r_rows = _parse_board_row_list(v.get("to_repeat")) if isinstance(v.get("to_repeat"), list) else []
-                to_repeat[k] = r_rows if r_rows is not None else []
-        else:
-            continue
-    return tables, to_repeat
+_event_log = EventLog()
+atexit.register(_event_log.sync)
 
 
-def load_backup() -> tuple[dict[str, Table], dict[str, list[TableRow]], bool]:
-    """Loads backup; if main file is corrupted tries .bak. Repairs main from .bak if needed.
-    Returns (tables, to_repeat_by_name, recovered_from_bak)."""
-    main_raw = _read_backup_raw(BACKUP_PATH)
-    if main_raw is not None:
-        tables, to_repeat = _parse_backup_data(main_raw)
-        if tables or main_raw == {}:
-            return tables, to_repeat, False
-    bak_raw = _read_backup_raw(BACKUP_BACKUP_PATH)
-    if bak_raw is not None:
-        tables, to_repeat = _parse_backup_data(bak_raw)
-        try:
-            with open(BACKUP_PATH, "w", encoding="utf-8") as f:
-                json.dump(
-                    {name: {"table": _table_to_backup(t), "to_repeat": _table_to_backup(to_repeat.get(name, []))} for name, t in tables.items()},
-                    f, ensure_ascii=False, indent=2,
-                )
-        except OSError:
-            pass
-        return tables, to_repeat, True
-    return {}, {}, False
+def card_stats(board: str | None = None, limit: int | None = None) -> list[CardStats]:
+    """Cards (of one board, or all) with their review totals, most missed first: by miss rate, then misses."""
+    totals = _event_log.totals()
+    names = [board] if board is not None else list(totals.cards)
+    stats = (
+        CardStats(name, w, t, *c) for name in names for (w, t), c in totals.cards.get(name, {}).items()
+    )
+    if limit is None:
+        return sorted(stats, key=lambda s: (s.miss_rate, s.misses), reverse=True)
+    return heapq.nlargest(limit, stats, key=lambda s: (s.miss_rate, s.misses))
 
 
-def save_backup(boards: dict[str, Table], to_repeat_by_name: dict[str, list[TableRow]] | None = None) -> None:
-    """Saves backup: each board is one object { table, to_repeat }. If to_repeat_by_name is None, keeps current from file."""
-    if not isinstance(boards, dict):
-        raise ValueError("Invalid backup structure")
-    for k, v in boards.items():
-        if not isinstance(k, str) or not _validate_table(v):
-            raise ValueError("Invalid backup structure")
-    if to_repeat_by_name is None:
-        _, to_repeat_by_name, _ = load_backup()
-    payload = {
-        name: {
-            "table": _table_to_backup(boards[name]),
-            "to_repeat": _table_to_backup(to_repeat_by_name.get(name, [])),
-        }
-        for name in boards
-    }
-    if os.path.exists(BACKUP_PATH):
-        try:
-            with open(BACKUP_PATH, "r", encoding="utf-8") as f:
-                prev = f.read()
-            with open(BACKUP_BACKUP_PATH, "w", encoding="utf-8") as f:
-                f.write(prev)
-        except OSError:
-            pass
-    fd, tmp = tempfile.mkstemp(suffix=".json", dir=os.path.dirname(BACKUP_PATH) or ".")
-    try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-        os.replace(tmp, BACKUP_PATH)
-    except Exception:
-        try:
-            os.unlink(tmp)
-        except OSError:
-            pass
-        raise
+def board_stats() -> dict[str, BoardStats]:
+    """Review totals per board name."""
+    return {name: BoardStats(name, *total) for name, total in _event_log.totals().boards.items()}
+
+
+def _print_save_errors(wait: bool = False) -> None:
+    """Shows failed background saves (yellow); with wait=True also waits for Enter."""
+    errors = _save_worker.take_errors()
+    if not errors:
+        return
+    for err in errors:
+        print(f"{_YELLOW}Auto-backup failed: {err}{_RESET}")
+    if wait:
+        input("Enter...")
 
 
 def _confirm_table(table: Table) -> bool:
@@ -306,15 +3296,210 @@ def getInputTable() -> Table:
 
 
 def clearScreen():
-    os.system("cls" if sys.platform == "win32" else "clear")
+    _screen.reset()
+    if _ansi_terminal():
+        sys.stdout.write(_CLEAR)
+        sys.stdout.flush()
+    elif sys.platform == "win32" and sys.stdout.isatty():
+        os.system("cls")  # console without ANSI support
+
+
+# Used by every shuffle; seeded from SHUFFLE_SEED if set (otherwise from the OS).
+_shuffle_rng = random.Random(SHUFFLE_SEED)
 
 
 def getShuffledTable(table: list):
     clearScreen()
-    random.shuffle(table)
+    if isinstance(table, (CardStore, SessionOrder)):
+        table.shuffle(_shuffle_rng)  # lazy: rows are placed as they are read
+    else:
+        _shuffle_rng.shuffle(table)
+    return table
+
+
+def getWeightedShuffledTable(table: CardStore | SessionOrder, sampler: WeightedSampler) -> CardStore | SessionOrder:
+    """Shuffles table in place so that cards with higher weights in `sampler` (over the same rows)
+    tend to come first. Lazy like CardStore.shuffle, O(log n) per position read; the sampler is reused, not rebuilt."""
+    clearScreen()
+    table.shuffle(_shuffle_rng, sampler)
     return table
 
 
+class Picker:
+    """Pages and filters a long list of choices for pick_one / pick_many.
+
+    Only the current page of choices is built. Items are positions into `keys` (the values the
+    prompts return); the lowercase text that filtering matches against is computed on the first
+    filter, and a filter that extends the previous one only narrows the previous matches."""
+
+    NEXT, PREVIOUS, FILTER = "[Next page]", "[Previous page]", "[Filter...]"
+
+    def __init__(self, keys: Sequence, label: Callable[[object], str]) -> None:
+        self.keys = keys
+        self.label = label
+        self.page = 0
+        self.page_size = max(VIEWPORT_MIN_ROWS, shutil.get_terminal_size().lines - PICKER_RESERVED_LINES)
+        self._lower: list[str] | None = None
+        self._filter = ""
+        self._matches: Sequence[int] = range(len(keys))
+
+    def visible(self) -> list:
+        """Keys on the current page."""
+        start = self.page * self.page_size
+        return [self.keys[i] for i in self._matches[start:start + self.page_size]]
+
+    def pages(self) -> int:
+        return max(1, -(-len(self._matches) // self.page_size))
+
+    def paged(self) -> bool:
+        """True if navigation is needed: more than one page, or a filter to clear."""
+        return len(self.keys) > self.page_size or bool(self._filter)
+
+    def title(self, message: str) -> str:
+        if not self.paged():
+            return message
+        where = f"page {self.page + 1}/{self.pages()}"
+        if self._filter:
+            where += f", {len(self._matches)} matching '{self._filter}'"
+        return f"{message} ({where})"
+
+    def nav_choices(self) -> list[str]:
+        if not self.paged():
+            return []
+        nav = [self.FILTER]
+        if self.page > 0:
+            nav.insert(0, self.PREVIOUS)
+        if self.page + 1 < self.pages():
+            nav.insert(0, self.NEXT)
+        return nav
+
+    def navigate(self, action: str) -> None:
+        if action == self.NEXT:
+            self.page = min(self.page + 1, self.pages() - 1)
+        elif action == self.PREVIOUS:
+            self.page = max(self.page - 1, 0)
+        elif action == self.FILTER:
+            text = questionary.text("Filter (empty = show all):", default=self._filter).ask()
+            if text is not None:
+                self.set_filter(text)
+
+    def set_filter(self, text: str) -> None:
+        text = text.strip().casefold()
+        if self._lower is None:
+            self._lower = [self.label(k).casefold() for k in self.keys]
+        if not text:
+            self._matches = range(len(self.keys))
+        else:
+            narrow = bool(self._filter) and text.startswith(self._filter)
+            pool = self._matches if narrow else range(len(self.keys))
+            self._matches = [i for i in pool if text in self._lower[i]]
+        self._filter = text
+        self.page = 0
+
+
+def pick_one(message: str, keys: Sequence, label: Callable[[object], str]):
+    """Single choice among `keys` (shown via `label`), a page at a time. Returns the key or None (Cancel)."""
+    picker = Picker(keys, label)
+    while True:
+        choices = [questionary.Choice(title=label(k), value=("key", k)) for k in picker.visible()]
+        choices += [questionary.Choice(title=nav, value=("nav", nav)) for nav in picker.nav_choices()]
+        choices.append(questionary.Choice(title="Cancel", value=None))
+        answer = questionary.select(picker.title(message), choices=choices).ask()
+        if answer is None:
+            return None
+        kind, value = answer
+        if kind == "key":
+            return value
+        picker.navigate(value)
+
+
+def pick_many(
+    message: str, keys: Sequence, label: Callable[[object], str], is_checked: Callable[[object], bool] = lambda k: False
+) -> dict | None:
+    """Checkbox choice among `keys`, a page at a time. Returns {key: checked} for the keys whose
+    state was shown (so unchanged, never-shown keys cost nothing), or None if cancelled."""
+    picker = Picker(keys, label)
+    changes: dict = {}
+    while True:
+        page = picker.visible()
+        choices = [
+            questionary.Choice(title=label(k), value=k, checked=changes[k] if k in changes else is_checked(k))
+            for k in page
+        ]
+        answer = questionary.checkbox(picker.title(message), choices=choices).ask()
+        if answer is None:
+            return None
+        for k in page:
+            changes[k] = False
+        for k in answer:
+            changes[k] = True
+        if not picker.paged():
+            return changes
+        nav = questionary.select("Continue:", choices=picker.nav_choices() + ["Done", "Cancel"]).ask()
+        if nav is None or nav == "Cancel":
+            return None
+        if nav == "Done":
+            return changes
+        picker.navigate(nav)
+
+
+def _search_completer():
+    """prompt_toolkit completer listing search_cards() hits while the query is typed."""
+    from prompt_toolkit.completion import Completer, Completion  # questionary is built on prompt_toolkit
+
+    class SearchCompleter(Completer):
+        def get_completions(self, document, complete_event):
+            text = document.text_before_cursor
+            for board, row in search_cards(text, SEARCH_COMPLETION_LIMIT):
+                yield Completion(row[0], start_position=-len(text), display=_row_to_display(row), display_meta=board)
+
+    return SearchCompleter()
+
+
+def _format_search_results(hits: list[tuple[str, TableRow]]) -> str:
+    """Search hits grouped under their board names (bold, colored), like the backup list."""
+    if not hits:
+        return "No matches."
+    by_board: dict[str, list[TableRow]] = {}
+    for board, row in hits:
+        by_board.setdefault(board, []).append(row)
+    lines: list[str] = []
+    for board, rows in by_board.items():
+        lines.append(f"{_BOLD_CYAN}{board}{_RESET}")
+        lines.extend(f"    {word}: {trans if trans else '(no translation)'}" for word, trans in rows)
+    return "\n".join(lines)
+
+
+def review_session(cards: CardStore, on_review: Callable[[], None]) -> int:
+    """Shows the cards due in `cards` one at a time (word, then translation) and reschedules each
+    with the grade picked (review_card). A failed card comes back at the end of the session.
+    Calls on_review after every grade; returns the number of answers."""
+    queue = ReviewQueue(cards, time.time())
+    reviewed = 0
+    _screen.reset()
+    while queue:
+        i = queue.pop()
+        word, trans = cards[i]
+        frame = f"  Review ({len(queue) + 1} due, {reviewed} done):\n\n  {word}"
+        _screen.draw(frame)
+        if questionary.select("\nWhat next?", choices=["Show translation", "Back to menu"]).ask() != "Show translation":
+            return reviewed
+        _screen.draw(f"{frame} — {trans}" if trans else frame)
+        grade = questionary.select("\nHow well did you know it?", choices=[*REVIEW_GRADES, "Back to menu"]).ask()
+        if grade not in REVIEW_GRADES:
+            return reviewed
+        now = time.time()
+        schedule = review_card(cards.schedule(i), REVIEW_GRADES[grade], now)
+        cards.set_schedule(i, schedule)
+        if schedule.reps == 0:
+            queue.push(i, now)  # after every card that was already due
+        reviewed += 1
+        on_review()
+    _screen.draw(f"  Review: nothing due ({reviewed} done).")
+    input("Enter...")
+    return reviewed
+
+
 def backup_submenu(
     current_table: Table,
     current_name: str | None,
@@ -328,29 +3513,41 @@ def backup_submenu(
     print()
     choice = questionary.select(
         "Backup:",
-        choices=["Load table", "Save current", "Edit table", "Delete tables", "Back"],
+        choices=["Load table", "Save current", "Edit table", "Delete tables", "Search", "Back"],
     ).ask()
     if not choice or choice == "Back":
         return current_table, current_name, used_boards
 
+    if choice == "Search":
+        clearScreen()
+        query = questionary.autocomplete(
+            "Search words and translations:", choices=[], completer=_search_completer()
+        ).ask()
+        if query and query.strip():
+            clearScreen()
+            print(_format_search_results(search_cards(query, SEARCH_RESULT_LIMIT)))
+            input("\nEnter...")
+        return current_table, current_name, used_boards
+
     if choice == "Load table":
-        backup, _, _ = load_backup()
-        if not backup:
+        boards = list_boards()
+        if not boards:
             clearScreen()
             input("No saved tables. Enter...")
             return current_table, current_name, used_boards
         clearScreen()
-        _print_backup_list(backup)
-        name = questionary.select("Which table to load?", choices=sorted(backup.keys())).ask()
-        if name:
-            used_boards[name] = backup[name]
-            return backup[name], name, used_boards
+        _print_board_summaries(boards)
+        name = questionary.select("Which table to load?", choices=[b.name for b in boards]).ask()
+        saved = load_board(name) if name else None
+        if saved is not None:
+            used_boards[name] = saved[0]
+            return saved[0], name, used_boards
 
     if choice == "Save current":
-        backup, to_repeat_dict, _ = load_backup()
+        boards = list_boards()
         clearScreen()
-        _print_backup_list(backup)
-        choices_save = ["[new table]"] + sorted(backup.keys())
+        _print_board_summaries(boards)
+        choices_save = ["[new table]"] + [b.name for b in boards]
         target = questionary.select("Save as (new or overwrite selected):", choices=choices_save).ask()
         if not target:
             return current_table, current_name, used_boards
@@ -360,37 +3557,32 @@ def backup_submenu(
             name = f"{base} {stamp}".strip() if base else stamp
             if name:
                 used_boards[name] = current_table
-                backup, to_repeat_dict, _ = load_backup()
-                backup[name] = current_table
-                to_repeat_dict[name] = session_to_repeat if session_to_repeat is not None else []
-                save_backup(backup, to_repeat_dict)
+                save_board(name, current_table, session_to_repeat if session_to_repeat is not None else [])
                 return current_table, name, used_boards
         else:
             name = target
-            backup, to_repeat_dict, _ = load_backup()
-            backup[name] = current_table
-            to_repeat_dict[name] = session_to_repeat if session_to_repeat is not None else []
-            save_backup(backup, to_repeat_dict)
+            save_board(name, current_table, session_to_repeat if session_to_repeat is not None else [])
             used_boards[name] = current_table
             clearScreen()
             input(f"Overwritten: {name}. Enter...")
             return current_table, name, used_boards
 
     if choice == "Edit table":
-        backup, to_repeat_dict, _ = load_backup()
-        if not backup:
+        boards = list_boards()
+        if not boards:
             clearScreen()
             input("No saved tables. Enter...")
             return current_table, current_name, used_boards
         clearScreen()
-        _print_backup_list(backup)
-        name = questionary.select("Which table to edit?", choices=sorted(backup.keys())).ask()
-        if not name:
+        _print_board_summaries(boards)
+        name = questionary.select("Which table to edit?", choices=[b.name for b in boards]).ask()
+        saved = load_board(name) if name else None
+        if saved is None:
             return current_table, current_name, used_boards
         with tempfile.NamedTemporaryFile(
             mode="w", suffix=".txt", delete=False, encoding="utf-8"
         ) as f:
-            f.write(", ".join(f"{w}|{t}" if t else w for w, t in backup[name]))
+            f.write(", ".join(f"{w}|{t}" if t else w for w, t in saved[0]))
             path = f.name
         try:
             editor = os.environ.get("EDITOR", "notepad" if sys.platform == "win32" else "nano")
@@ -400,9 +3592,7 @@ def backup_submenu(
         finally:
             os.unlink(path)
         new_table = [_parse_table_cell(cell) for cell in raw.split(",") if cell.strip()]
-        backup[name] = new_table
-        to_repeat_dict[name] = []  # clear to_repeat after edit
-        save_backup(backup, to_repeat_dict)
+        save_board(name, new_table, [])  # clear to_repeat after edit
         if current_name == name:
             current_table = new_table
         if name in used_boards:
@@ -411,22 +3601,20 @@ def backup_submenu(
         input(f"Saved: {name}. Enter...")
 
     if choice == "Delete tables":
-        backup, to_repeat_dict, _ = load_backup()
-        if not backup:
+        boards = list_boards()
+        if not boards:
             clearScreen()
             input("No saved tables. Enter...")
             return current_table, current_name, used_boards
         clearScreen()
-        _print_backup_list(backup)
+        _print_board_summaries(boards)
         print("Select: Space. Confirm: Enter. To go back without deleting: select nothing and Enter.")
         print()
-        choices = [
-            questionary.Choice(title=f"{k} | {_table_display(backup[k], 8)}", value=k)
-            for k in sorted(backup.keys())
-        ]
-        selected = questionary.checkbox("Which tables to delete?", choices=choices).ask()
-        if selected is None:
+        previews = {b.name: b.preview for b in boards}
+        changes = pick_many("Which tables to delete?", list(previews), lambda n: f"{n} | {previews[n]}")
+        if changes is None:
             return current_table, current_name, used_boards
+        selected = [n for n, on in changes.items() if on]
         if not selected:
             clearScreen()
             input("Cancelled (nothing deleted). Enter...")
@@ -436,23 +3624,23 @@ def backup_submenu(
             choices=["Yes, delete", "No, go back"],
         ).ask()
         if confirm == "Yes, delete":
-            for k in selected:
-                del backup[k]
-                to_repeat_dict.pop(k, None)
-            save_backup(backup, to_repeat_dict)
+            delete_boards(selected)
             clearScreen()
             input(f"Deleted from backup: {', '.join(selected)}. Enter...")
 
     return current_table, current_name, used_boards
 
 
-def main() -> None:
-    clearScreen()
-    _, _, recovered = load_backup()
-    if recovered:
+def _report_recovery() -> None:
+    if backup_recovered():
         print("Recovered backup from .bak file (main file was corrupted).")
         input("Enter...")
         clearScreen()
+
+
+def main() -> None:
+    clearScreen()
+    _report_recovery()
     start = questionary.select(
         "What do you want to do?",
         choices=["Enter table", "Load table from backup", "Go to menu"],
@@ -461,18 +3649,20 @@ def main() -> None:
         current_table = getInputTable()
         current_name = None
     elif start == "Load table from backup":
-        backup, _, _ = load_backup()
-        if not backup:
+        boards = list_boards()
+        if not boards:
             clearScreen()
             input("No saved tables. Enter...")
             current_table = []
             current_name = None
         else:
             clearScreen()
-            _print_backup_list(backup)
-            name = questionary.select("Which table to load?", choices=sorted(backup.keys())).ask()
-            if name:
-                current_table = backup[name]
+            _print_board_summaries(boards)
+            name = questionary.select("Which table to load?", choices=[b.name for b in boards]).ask()
+            saved = load_board(name) if name else None
+            _report_recovery()
+            if saved is not None:
+                current_table = saved[0]
                 current_name = name
             else:
                 current_table = []
@@ -489,27 +3679,59 @@ def main() -> None:
         clearScreen()
         menu_choices = ["New table", "Backup", "Exit"]
         if current_table:
-            menu_choices.insert(0, "Shuffle")
+            menu_choices[:0] = ["Shuffle", "Review due"]
         choice = questionary.select("Choose:", choices=menu_choices).ask()
         if not choice or choice == "Exit":
+            _save_worker.flush()
+            _print_save_errors(wait=True)
+            compact_journal()
             return
-        if choice == "Shuffle":
-            _, to_repeat_by_name, _ = load_backup()
-            to_repeat: set[TableRow] = set(to_repeat_by_name.get(current_name, []))
+        if choice in ("Shuffle", "Review due"):
+            if not isinstance(current_table, CardStore):
+                # Cards need stable ids for to_repeat tracking.
+                current_table = CardStore(current_table)
+                if current_name:
+                    used_boards[current_name] = current_table
+            saved = load_board(current_name) if current_name else None
+            if choice == "Review due":
+                board_to_repeat = saved[1] if saved else []
+
+                def _save_review() -> None:
+                    if current_name:
+                        _save_worker.submit(current_name, current_table, board_to_repeat)
+                review_session(current_table, _save_review)
+                _save_worker.flush()
+                _print_save_errors(wait=True)
+                continue
+            # Shuffles reorder the session, not the board, so saving marks does not rewrite the rows.
+            session = SessionOrder(current_table)
+            to_repeat = RepeatSet(session, saved[1] if saved else ())
+            view = TableViewport()
+            # Set while "Weighted shuffle" is on; kept up to date with marks, so passes do not rebuild it.
+            sampler: WeightedSampler | None = None
+
+            def _reweigh(i: int) -> None:
+                if sampler is not None:
+                    sampler.set_weight(i, _draw_weight(session, to_repeat, i))
+
+            def _log_event(op: str, i: int) -> None:
+                if current_name:
+                    _event_log.record(current_name, op, session[i])
             while True:
-                current_table = getShuffledTable(current_table)
+                if sampler is not None:
+                    session = getWeightedShuffledTable(session, sampler)
+                else:
+                    session = getShuffledTable(session)
                 revealed_count = 0
+                view.follow()
 
                 def _auto_backup() -> None:
                     if current_name:
-                        backup, to_repeat_dict, _ = load_backup()
-                        backup[current_name] = current_table
-                        to_repeat_dict[current_name] = list(to_repeat)
-                        save_backup(backup, to_repeat_dict)
+                        _save_worker.submit(current_name, current_table, to_repeat.rows())
                 while True:
-                    clearScreen()
-                    print(_table_display_with_revealed(current_table, revealed_count, to_repeat))
-                    if revealed_count < len(current_table):
+                    _screen.draw(view.render(session, revealed_count, to_repeat))
+                    _print_save_errors()
+                    if revealed_count < len(session):
                         choices_list = ["Show all translations", "Shuffle again", "Add element", "Remove element", "Back to menu"]
                         choices_list.insert(0, "Show next translation")
                         if revealed_count >= 1:
@@ -519,60 +3741,103 @@ def main() -> None:
                         choices_list.insert(-1, "Edit to repeat")
                     else:
                         choices_list = ["Shuffle again", "Show all translations", "Add element", "Remove element", "Back to menu"]
-                        if len(current_table) >= 1:
+                        if len(session) >= 1:
                             choices_list.insert(2, "Mark last as to repeat")
                         if to_repeat:
                             choices_list.insert(-1, "Show to repeat")
                         choices_list.insert(-1, "Edit to repeat")
+                    if view.paged(len(session)):
+                        choices_list[-1:-1] = ["Page down", "Page up"]
+                    choices_list.insert(-1, "Uniform shuffle" if sampler is not None else "Weighted shuffle")
                     again = questionary.select("\nWhat next?", choices=choices_list).ask()
                     if not again or again == "Back to menu":
-                        session_to_repeat = list(to_repeat)
+                        session_to_repeat = to_repeat.rows()
+                        _event_log.sync()
+                        _save_worker.flush()
+                        _print_save_errors(wait=True)
                         break
                     if again == "Shuffle again":
                         break
+                    if again in ("Weighted shuffle", "Uniform shuffle"):
+                        sampler = None
+                        if again == "Weighted shuffle":
+                            sampler = WeightedSampler(
+                                _draw_weight(session, to_repeat, i) for i in range(len(session))
+                            )
+                        break
                     if again == "Show next translation":
-                        if revealed_count < len(current_table):
+                        if revealed_count < len(session):
                             revealed_count += 1
+                            _log_event("reveal", revealed_count - 1)
+                        view.follow()
+                        continue
+                    if again in ("Page down", "Page up"):
+                        view.scroll(1 if again == "Page down" else -1, len(session), revealed_count)
                         continue
                     if again == "Mark last as to repeat" and revealed_count >= 1:
-                        to_repeat.add(current_table[revealed_count - 1])
+                        if not to_repeat.is_flagged(revealed_count - 1):
+                            _log_event("mark", revealed_count - 1)
+                        to_repeat.flag(revealed_count - 1)
+                        _reweigh(revealed_count - 1)
                         _auto_backup()
                         continue
-                    if again == "Edit to repeat" and current_table:
+                    if again == "Edit to repeat" and session:
                         clearScreen()
                         print("Select words to repeat (current selection is pre-checked).")
                         print("Select/deselect: Space. Confirm: Enter.")
                         print()
-                        choices = [
-                            questionary.Choice(title=_row_to_display(r), value=r, checked=(r in to_repeat))
-                            for r in current_table
-                        ]
-                        selected = questionary.checkbox("Which to mark as to repeat?", choices=choices).ask()
-                        if selected is not None:
-                            to_repeat = set(selected)
+                        changes = pick_many(
+                            "Which to mark as to repeat?",
+                            range(len(session)),
+                            lambda i: _row_to_display(session[i]),
+                            to_repeat.is_flagged,
+                        )
+                        if changes is not None:
+                            for i, on in changes.items():
+                                if on != to_repeat.is_flagged(i):
+                                    _log_event("mark" if on else "unmark", i)
+                                if on:
+                                    to_repeat.flag(i)
+                                else:
+                                    to_repeat.unflag(i)
+                                _reweigh(i)
                             _auto_backup()
                         continue
                     if again == "Show to repeat" and to_repeat:
-                        child_table = [r for r in current_table if r in to_repeat]
-                        random.shuffle(child_table)
+                        child_table = to_repeat.rows()
+                        _shuffle_rng.shuffle(child_table)
                         child_revealed = 0
+                        child_view = TableViewport()
+                        _screen.reset()
                         while True:
-                            clearScreen()
-                            print(f"  To repeat ({len(child_table)}):\n")
-                            print(_table_display_with_revealed(child_table, child_revealed, set(child_table)))
+                            # Two title lines over the page; its menu is that much shorter than the review menu.
+                            _screen.draw(
+                                f"  To repeat ({len(child_table)}):\n\n"
+                                + child_view.render(child_table, child_revealed, set(child_table)),
+                                below=VIEWPORT_RESERVED_LINES - VIEWPORT_FRAME_LINES - 2,
+                            )
                             if child_revealed < len(child_table):
                                 child_choices = ["Show next translation", "Show all translations", "Shuffle again", "Back"]
                             else:
                                 child_choices = ["Shuffle again", "Show all translations", "Back"]
+                            if child_view.paged(len(child_table)):
+                                child_choices[-1:-1] = ["Page down", "Page up"]
                             child_again = questionary.select("\nWhat next?", choices=child_choices).ask()
                             if not child_again or child_again == "Back":
                                 break
                             if child_again == "Shuffle again":
-                                random.shuffle(child_table)
+                                _shuffle_rng.shuffle(child_table)
                                 child_revealed = 0
+                                child_view.follow()
                                 continue
                             if child_again == "Show next translation" and child_revealed < len(child_table):
                                 child_revealed += 1
+                                child_view.follow()
+                                continue
+                            if child_again in ("Page down", "Page up"):
+                                child_view.scroll(
+                                    1 if child_again == "Page down" else -1, len(child_table), child_revealed
+                                )
                                 continue
                             if child_again == "Show all translations" and child_table:
                                 clearScreen()
@@ -580,30 +3845,38 @@ def main() -> None:
                                 print(format_translations_display(child_table))
                                 input("\nEnter...")
                         continue
-                    if again == "Show all translations" and current_table:
+                    if again == "Show all translations" and session:
                         clearScreen()
                         print("Order as after shuffle:\n")
-                        print(format_translations_display(current_table))
+                        print(format_translations_display(session))
                         input("\nEnter...")
                     if again == "Add element":
                         new_row = questionary.text("Word|translation (empty = cancel):").ask()
                         if new_row and new_row.strip():
-                            current_table.append(_parse_table_cell(new_row.strip()))
+                            session.append(_parse_table_cell(new_row.strip()))
+                            _log_event("add", len(session) - 1)
+                            if sampler is not None:
+                                sampler.append(1.0)
                             _auto_backup()
                     if again == "Remove element":
-                        if not current_table:
+                        if not session:
                             input("Table empty. Enter...")
                             continue
-                        choices = [
-                            questionary.Choice(title=_row_to_display(r), value=i)
-                            for i, r in enumerate(current_table)
-                        ] + [questionary.Choice(title="Cancel", value=None)]
-                        to_remove = questionary.select("Which element to remove?", choices=choices).ask()
+                        to_remove = pick_one(
+                            "Which element to remove?",
+                            range(len(session)),
+                            lambda i: _row_to_display(session[i]),
+                        )
+                        _screen.reset()  # the choice list may have scrolled the frame
                         if to_remove is not None:
-                            removed_row = current_table[to_remove]
-                            current_table.pop(to_remove)
-                            to_repeat.discard(removed_row)
-                            revealed_count = min(revealed_count, len(current_table))
+                            _log_event("remove", to_remove)
+                            to_repeat.delete(to_remove)
+                            revealed_count = min(revealed_count, len(session))
+                            if sampler is not None:
+                                # Positions after the removed row moved; weights are rebuilt.
+                                sampler = WeightedSampler(
+                                    _draw_weight(session, to_repeat, i) for i in range(len(session))
+                                )
                             _auto_backup()
                 if again == "Back to menu":
                     break
@@ -619,5 +3892,137 @@ def main() -> None:
             continue
 
 
+def _cli_print(obj: object) -> None:
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+
+
+def _cli_board(name: str) -> tuple[Table, list[TableRow]]:
+    board = load_board(name)
+    if board is None:
+        raise LookupError(f"No such table: {name}")
+    return board
+
+
+def _cli_select(table: Table, selectors: list[str], by: str | None = None) -> set[int]:
+    """Positions picked by selectors: a number is a position (from 0, as in the backup file);
+    anything else selects every row with that word. A number with no row at that position selects
+    rows with that word instead. `by` ("pos" or "word") reads every selector one way only."""
+    positions: set[int] = set()
+    for sel in selectors:
+        number = sel.lstrip("-").isdigit()
+        if by == "pos" and not number:
+            raise ValueError(f"Not a position: {sel}")
+        if number and by != "word":
+            i = int(sel)
+            if 0 <= i < len(table):
+                positions.add(i)
+                continue
+        found = {i for i, (w, _) in enumerate(table) if w == sel}
+        if not found:
+            raise LookupError(f"No row at position {sel}" if number and by != "word" else f"No row with word: {sel}")
+        positions |= found
+    return positions
+
+
+def _cli_list(args) -> None:
+    _cli_print([b._asdict() for b in list_boards()])
+
+
+def _cli_show(args) -> None:
+    table, to_repeat = _cli_board(args.name)
+    _cli_print({"name": args.name, **_board_payload(table, to_repeat)})
+
+
+def _cli_import(args) -> None:
+    import_json_backup(args.path)
+    _cli_print({"boards": len(list_boards())})
+
+
+def _cli_export(args) -> None:
+    export_json_backup(args.path)
+    _cli_print({"path": args.path, "boards": len(list_boards())})
+
+
+def _cli_add(args) -> None:
+    cells = args.rows if args.rows != ["-"] else sys.stdin.read().splitlines()
+    rows = [_parse_table_cell(c) for c in cells if c.strip()]
+    board = load_board(args.name)
+    table, to_repeat = board if board is not None else (CardStore(), [])
+    table.extend(rows)
+    save_board(args.name, table, to_repeat)
+    _cli_print({"name": args.name, "added": len(rows), "rows": len(table)})
+
+
+def _cli_mark(args) -> None:
+    table, to_repeat = _cli_board(args.name)
+    flagged = set(_repeat_positions(table, to_repeat))
+    selected = _cli_select(table, args.rows, args.by)
+    flagged = flagged | selected if args.command == "mark" else flagged - selected
+    save_board(args.name, table, RepeatRows((table[i] for i in sorted(flagged)), sorted(flagged)))
+    _cli_print({"name": args.name, "to_repeat": sorted(flagged)})
+
+
+def _cli_stats(args) -> None:
+    boards = list_boards()
+    _cli_print({
+        "boards": len(boards),
+        "rows": sum(b.rows for b in boards),
+        "to_repeat": sum(b.to_repeat for b in boards),
+        "last_modified": max((b.modified for b in boards), default=None),
+        "reviews": sum(b.reviews for b in board_stats().values()),
+    })
+
+
+def _cli_misses(args) -> None:
+    _cli_print([
+        {"board": s.board, "word": s.word, "translation": s.translation, "reviews": s.reviews,
+         "misses": s.misses, "miss_rate": round(s.miss_rate, 3), "last_seen": s.last_seen or None}
+        for s in card_stats(args.name, args.limit)
+    ])
+
+
+def cli(argv: list[str]) -> int:
+    """Non-interactive subcommands (`python neoanki list`, ...) printing JSON to stdout.
+    Errors are printed as {"error": ...} to stderr with exit status 1. Does not load questionary."""
+    parser = argparse.ArgumentParser(prog="neoanki", description="NeoAnki without the menus; output is JSON.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="board summaries").set_defaults(run=_cli_list)
+    p = sub.add_parser("show", help="one board: table and to_repeat positions")
+    p.add_argument("name")
+    p.set_defaults(run=_cli_show)
+    p = sub.add_parser("import", help="replace the backup with a JSON backup file")
+    p.add_argument("path")
+    p.set_defaults(run=_cli_import)
+    p = sub.add_parser("export", help="write the backup to a JSON backup file")
+    p.add_argument("path")
+    p.set_defaults(run=_cli_export)
+    p = sub.add_parser("add", help="append rows (word or word|translation; - reads lines from stdin)")
+    p.add_argument("name")
+    p.add_argument("rows", nargs="+")
+    p.set_defaults(run=_cli_add)
+    for command in ("mark", "unmark"):
+        p = sub.add_parser(command, help=f"{command} rows as to repeat (positions from 0, or words)")
+        p.add_argument("name")
+        p.add_argument("rows", nargs="+")
+        by = p.add_mutually_exclusive_group()
+        by.add_argument("--pos", dest="by", action="store_const", const="pos", help="rows are positions only")
+        by.add_argument("--word", dest="by", action="store_const", const="word", help="rows are words, even numbers")
+        p.set_defaults(run=_cli_mark)
+    sub.add_parser("stats", help="totals over all boards").set_defaults(run=_cli_stats)
+    p = sub.add_parser("misses", help="most missed cards in Shuffle sessions (of one board, or all)")
+    p.add_argument("name", nargs="?")
+    p.add_argument("--limit", type=int, default=20)
+    p.set_defaults(run=_cli_misses)
+    args = parser.parse_args(argv)
+    try:
+        args.run(args)
+    except (LookupError, ValueError, OSError) as e:
+        sys.stderr.write(json.dumps({"error": str(e)}, ensure_ascii=False) + "\n")
+        return 1
+    return 0
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
     main()
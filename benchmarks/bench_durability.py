@@ -0,0 +1,71 @@
+"""Benchmark: per-save latency of each durability level (BACKUP_DURABILITY_LEVELS).
+
+Times full saves (save_backup) and single-board journal appends (journal_board) in each target
+directory. By default it runs in /dev/shm (tmpfs, where fsync is nearly free) and in the system
+temp directory (usually a real disk); pass --dir to choose others.
+
+Usage: python benchmarks/bench_durability.py [--dir PATH ...] [--saves 30] [--boards 50] [--rows 100]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import NeoAnki  # noqa: E402
+
+
+def point_backup_at(workdir: str) -> None:
+    path = os.path.join(workdir, "neoanki_backup.json")
+    NeoAnki.BACKUP_PATH = path
+    NeoAnki.BACKUP_BACKUP_PATH = path + ".bak"
+    NeoAnki.BACKUP_JOURNAL_PATH = path + ".journal"
+    NeoAnki.BACKUP_INDEX_PATH = path + ".index"
+    # Keep every append in the journal; compaction would mix full saves into the timings.
+    NeoAnki.JOURNAL_COMPACT_BYTES = 1 << 40
+
+
+def time_calls(func, count: int) -> float:
+    """Median seconds per call."""
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_dir(base: str, saves: int, boards: int, rows: int) -> list[dict]:
+    tables = {f"board {b}": [(f"w{b}_{r}", f"t{r}") for r in range(rows)] for b in range(boards)}
+    results = []
+    for level in NeoAnki.BACKUP_DURABILITY_LEVELS:
+        NeoAnki.BACKUP_DURABILITY = level
+        with tempfile.TemporaryDirectory(dir=base) as workdir:
+            point_backup_at(workdir)
+            full = time_calls(lambda i: NeoAnki.save_backup(tables, {}), saves)
+            board = tables["board 0"]
+            journal = time_calls(lambda i: NeoAnki.journal_board("board 0", board, board[: i % rows]), saves)
+        results.append({"dir": base, "level": level, "save_backup_s": full, "journal_board_s": journal})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", action="append", dest="dirs")
+    parser.add_argument("--saves", type=int, default=30)
+    parser.add_argument("--boards", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=100)
+    args = parser.parse_args()
+    dirs = args.dirs or [d for d in ("/dev/shm", tempfile.gettempdir()) if os.path.isdir(d)]
+    print(f"{args.boards} boards x {args.rows} rows, median of {args.saves} saves")
+    print(f"{'directory':<20} {'level':<6} {'save_backup ms':>15} {'journal_board ms':>17}")
+    for base in dirs:
+        for r in bench_dir(base, args.saves, args.boards, args.rows):
+            print(f"{r['dir']:<20} {r['level']:<6} {r['save_backup_s'] * 1000:>15.2f} {r['journal_board_s'] * 1000:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: save / load time and bytes on disk for each backup format (BACKUP_FORMATS).
+
+Usage: python benchmarks/bench_formats.py [--boards 200] [--rows 250] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import NeoAnki  # noqa: E402
+
+
+def make_collection(boards: int, rows: int) -> tuple[dict, dict]:
+    tables = {
+        f"board {b:04d}": [(f"word{b}_{r}", f"tłumaczenie {r} ({b})" if r % 3 else "") for r in range(rows)]
+        for b in range(boards)
+    }
+    to_repeat = {name: table[::7] for name, table in tables.items()}
+    return tables, to_repeat
+
+
+def bench_format(fmt: str, tables: dict, to_repeat: dict, repeat: int, workdir: str) -> dict:
+    path = os.path.join(workdir, f"backup-{fmt}.json")
+    NeoAnki.BACKUP_PATH = path
+    NeoAnki.BACKUP_BACKUP_PATH = path + ".bak"
+    NeoAnki.BACKUP_JOURNAL_PATH = path + ".journal"
+    NeoAnki.BACKUP_INDEX_PATH = path + ".index"
+    NeoAnki.BACKUP_FORMAT = fmt
+    save_times, load_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        NeoAnki.save_backup(tables, to_repeat)
+        save_times.append(time.perf_counter() - start)
+        NeoAnki._backup_store.invalidate()
+        start = time.perf_counter()
+        loaded, _, _ = NeoAnki.load_backup()
+        load_times.append(time.perf_counter() - start)
+        assert len(loaded) == len(tables)
+    return {
+        "format": fmt,
+        "save_s": min(save_times),
+        "load_s": min(load_times),
+        "bytes": os.path.getsize(path),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boards", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    tables, to_repeat = make_collection(args.boards, args.rows)
+    print(f"{args.boards} boards x {args.rows} rows, best of {args.repeat}")
+    print(f"{'format':<8} {'save ms':>9} {'load ms':>9} {'bytes':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for fmt in NeoAnki.BACKUP_FORMATS:
+            r = bench_format(fmt, tables, to_repeat, args.repeat, workdir)
+            print(f"{fmt:<8} {r['save_s'] * 1000:>9.1f} {r['load_s'] * 1000:>9.1f} {r['bytes']:>12,}")
+
+
+if __name__ == "__main__":
+    main()
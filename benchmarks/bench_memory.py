@@ -0,0 +1,64 @@
+"""Benchmark: memory retained per card by a loaded board, tuple rows vs CardStore.
+
+Parses the same board JSON twice under tracemalloc: once into a list of (word, translation)
+tuples with a separate to_repeat list (how boards were held before CardStore), once with
+_parse_board_payload. Reports bytes retained per card after the raw JSON is dropped.
+
+Usage: python benchmarks/bench_memory.py [--cards 500000] [--repeat-every 10]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import NeoAnki  # noqa: E402
+
+
+def make_board_json(cards: int, repeat_every: int) -> str:
+    rows = [[f"word{i}", f"translation {i}" if i % 3 else ""] for i in range(cards)]
+    return json.dumps({"table": rows, "to_repeat": rows[::repeat_every]})
+
+
+def tuple_rows(text: str):
+    data = json.loads(text)
+    table = [(w, t) for w, t in data["table"]]
+    to_repeat = [(w, t) for w, t in data["to_repeat"]]
+    return table, to_repeat
+
+
+def card_store(text: str):
+    return NeoAnki._parse_board_payload(json.loads(text))
+
+
+def retained_bytes(parse, text: str) -> int:
+    """Bytes still allocated after parse(text), i.e. held by its result."""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    board = parse(text)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del board
+    return used
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=500_000)
+    parser.add_argument("--repeat-every", type=int, default=10, help="every Nth card is in to_repeat")
+    args = parser.parse_args()
+    text = make_board_json(args.cards, args.repeat_every)
+    print(f"{args.cards} cards, every {args.repeat_every}th to repeat")
+    print(f"{'layout':<12} {'MiB':>8} {'bytes/card':>11}")
+    for label, parse in (("tuples", tuple_rows), ("CardStore", card_store)):
+        used = retained_bytes(parse, text)
+        print(f"{label:<12} {used / (1 << 20):>8.1f} {used / args.cards:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
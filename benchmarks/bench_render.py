@@ -0,0 +1,87 @@
+"""Benchmark: frames per second of the Shuffle review loop's redraw.
+
+Each frame reveals one more translation and redraws the table, the way "Show next translation"
+does. Compares the old redraw (os.system("clear") + printing every row) with TableViewport +
+Screen (one escape-sequence write, only changed lines). Output goes to /dev/null, so the numbers
+cover building the frame and the process spawn, not the terminal's own drawing; bytes/frame shows
+how much the terminal would have to draw.
+
+Usage: python benchmarks/bench_render.py [--rows 5000] [--frames 200] [--lines 50]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import NeoAnki  # noqa: E402
+
+
+class CountingSink(io.TextIOBase):
+    """Text stream that discards what is written and counts the characters."""
+
+    def __init__(self) -> None:
+        self.chars = 0
+
+    def write(self, s: str) -> int:
+        self.chars += len(s)
+        return len(s)
+
+
+def old_frame(table, revealed: int, to_repeat) -> None:
+    os.system("clear")
+    print(NeoAnki._table_display_with_revealed(table, revealed, to_repeat))
+
+
+def run(draw, frames: int) -> tuple[float, float]:
+    """Returns (frames per second, characters written per frame)."""
+    sink = CountingSink()
+    real_stdout = sys.stdout
+    sys.stdout = sink
+    try:
+        start = time.perf_counter()
+        for revealed in range(1, frames + 1):
+            draw(revealed)
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.stdout = real_stdout
+    return frames / elapsed, sink.chars / frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=50, help="terminal height to simulate")
+    args = parser.parse_args()
+    os.environ["LINES"], os.environ["COLUMNS"] = str(args.lines), "120"
+    os.environ.setdefault("TERM", "xterm")
+    table = NeoAnki.CardStore((f"word{i}", f"translation {i}") for i in range(args.rows))
+    to_repeat = NeoAnki.RepeatSet(table)
+    for i in range(0, args.rows, 7):
+        to_repeat.flag(i)
+
+    # os.system's child writes to file descriptor 1 directly.
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    saved_fd = os.dup(1)
+    os.dup2(devnull, 1)
+    try:
+        old = run(lambda r: old_frame(table, r, to_repeat), args.frames)
+        NeoAnki._ansi_terminal = lambda: True
+        view, screen = NeoAnki.TableViewport(), NeoAnki.Screen()
+        new = run(lambda r: screen.draw(view.render(table, r, to_repeat)), args.frames)
+    finally:
+        os.dup2(saved_fd, 1)
+        os.close(devnull)
+        os.close(saved_fd)
+
+    print(f"{args.rows} rows, {args.frames} frames, {args.lines}-line terminal")
+    print(f"{'renderer':<28} {'frames/s':>10} {'chars/frame':>12}")
+    for label, (fps, chars) in (("clear + full table", old), ("viewport + screen diff", new)):
+        print(f"{label:<28} {fps:>10.1f} {chars:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark: building the search index and answering queries on a large collection.
+
+Saves a generated collection to a temporary JSON backup, then times the first search (which
+builds the trigram index), queries of different lengths (median), and one re-indexed board
+after save_board.
+
+Usage: python benchmarks/bench_search.py [--cards 100000] [--boards 100] [--queries 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import NeoAnki  # noqa: E402
+
+
+def point_backup_at(workdir: str) -> None:
+    path = os.path.join(workdir, "neoanki_backup.json")
+    NeoAnki.BACKUP_PATH = path
+    NeoAnki.BACKUP_BACKUP_PATH = path + ".bak"
+    NeoAnki.BACKUP_JOURNAL_PATH = path + ".journal"
+    NeoAnki.BACKUP_INDEX_PATH = path + ".index"
+    NeoAnki.BACKUP_DURABILITY = "none"
+
+
+def make_word(rnd: random.Random) -> str:
+    return "".join(rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rnd.randint(4, 10)))
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--boards", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    rnd = random.Random(1)
+    per_board = args.cards // args.boards
+    boards = {
+        f"board {b}": [(make_word(rnd), f"{make_word(rnd)} {make_word(rnd)}") for _ in range(per_board)]
+        for b in range(args.boards)
+    }
+    words = [w for table in boards.values() for w, _ in table]
+    with tempfile.TemporaryDirectory() as workdir:
+        point_backup_at(workdir)
+        NeoAnki.save_backup(boards, {})
+        build = timed(lambda: NeoAnki.search_cards("zzz"))
+        print(f"{args.cards} cards in {args.boards} boards")
+        print(f"first search (builds index): {build * 1000:.0f} ms")
+        for length in (2, 3, 5, 8):
+            needles = [w[:length] for w in rnd.sample(words, args.queries)]
+            per_query = statistics.median(timed(lambda q=q: NeoAnki.search_cards(q)) for q in needles)
+            print(f"query of {length} chars: {per_query * 1000:.2f} ms (median)")
+        table = boards["board 0"] + [("newword", "")]
+        print(f"save_board re-index: {timed(lambda: NeoAnki.save_board('board 0', table, [])) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark: time to the first card after "Shuffle again", by board size.
+
+Compares shuffling the whole board up front (the old CardStore.shuffle, random.shuffle on an
+index list) with the lazy shuffle, which only settles the rows that are read. "first card" reads
+one row; "first page" reads a screenful (50 rows), as the review screen does; "all" reads every row.
+
+Usage: python benchmarks/bench_shuffle.py [--sizes 1000 100000 1000000] [--seed 1]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import NeoAnki  # noqa: E402
+
+PAGE = 50
+
+
+def eager_shuffle(cards: NeoAnki.CardStore, rng: random.Random) -> None:
+    order = list(range(len(cards)))
+    rng.shuffle(order)
+    cards._words = [cards._words[i] for i in order]
+    cards._trans = [cards._trans[i] for i in order]
+    cards._ids = array("I", (cards._ids[i] for i in order))
+
+
+def timed_ms(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(f"{'rows':>9}  {'eager':>9}  {'lazy: first card':>16}  {'first page':>10}  {'all':>9}   (ms)")
+    for n in args.sizes:
+        cards = NeoAnki.CardStore((f"w{i}", f"t{i}") for i in range(n))
+        rng = random.Random(args.seed)
+        eager = timed_ms(lambda: (eager_shuffle(cards, rng), cards[0]))
+        first = timed_ms(lambda: (cards.shuffle(rng), cards[0]))
+        page = timed_ms(lambda: (cards.shuffle(rng), cards[PAGE - 1]))
+        full = timed_ms(lambda: (cards.shuffle(rng), cards[-1]))
+        print(f"{n:>9}  {eager:>9.2f}  {first:>16.3f}  {page:>10.3f}  {full:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark: startup cost, with a budget that fails the run when it regresses.
+
+Measures, in fresh interpreters:
+  * `import NeoAnki` with -X importtime: the slowest imports, by cumulative time;
+  * wall-clock time from process start to `import NeoAnki` done (what the CLI subcommands pay);
+  * wall-clock time from process start to the first menu prompt of main(). The prompt itself is
+    replaced by a stub that exits, so no terminal is needed; loading questionary is included.
+
+Exits with status 1 if the median time to first prompt exceeds --budget-ms (or the import
+exceeds --import-budget-ms), so it can run in CI.
+
+Usage: python benchmarks/bench_startup.py [--runs 10] [--budget-ms 400] [--import-budget-ms 150]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Child process: points the backup at a temp dir, then runs main() until its first prompt.
+FIRST_PROMPT = """
+import os, sys
+sys.path.insert(0, {repo!r})
+import NeoAnki
+NeoAnki.BACKUP_PATH = os.path.join({workdir!r}, "neoanki_backup.json")
+NeoAnki.BACKUP_BACKUP_PATH = NeoAnki.BACKUP_PATH + ".bak"
+NeoAnki.BACKUP_JOURNAL_PATH = NeoAnki.BACKUP_PATH + ".journal"
+NeoAnki.BACKUP_INDEX_PATH = NeoAnki.BACKUP_PATH + ".index"
+NeoAnki.clearScreen = lambda: None
+def first_prompt(*a, **k):
+    os._exit(0)
+NeoAnki.questionary.select = first_prompt
+NeoAnki.main()
+os._exit(1)
+"""
+
+IMPORT_ONLY = "import sys; sys.path.insert(0, {repo!r}); import NeoAnki"
+
+
+def wall_ms(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def slowest_imports(top: int) -> list[tuple[int, str]]:
+    """(cumulative microseconds, module) of the slowest imports under `import NeoAnki`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_ONLY.format(repo=REPO)],
+        check=True, capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="max median time to first prompt")
+    parser.add_argument("--import-budget-ms", type=float, default=150.0, help="max median time to import NeoAnki")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args()
+
+    print("slowest imports under `import NeoAnki` (cumulative ms):")
+    for us, name in slowest_imports(args.top):
+        print(f"  {us / 1000:>8.1f}  {name}")
+
+    baseline = statistics.median(wall_ms("pass") for _ in range(args.runs))
+    imported = statistics.median(wall_ms(IMPORT_ONLY.format(repo=REPO)) for _ in range(args.runs))
+    with tempfile.TemporaryDirectory() as workdir:
+        code = FIRST_PROMPT.format(repo=REPO, workdir=workdir)
+        prompt = statistics.median(wall_ms(code) for _ in range(args.runs))
+
+    print(f"\nmedian of {args.runs} runs (wall clock, ms)")
+    print(f"  bare interpreter   {baseline:>8.1f}")
+    print(f"  import NeoAnki     {imported:>8.1f}   budget {args.import_budget_ms:.0f}")
+    print(f"  first prompt       {prompt:>8.1f}   budget {args.budget_ms:.0f}")
+    failed = [label for label, value, budget in (
+        ("import NeoAnki", imported, args.import_budget_ms),
+        ("first prompt", prompt, args.budget_ms),
+    ) if value > budget]
+    if failed:
+        print(f"\nOVER BUDGET: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
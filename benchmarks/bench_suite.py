@@ -0,0 +1,168 @@
+"""Benchmark suite: storage, parsing and rendering paths over synthetic collections, with a baseline check.
+
+For every collection size (total rows, spread over a number of boards) times, best of --repeat:
+  * save_backup        full write of the JSON backup (main file and index, no previous files);
+  * load_backup        cold read of that file (BackupStore cache dropped);
+  * _parse_backup_data the already decoded JSON document;
+  * _validate_table    every board, as plain lists of pairs;
+  * _parse_table_cell  every row, as "word|translation" input cells;
+  * display            _table_display_with_revealed, format_translations_display and one
+                       TableViewport page of the largest board.
+Saves run with NEOANKI_DURABILITY=none unless --durability says otherwise, so fsync noise does not
+hide regressions in the code (bench_durability.py measures fsync cost).
+
+Results are written as JSON (--output). With --baseline, each case is compared with an earlier
+results file and the run exits with status 1 if any case got more than --tolerance times slower
+(cases faster than --min-ms in both runs are ignored as noise).
+
+Usage: python benchmarks/bench_suite.py [--rows 1000 10000 100000 1000000] [--boards 1 10 100 1000]
+           [--repeat 3] [--output results.json] [--baseline old.json] [--tolerance 1.5] [--min-ms 1]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import NeoAnki  # noqa: E402
+
+
+def make_collection(rows: int, boards: int) -> tuple[dict, dict]:
+    per_board = rows // boards
+    tables = {
+        f"board {b:04d}": [(f"word{b}_{r}", f"tłumaczenie {r} ({b})" if r % 3 else "") for r in range(per_board)]
+        for b in range(boards)
+    }
+    to_repeat = {name: table[::7] for name, table in tables.items()}
+    return tables, to_repeat
+
+
+def best_of(repeat: int, func, setup=None) -> float:
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def use_backup(workdir: str) -> None:
+    path = os.path.join(workdir, "neoanki_backup.json")
+    NeoAnki.BACKUP_PATH = path
+    NeoAnki.BACKUP_BACKUP_PATH = path + ".bak"
+    NeoAnki.BACKUP_JOURNAL_PATH = path + ".journal"
+    NeoAnki.BACKUP_INDEX_PATH = path + ".index"
+    NeoAnki.BACKUP_BACKEND = "json"
+
+
+def remove_backup() -> None:
+    for path in (NeoAnki.BACKUP_PATH, NeoAnki.BACKUP_BACKUP_PATH, NeoAnki.BACKUP_INDEX_PATH):
+        if os.path.exists(path):
+            os.remove(path)
+    NeoAnki._backup_store.invalidate()
+
+
+def bench_collection(rows: int, boards: int, repeat: int, workdir: str) -> dict[str, float]:
+    """Seconds per operation for one collection size."""
+    tables, to_repeat = make_collection(rows, boards)
+    use_backup(workdir)
+    results = {}
+    results["save_backup"] = best_of(repeat, lambda: NeoAnki.save_backup(tables, to_repeat), remove_backup)
+    results["load_backup"] = best_of(repeat, NeoAnki.load_backup, NeoAnki._backup_store.invalidate)
+    with open(NeoAnki.BACKUP_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    results["_parse_backup_data"] = best_of(repeat, lambda: NeoAnki._parse_backup_data(data))
+    results["_validate_table"] = best_of(
+        repeat, lambda: all(NeoAnki._validate_table(t) for t in tables.values())
+    )
+    cells = [f"{w}|{t}" if t else w for table in tables.values() for w, t in table]
+    results["_parse_table_cell"] = best_of(repeat, lambda: [NeoAnki._parse_table_cell(c) for c in cells])
+
+    largest = NeoAnki.CardStore(max(tables.values(), key=len))
+    flags = NeoAnki.RepeatSet(largest, largest[::7])
+    view = NeoAnki.TableViewport()
+    results["_table_display_with_revealed"] = best_of(
+        repeat, lambda: NeoAnki._table_display_with_revealed(largest, len(largest) // 2, flags)
+    )
+    results["format_translations_display"] = best_of(repeat, lambda: NeoAnki.format_translations_display(largest))
+    results["TableViewport.render"] = best_of(repeat, lambda: view.render(largest, len(largest) // 2, flags))
+    remove_backup()
+    return results
+
+
+def compare(current: dict[str, float], baseline: dict[str, float], tolerance: float, min_s: float) -> list[str]:
+    """Cases of `current` more than `tolerance` times slower than in `baseline`."""
+    slower = []
+    for case, seconds in current.items():
+        before = baseline.get(case)
+        if before is None or max(seconds, before) < min_s:
+            continue
+        if seconds > before * tolerance:
+            slower.append(case)
+    return slower
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--boards", type=int, nargs="+", default=[1, 10, 100, 1_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--durability", choices=NeoAnki.BACKUP_DURABILITY_LEVELS, default="none")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="slowdown factor that fails the run")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="ignore cases faster than this in both runs")
+    args = parser.parse_args()
+    NeoAnki.BACKUP_DURABILITY = args.durability
+    NeoAnki.BACKUP_FORMAT = "pretty"
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results: dict[str, float] = {}
+    print(f"best of {args.repeat}, ms" + (f" (baseline: {args.baseline})" if baseline else ""))
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            for boards in args.boards:
+                if boards > rows:
+                    continue
+                print(f"\n{rows:,} rows in {boards:,} boards")
+                for op, seconds in bench_collection(rows, boards, args.repeat, workdir).items():
+                    case = f"{op} rows={rows} boards={boards}"
+                    results[case] = seconds
+                    line = f"  {op:<30} {seconds * 1000:>10.2f}"
+                    if baseline and case in baseline:
+                        line += f"   {seconds / baseline[case] if baseline[case] else float('inf'):>5.2f}x"
+                    print(line, flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "durability": args.durability,
+                "time": time.time(),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nwrote {args.output}")
+    if baseline is not None:
+        slower = compare(results, baseline, args.tolerance, args.min_ms / 1000)
+        if slower:
+            print(f"\nSLOWER than baseline by more than {args.tolerance}x:")
+            for case in slower:
+                print(f"  {case}: {baseline[case] * 1000:.2f} -> {results[case] * 1000:.2f} ms")
+            sys.exit(1)
+        print(f"\nno case slower than {args.tolerance}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-"""Pytest fixtures: isolated backup path for tests."""
+"""Pytest fixtures: isolated backup path for tests, and a fixture running a test once per storage backend."""
 import pytest
 
 
@@ -8,4 +8,23 @@ def backup_path(tmp_path, monkeypatch):
     import NeoAnki
     monkeypatch.setattr(NeoAnki, "BACKUP_PATH", str(path))
     monkeypatch.setattr(NeoAnki, "BACKUP_BACKUP_PATH", str(path) + ".bak")
+    monkeypatch.setattr(NeoAnki, "BACKUP_JOURNAL_PATH", str(path) + ".journal")
+    monkeypatch.setattr(NeoAnki, "BACKUP_INDEX_PATH", str(path) + ".index")
+    monkeypatch.setattr(NeoAnki, "BACKUP_DB_PATH", str(tmp_path / "neoanki_backup.sqlite3"))
+    monkeypatch.setattr(NeoAnki, "BACKUP_DIR_PATH", str(tmp_path / "neoanki_backup.d"))
+    monkeypatch.setattr(NeoAnki, "EVENTS_PATH", str(tmp_path / "neoanki_events.log"))
+    monkeypatch.setattr(NeoAnki, "EVENTS_STATS_PATH", str(tmp_path / "neoanki_events.log.stats"))
+    monkeypatch.setattr(NeoAnki, "_event_log", NeoAnki.EventLog())
+    monkeypatch.setattr(NeoAnki, "BACKUP_BACKEND", "json")
+    monkeypatch.setattr(NeoAnki, "BACKUP_FORMAT", "pretty")
+    monkeypatch.setattr(NeoAnki, "BACKUP_DURABILITY", "dir")
+    monkeypatch.setattr(NeoAnki, "_search_index", NeoAnki.SearchIndex())
     return path
+
+
+@pytest.fixture(params=["json", "dir", "sqlite"])
+def backend(request, monkeypatch):
+    """Runs the test once per storage backend (BACKUP_BACKEND)."""
+    import NeoAnki
+    monkeypatch.setattr(NeoAnki, "BACKUP_BACKEND", request.param)
+    return request.param
@@ -1,5 +1,6 @@
 """E2E test: running main() with mocked questionary/input, asserting backup state."""
 import json
+import random
 
 import NeoAnki
 
@@ -141,4 +142,25 @@ def test_main_recovery_from_bak_shows_message(capsys, monkeypatch, backup_path):
     out = capsys.readouterr().out
     assert "Recovered" in out or "recovered" in out or ".bak" in out
     tables, _, _ = NeoAnki.load_backup()
-    assert tables == {"x": [("y", "")]}
\ No newline at end of file
+    assert tables == {"x": [("y", "")]}
+
+
+def test_main_show_to_repeat_shuffle_follows_the_seed(capsys, monkeypatch, backup_path):
+    """Show to repeat shuffles with the module RNG, so NEOANKI_SHUFFLE_SEED replays it."""
+    rows = [[f"w{i}", f"t{i}"] for i in range(12)]
+    backup_path.write_text(json.dumps({"b": {"table": rows, "to_repeat": list(range(12))}}), encoding="utf-8")
+    monkeypatch.setattr(NeoAnki, "clearScreen", lambda: None)
+    monkeypatch.setattr("builtins.input", lambda _: None)
+    monkeypatch.setattr(NeoAnki, "getShuffledTable", lambda t: t)
+    monkeypatch.setattr(NeoAnki.random, "shuffle", lambda *a: (_ for _ in ()).throw(AssertionError("global RNG")))
+    outputs = []
+    for _ in range(2):
+        monkeypatch.setattr(NeoAnki, "_shuffle_rng", random.Random(42))
+        monkeypatch.setattr(NeoAnki.questionary, "select", _make_select_mock([
+            "Load table from backup", "b", "Shuffle", "Show to repeat", "Show all translations", "Back",
+            "Back to menu", "Exit",
+        ]))
+        NeoAnki.main()
+        out = capsys.readouterr().out
+        outputs.append(out[out.index("To repeat — order as after shuffle"):])
+    assert outputs[0] == outputs[1]
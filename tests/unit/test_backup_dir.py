@@ -0,0 +1,101 @@
+"""Unit tests for the per-board directory layout (NEOANKI_BACKEND=dir)."""
+import json
+import os
+
+import pytest
+
+import NeoAnki
+
+
+@pytest.fixture
+def dir_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(NeoAnki, "BACKUP_BACKEND", "dir")
+    return tmp_path / "neoanki_backup.d"
+
+
+def _shard(dir_backend, name):
+    return dir_backend / "boards" / NeoAnki._dir_shard_file_name(name)
+
+
+def test_dir_save_then_load_roundtrip(dir_backend):
+    NeoAnki.save_backup({"a": [("ą", "aa"), ("b", "")], "c": []}, {"a": [("b", "")]})
+    tables, to_repeat, recovered = NeoAnki.load_backup()
+    assert tables == {"a": [("ą", "aa"), ("b", "")], "c": []}
+    assert to_repeat["a"] == [("b", "")]
+    assert recovered is False
+    manifest = json.loads((dir_backend / "manifest.json").read_text(encoding="utf-8"))
+    assert set(manifest["boards"]) == {"a", "c"}
+
+
+def test_dir_save_rewrites_only_changed_boards(dir_backend):
+    NeoAnki.save_backup({"a": [("x", "")], "b": [("y", "")]}, {})
+    b_inode = os.stat(_shard(dir_backend, "b")).st_ino
+    a_inode = os.stat(_shard(dir_backend, "a")).st_ino
+    NeoAnki.save_backup({"a": [("x", ""), ("z", "")], "b": [("y", "")]}, {})
+    assert os.stat(_shard(dir_backend, "b")).st_ino == b_inode
+    assert os.stat(_shard(dir_backend, "a")).st_ino != a_inode
+
+
+def test_dir_save_board_and_delete(dir_backend):
+    NeoAnki.save_backup({"a": [("x", "")], "b": [("y", "")]}, {})
+    NeoAnki.save_board("b", [("y", ""), ("w", "")], [("w", "")])
+    assert NeoAnki.load_board("b") == ([("y", ""), ("w", "")], [("w", "")])
+    NeoAnki.save_backup({"b": [("y", "")]}, {})
+    assert not _shard(dir_backend, "a").exists()
+    tables, _, _ = NeoAnki.load_backup()
+    assert tables == {"b": [("y", "")]}
+
+
+def test_dir_corrupted_shard_falls_back_only_for_that_board(dir_backend):
+    NeoAnki.save_backup({"a": [("old", "")], "b": [("y", "")]}, {})
+    NeoAnki.save_backup({"a": [("new", "")], "b": [("y", "")]}, {})
+    _shard(dir_backend, "a").write_text("not json", encoding="utf-8")
+    NeoAnki._backup_store.invalidate()
+    tables, _, recovered = NeoAnki.load_backup()
+    assert tables == {"a": [("old", "")], "b": [("y", "")]}
+    assert recovered is True
+    assert json.loads(_shard(dir_backend, "a").read_text(encoding="utf-8"))["table"] == [["old", ""]]
+
+
+def test_dir_load_board_reads_only_its_shard(dir_backend, monkeypatch):
+    NeoAnki.save_backup({"a": [("old", "")], "b": [("y", "")]}, {})
+    NeoAnki.save_backup({"a": [("new", "")], "b": [("y", "")]}, {})
+    _shard(dir_backend, "a").write_text("not json", encoding="utf-8")
+    NeoAnki._backup_store.invalidate()
+    read = []
+    real = NeoAnki._dir_read_shard
+    monkeypatch.setattr(NeoAnki, "_dir_read_shard", lambda f: read.append(f) or real(f))
+    assert NeoAnki.backup_recovered() is False and read == []
+    assert NeoAnki.load_board("b") == ([("y", "")], [])
+    assert NeoAnki.load_board("a") == ([("old", "")], [])
+    assert read == [_shard(dir_backend, "b").name, _shard(dir_backend, "a").name]
+    assert NeoAnki.backup_recovered() is True and NeoAnki.backup_recovered() is False
+
+
+def test_dir_missing_manifest_rebuilt_from_shards(dir_backend):
+    NeoAnki.save_backup({"a": [("x", "")], "b": [("y", "")]}, {})
+    (dir_backend / "manifest.json").unlink()
+    tables, _, _ = NeoAnki.load_backup()
+    assert tables == {"a": [("x", "")], "b": [("y", "")]}
+
+
+def test_dir_rebuild_ignores_leftover_temp_files(dir_backend, monkeypatch):
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    stale = json.loads(_shard(dir_backend, "a").read_text(encoding="utf-8"))
+    stale["table"] = [["old", ""]]
+    (dir_backend / "boards" / "tmpzzzz.json").write_text(json.dumps(stale), encoding="utf-8")
+    (dir_backend / "manifest.json").unlink()
+    NeoAnki._backup_store.invalidate()
+    assert NeoAnki.load_backup()[0] == {"a": [("x", "")]}
+    temps = []
+    real = NeoAnki.tempfile.mkstemp
+    monkeypatch.setattr(NeoAnki.tempfile, "mkstemp", lambda **k: temps.append(k["suffix"]) or real(**k))
+    NeoAnki.save_board("a", [("y", "")], [])
+    assert temps and set(temps) == {".tmp"}
+
+
+def test_dir_seeded_from_existing_json(dir_backend, backup_path):
+    backup_path.write_text(json.dumps({"old": [["w", "t"]]}), encoding="utf-8")
+    tables, _, _ = NeoAnki.load_backup()
+    assert tables == {"old": [("w", "t")]}
+    assert _shard(dir_backend, "old").exists()
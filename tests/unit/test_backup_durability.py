@@ -0,0 +1,53 @@
+"""Unit tests for BACKUP_DURABILITY (fsync of files and directories)."""
+
+import pytest
+
+import NeoAnki
+
+
+@pytest.fixture
+def synced(monkeypatch):
+    """Records what gets synced: ('file', path) for data, ('dir', path) for directories."""
+    calls = []
+    monkeypatch.setattr(NeoAnki, "_fsync_path", lambda p: calls.append(("file", p)))
+    monkeypatch.setattr(NeoAnki, "_fsync_dir", lambda p: calls.append(("dir", p)))
+    real_fsync = NeoAnki.os.fsync
+    def fsync(fd):
+        calls.append(("fd", fd))
+        real_fsync(fd)
+    monkeypatch.setattr(NeoAnki.os, "fsync", fsync)
+    return calls
+
+
+@pytest.mark.parametrize("level,expected", [("none", set()), ("file", {"file"}), ("dir", {"file", "dir"})])
+def test_save_backup_syncs_per_level(monkeypatch, synced, level, expected):
+    monkeypatch.setattr(NeoAnki, "BACKUP_DURABILITY", level)
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    assert {kind for kind, _ in synced} == expected
+
+
+@pytest.mark.parametrize("level,expected", [("none", set()), ("file", {"fd"}), ("dir", {"fd", "dir"})])
+def test_journal_append_syncs_per_level(monkeypatch, synced, level, expected):
+    monkeypatch.setattr(NeoAnki, "BACKUP_DURABILITY", level)
+    NeoAnki.journal_board("a", [("x", "")], [])
+    assert {kind for kind, _ in synced} == expected
+
+
+def test_index_is_not_synced(monkeypatch, synced, backup_path):
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    synced_paths = [p for _, p in synced if isinstance(p, str)]
+    assert not any(p.endswith(".index") for p in synced_paths)
+
+
+def test_sqlite_synchronous_follows_level(monkeypatch, tmp_path):
+    monkeypatch.setattr(NeoAnki, "BACKUP_BACKEND", "sqlite")
+    for level, expected in (("none", 0), ("file", 2), ("dir", 3)):
+        monkeypatch.setattr(NeoAnki, "BACKUP_DURABILITY", level)
+        conn = NeoAnki._db_connect()  # shared connection: not closed here
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == expected
+
+
+def test_unknown_level_rejected(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "BACKUP_DURABILITY", "paranoid")
+    with pytest.raises(ValueError):
+        NeoAnki.save_backup({"a": []}, {})
@@ -0,0 +1,61 @@
+"""Unit tests for backup encodings (BACKUP_FORMAT) and format auto-detection."""
+import gzip
+import json
+
+import pytest
+
+import NeoAnki
+
+BOARDS = {"a": [("ą", "aa"), ("b", "")], "c": []}
+TO_REPEAT = {"a": [("b", "")]}
+
+
+@pytest.mark.parametrize("fmt", NeoAnki.BACKUP_FORMATS)
+def test_save_load_roundtrip_each_format(monkeypatch, backup_path, fmt):
+    monkeypatch.setattr(NeoAnki, "BACKUP_FORMAT", fmt)
+    NeoAnki.save_backup(BOARDS, TO_REPEAT)
+    NeoAnki._backup_store.invalidate()
+    tables, to_repeat, _ = NeoAnki.load_backup()
+    assert tables == BOARDS
+    assert to_repeat["a"] == [("b", "")]
+
+
+def test_compact_is_minified_json(monkeypatch, backup_path):
+    monkeypatch.setattr(NeoAnki, "BACKUP_FORMAT", "compact")
+    NeoAnki.save_backup(BOARDS, TO_REPEAT)
+    text = backup_path.read_text(encoding="utf-8")
+    assert "\n" not in text and ": " not in text
+    assert json.loads(text)["a"]["to_repeat"] == [1]
+
+
+def test_compressed_files_have_magic_header(monkeypatch, backup_path):
+    monkeypatch.setattr(NeoAnki, "BACKUP_FORMAT", "gzip")
+    NeoAnki.save_backup(BOARDS, TO_REPEAT)
+    assert json.loads(gzip.decompress(backup_path.read_bytes()))["c"] == {"table": [], "to_repeat": []}
+    monkeypatch.setattr(NeoAnki, "BACKUP_FORMAT", "zlib")
+    NeoAnki.save_backup(BOARDS, TO_REPEAT)
+    assert backup_path.read_bytes().startswith(NeoAnki._ZLIB_MAGIC)
+
+
+def test_pretty_file_loads_after_switching_format(monkeypatch, backup_path):
+    backup_path.write_text(json.dumps({"old": [["x", ""]]}, indent=2), encoding="utf-8")
+    monkeypatch.setattr(NeoAnki, "BACKUP_FORMAT", "zlib")
+    tables, _, _ = NeoAnki.load_backup()
+    assert tables == {"old": [("x", "")]}
+
+
+def test_truncated_compressed_main_falls_back_to_bak(monkeypatch, backup_path):
+    monkeypatch.setattr(NeoAnki, "BACKUP_FORMAT", "zlib")
+    NeoAnki.save_backup({"first": [("a", "")]}, {})
+    NeoAnki.save_backup({"second": [("b", "")]}, {})
+    backup_path.write_bytes(backup_path.read_bytes()[:-4])
+    NeoAnki._backup_store.invalidate()
+    tables, _, recovered = NeoAnki.load_backup()
+    assert tables == {"first": [("a", "")]}
+    assert recovered is True
+
+
+def test_unknown_format_rejected(monkeypatch, backup_path):
+    monkeypatch.setattr(NeoAnki, "BACKUP_FORMAT", "xml")
+    with pytest.raises(ValueError):
+        NeoAnki.save_backup(BOARDS, TO_REPEAT)
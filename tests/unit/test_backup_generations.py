@@ -0,0 +1,63 @@
+"""Unit tests for .bak rotation (hardlinked newest generation, BACKUP_GENERATIONS kept)."""
+import json
+import os
+
+import NeoAnki
+
+
+def _bak(backup_path, n=1):
+    suffix = ".bak" if n == 1 else f".bak.{n}"
+    return backup_path.with_name(backup_path.name + suffix)
+
+
+def test_bak_is_previous_file_not_a_copy(backup_path):
+    NeoAnki.save_backup({"first": [("a", "")]}, {})
+    first_inode = os.stat(backup_path).st_ino
+    NeoAnki.save_backup({"second": [("b", "")]}, {})
+    assert os.stat(_bak(backup_path)).st_ino == first_inode
+    assert os.stat(backup_path).st_ino != first_inode
+
+
+def test_generations_rotate(monkeypatch, backup_path):
+    monkeypatch.setattr(NeoAnki, "BACKUP_GENERATIONS", 3)
+    for i in range(5):
+        NeoAnki.save_backup({f"v{i}": [("x", "")]}, {})
+    kept = [set(json.loads(_bak(backup_path, n).read_text(encoding="utf-8"))) for n in (1, 2, 3)]
+    assert kept == [{"v3"}, {"v2"}, {"v1"}]
+    assert not _bak(backup_path, 4).exists()
+
+
+def test_load_walks_back_generations(monkeypatch, backup_path):
+    monkeypatch.setattr(NeoAnki, "BACKUP_GENERATIONS", 3)
+    for i in range(3):
+        NeoAnki.save_backup({f"v{i}": [("x", "")]}, {})
+    backup_path.write_text("not json", encoding="utf-8")
+    _bak(backup_path, 1).write_text("{broken", encoding="utf-8")
+    tables, _, recovered = NeoAnki.load_backup()
+    assert tables == {"v0": [("x", "")]}
+    assert recovered is True
+    assert set(json.loads(backup_path.read_text(encoding="utf-8"))) == {"v0"}
+
+
+def test_rotate_falls_back_to_copy_without_hardlinks(monkeypatch, backup_path):
+    def no_link(src, dst):
+        raise OSError("hardlinks not supported")
+    monkeypatch.setattr(NeoAnki.os, "link", no_link)
+    NeoAnki.save_backup({"first": [("a", "")]}, {})
+    NeoAnki.save_backup({"second": [("b", "")]}, {})
+    assert set(json.loads(_bak(backup_path).read_text(encoding="utf-8"))) == {"first"}
+
+
+def test_dir_shard_walks_back_generations(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "BACKUP_BACKEND", "dir")
+    monkeypatch.setattr(NeoAnki, "BACKUP_GENERATIONS", 2)
+    for rows in ([("v0", "")], [("v1", "")], [("v2", "")]):
+        NeoAnki.save_backup({"a": rows}, {})
+    shard = NeoAnki._dir_shard_path(NeoAnki._dir_shard_file_name("a"))
+    for p in (shard, shard + ".bak"):
+        with open(p, "w", encoding="utf-8") as f:
+            f.write("garbage")
+    NeoAnki._backup_store.invalidate()
+    tables, _, recovered = NeoAnki.load_backup()
+    assert tables == {"a": [("v0", "")]}
+    assert recovered is True
@@ -0,0 +1,95 @@
+"""Unit tests for the append-only backup journal (journal_board / compact_journal)."""
+import json
+import random
+
+import NeoAnki
+
+
+def _journal_path(backup_path):
+    return backup_path.with_suffix(backup_path.suffix + ".journal")
+
+
+def test_journal_board_does_not_rewrite_main(backup_path):
+    NeoAnki.save_backup({"a": [("x", "")], "b": [("y", "")]}, {})
+    before = backup_path.read_text(encoding="utf-8")
+    NeoAnki.journal_board("a", [("x", ""), ("z", "Z")], [("z", "Z")])
+    assert backup_path.read_text(encoding="utf-8") == before
+    assert _journal_path(backup_path).exists()
+
+
+def test_load_backup_replays_journal(backup_path):
+    NeoAnki.save_backup({"a": [("x", "")], "b": [("y", "")]}, {})
+    NeoAnki.journal_board("a", [("x", ""), ("z", "Z")], [("z", "Z")])
+    NeoAnki.journal_board("new", [("n", "")], [])
+    tables, to_repeat, recovered = NeoAnki.load_backup()
+    assert tables == {"a": [("x", ""), ("z", "Z")], "b": [("y", "")], "new": [("n", "")]}
+    assert to_repeat["a"] == [("z", "Z")]
+    assert recovered is False
+
+
+def test_load_backup_skips_torn_journal_line(backup_path):
+    NeoAnki.journal_board("a", [("x", "")], [])
+    with open(_journal_path(backup_path), "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "name": "a", "tab')
+    NeoAnki.journal_board("b", [("y", "")], [])
+    tables, _, _ = NeoAnki.load_backup()
+    assert tables == {"a": [("x", "")], "b": [("y", "")]}
+
+
+def test_compact_journal_folds_into_main(backup_path):
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    NeoAnki.journal_board("a", [("x", ""), ("y", "")], [("y", "")])
+    NeoAnki.compact_journal()
+    assert not _journal_path(backup_path).exists()
+    main_data = json.loads(backup_path.read_text(encoding="utf-8"))
+    assert main_data["a"] == {"table": [["x", ""], ["y", ""]], "to_repeat": [1]}
+
+
+def test_journal_compacts_past_threshold(backup_path, monkeypatch):
+    monkeypatch.setattr(NeoAnki, "JOURNAL_COMPACT_BYTES", 1)
+    NeoAnki.journal_board("a", [("x", "")], [])
+    assert not _journal_path(backup_path).exists()
+    assert json.loads(backup_path.read_text(encoding="utf-8"))["a"]["table"] == [["x", ""]]
+
+
+def test_changes_to_a_stored_board_are_journaled_as_edits(backup_path):
+    table = NeoAnki.CardStore([(f"w{i}", f"t{i}") for i in range(1000)])
+    NeoAnki.save_backup({"a": table}, {})
+    flags = NeoAnki.RepeatSet(table)
+    for i in range(0, 100, 2):
+        flags.flag(i)
+        NeoAnki.save_board("a", table, flags.rows())
+    table.append(("new", "N"))
+    table.set_schedule(5, NeoAnki.CardSchedule(due=9.0))
+    flags.delete(3)
+    NeoAnki.save_board("a", table, flags.rows())
+    journal = _journal_path(backup_path)
+    records = [json.loads(line) for line in journal.read_text(encoding="utf-8").splitlines()]
+    assert {r["op"] for r in records} == {"edit"}
+    assert journal.stat().st_size < len(json.dumps(NeoAnki._board_payload(table, [])))
+    summary = NeoAnki.list_boards()[0]
+    assert (summary.rows, summary.to_repeat, summary.version) == (1000, 50, 52)
+    NeoAnki._backup_store.invalidate()
+    loaded, to_repeat = NeoAnki.load_board("a")
+    assert loaded == table and loaded.schedules() == table.schedules()
+    assert to_repeat.positions == flags.rows().positions == NeoAnki._repeat_positions(table, flags.rows())
+
+
+def test_board_delta_replays_to_the_new_board():
+    rng = random.Random(4)
+    for _ in range(200):
+        old = NeoAnki.CardStore([(str(rng.randrange(5)), "") for _ in range(rng.randrange(12))])
+        old_repeat = [old[i] for i in range(len(old)) if rng.random() < 0.3]
+        new = old.copy()
+        for _ in range(rng.randrange(3)):
+            if new and rng.random() < 0.5:
+                del new[rng.randrange(len(new))]
+            else:
+                new.append((str(rng.randrange(5)), ""))
+        new_repeat = [new[i] for i in range(len(new)) if rng.random() < 0.3]
+        delta = NeoAnki._board_delta(old, old_repeat, new, new_repeat)
+        if delta is None:
+            continue
+        replayed, repeat = NeoAnki._apply_board_delta(old.copy(), old_repeat, json.loads(json.dumps(delta)))
+        assert replayed == new
+        assert repeat.positions == NeoAnki._repeat_positions(new, new_repeat)
@@ -0,0 +1,92 @@
+"""Unit tests for the opt-in SQLite storage backend."""
+import json
+import sqlite3
+
+import pytest
+
+import NeoAnki
+
+
+@pytest.fixture
+def sqlite_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(NeoAnki, "BACKUP_BACKEND", "sqlite")
+    return tmp_path / "neoanki_backup.sqlite3"
+
+
+def test_sqlite_save_then_load_roundtrip(sqlite_backend):
+    NeoAnki.save_backup({"a": [("ą", "aa"), ("b", "")], "empty": []}, {"a": [("b", "")]})
+    tables, to_repeat, recovered = NeoAnki.load_backup()
+    assert tables == {"a": [("ą", "aa"), ("b", "")], "empty": []}
+    assert to_repeat == {"a": [("b", "")], "empty": []}
+    assert recovered is False
+
+
+def test_sqlite_uses_wal(sqlite_backend):
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    conn = sqlite3.connect(sqlite_backend)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        conn.close()
+
+
+def test_sqlite_save_board_keeps_other_boards(sqlite_backend):
+    NeoAnki.save_backup({"a": [("x", "")], "b": [("y", "Y")]}, {"b": [("y", "Y")]})
+    NeoAnki.save_board("a", [("x", ""), ("z", "")], [("z", "")])
+    assert NeoAnki.load_board("a") == ([("x", ""), ("z", "")], [("z", "")])
+    assert NeoAnki.load_board("b") == ([("y", "Y")], [("y", "Y")])
+    assert NeoAnki.load_board("missing") is None
+
+
+def test_sqlite_save_backup_removes_dropped_boards(sqlite_backend):
+    NeoAnki.save_backup({"a": [("x", "")], "b": [("y", "")]}, {})
+    NeoAnki.save_backup({"b": [("y", "")]}, {})
+    tables, _, _ = NeoAnki.load_backup()
+    assert tables == {"b": [("y", "")]}
+
+
+def test_sqlite_seeded_from_existing_json(sqlite_backend, backup_path):
+    backup_path.write_text(
+        json.dumps({"old": {"table": [["w", "t"]], "to_repeat": [["w", "t"]]}}), encoding="utf-8"
+    )
+    tables, to_repeat, _ = NeoAnki.load_backup()
+    assert tables == {"old": [("w", "t")]}
+    assert to_repeat == {"old": [("w", "t")]}
+
+
+def test_sqlite_import_export_json(sqlite_backend, tmp_path):
+    src = tmp_path / "in.json"
+    src.write_text(json.dumps({"t": [["a", "A"], ["b", ""]]}), encoding="utf-8")
+    NeoAnki.import_json_backup(str(src))
+    out = tmp_path / "out.json"
+    NeoAnki.export_json_backup(str(out))
+    assert json.loads(out.read_text(encoding="utf-8")) == {
+        "t": {"table": [["a", "A"], ["b", ""]], "to_repeat": []}
+    }
+
+
+def test_sqlite_marking_updates_only_changed_rows(sqlite_backend, monkeypatch):
+    rows = [(f"w{i}", "") for i in range(50)]
+    NeoAnki.save_board("a", rows, [("w3", "")])
+    conn = NeoAnki._db_connect()
+    assert NeoAnki._db_connect() is conn  # reused, schema script not re-run
+    statements = []
+    conn.set_trace_callback(statements.append)
+    table = NeoAnki.CardStore(rows)
+    table.set_schedule(7, NeoAnki.CardSchedule(due=9.0))
+    NeoAnki.save_board("a", table, [("w5", "")])
+    conn.set_trace_callback(None)
+    assert not any(s.startswith(("DELETE FROM rows", "INSERT INTO rows")) for s in statements)
+    assert sum(s.startswith("UPDATE rows") for s in statements) == 3  # w3 off, w5 on, w7 scheduled
+    loaded, to_repeat = NeoAnki.load_board("a")
+    assert loaded == rows and to_repeat == [("w5", "")]
+    assert loaded.schedules() == [(7, NeoAnki.CardSchedule(due=9.0))]
+
+
+def test_sqlite_startup_and_save_backup_read_only_what_they_need(sqlite_backend, monkeypatch):
+    NeoAnki.save_backup({"a": [("x", ""), ("y", "")], "b": [("z", "")]}, {"a": [("y", "")]})
+    monkeypatch.setattr(NeoAnki, "_db_load_all", lambda: pytest.fail("every row loaded"))
+    assert NeoAnki.backup_recovered() is False
+    assert [b.name for b in NeoAnki.list_boards()] == ["a", "b"]
+    NeoAnki.save_backup({"a": [("x", ""), ("y", ""), ("w", "")], "b": [("z", "")]})
+    assert NeoAnki.load_board("a") == ([("x", ""), ("y", ""), ("w", "")], [("y", "")])
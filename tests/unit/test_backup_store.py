@@ -0,0 +1,84 @@
+"""Unit tests for BackupStore: in-process cache of the parsed backup."""
+import json
+import os
+
+import NeoAnki
+
+
+def _count_file_loads(monkeypatch):
+    calls = []
+    real = NeoAnki._load_backup_files
+
+    def counting():
+        calls.append(1)
+        return real()
+
+    monkeypatch.setattr(NeoAnki, "_load_backup_files", counting)
+    return calls
+
+
+def test_repeated_load_reads_file_once(monkeypatch, backup_path):
+    backup_path.write_text(json.dumps({"a": [["x", ""]]}), encoding="utf-8")
+    calls = _count_file_loads(monkeypatch)
+    for _ in range(3):
+        tables, _, _ = NeoAnki.load_backup()
+    assert tables == {"a": [("x", "")]}
+    assert len(calls) == 1
+
+
+def test_external_change_is_reloaded(monkeypatch, backup_path):
+    backup_path.write_text(json.dumps({"a": [["x", ""]]}), encoding="utf-8")
+    NeoAnki.load_backup()
+    backup_path.write_text(json.dumps({"a": [["x", ""]], "b": [["y", ""]]}), encoding="utf-8")
+    tables, _, _ = NeoAnki.load_backup()
+    assert set(tables) == {"a", "b"}
+
+
+def test_same_size_rewrite_with_new_mtime_is_reloaded(backup_path):
+    backup_path.write_text(json.dumps({"a": [["x", ""]]}), encoding="utf-8")
+    NeoAnki.load_backup()
+    backup_path.write_text(json.dumps({"a": [["y", ""]]}), encoding="utf-8")
+    st = os.stat(backup_path)
+    os.utime(backup_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    tables, _, _ = NeoAnki.load_backup()
+    assert tables == {"a": [("y", "")]}
+
+
+def test_writes_update_store_without_reread(monkeypatch, backup_path):
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    calls = _count_file_loads(monkeypatch)
+    NeoAnki.journal_board("a", [("x", ""), ("y", "")], [("y", "")])
+    NeoAnki.save_backup({"a": [("x", "")], "b": [("z", "")]})
+    tables, to_repeat, _ = NeoAnki.load_backup()
+    assert tables == {"a": [("x", "")], "b": [("z", "")]}
+    assert to_repeat["a"] == [("y", "")]
+    assert calls == []
+
+
+def test_load_returns_independent_mappings(backup_path):
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    tables, _, _ = NeoAnki.load_backup()
+    tables["b"] = [("y", "")]
+    del tables["a"]
+    again, _, _ = NeoAnki.load_backup()
+    assert again == {"a": [("x", "")]}
+
+
+def test_table_edited_in_place_is_saved(backend):
+    NeoAnki.save_board("a", [("x", "")], [])
+    tables, to_repeat, _ = NeoAnki.load_backup()
+    tables["a"].append(("y", ""))
+    to_repeat["a"].append(("x", ""))
+    NeoAnki.save_board("a", tables["a"], to_repeat["a"])
+    NeoAnki._backup_store.invalidate()
+    assert NeoAnki.load_board("a") == ([("x", ""), ("y", "")], [("x", "")])
+
+
+def test_recovered_flag_reported_once(backup_path):
+    backup_path.write_text("not json", encoding="utf-8")
+    bak_path = backup_path.with_suffix(backup_path.suffix + ".bak")
+    bak_path.write_text(json.dumps({"x": [["y", ""]]}), encoding="utf-8")
+    _, _, first = NeoAnki.load_backup()
+    _, _, second = NeoAnki.load_backup()
+    assert first is True
+    assert second is False
@@ -0,0 +1,65 @@
+"""Unit tests for the streaming backup loader/writer (_iter_json_object, _stream_backup, _write_backup_stream)."""
+import io
+import json
+
+import pytest
+
+import NeoAnki
+
+
+@pytest.fixture(autouse=True)
+def tiny_chunks(monkeypatch):
+    """Forces values to span many reads."""
+    monkeypatch.setattr(NeoAnki, "_STREAM_CHUNK", 5)
+
+
+def test_iter_json_object_yields_pairs_in_order():
+    text = ' { "a" : [1, 2.5e3, "x\\"y"], "b": {"c": null}, "n": -12 } \n'
+    assert list(NeoAnki._iter_json_object(io.StringIO(text))) == [
+        ("a", [1, 2500.0, 'x"y']), ("b", {"c": None}), ("n", -12)
+    ]
+
+
+def test_iter_json_object_empty():
+    assert list(NeoAnki._iter_json_object(io.StringIO("{}"))) == []
+
+
+@pytest.mark.parametrize("text", ["", "[]", '{"a": 1', '{"a": 1} x', '{"a" 1}', '{"a": 1,}'])
+def test_iter_json_object_invalid_raises(text):
+    with pytest.raises(ValueError):
+        list(NeoAnki._iter_json_object(io.StringIO(text)))
+
+
+def test_stream_backup_matches_parse_backup_data(backup_path):
+    payload = {
+        "new": {"table": [["ą", "b"], ["c", ""]], "to_repeat": [["c", ""]]},
+        "legacy": [["x", ""], "y"],
+        "bad": 123,
+    }
+    backup_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    tables, to_repeat, count = NeoAnki._stream_backup(str(backup_path))
+    assert (tables, to_repeat) == NeoAnki._parse_backup_data(payload)
+    assert count == 3
+
+
+def test_stream_backup_legacy_root(backup_path):
+    payload = {"tables": {"b1": [["a", "A"]]}, "to_repeat": {"b1": [["a", "A"]]}}
+    backup_path.write_text(json.dumps(payload), encoding="utf-8")
+    tables, to_repeat, _ = NeoAnki._stream_backup(str(backup_path))
+    assert tables == {"b1": [("a", "A")]}
+    assert to_repeat == {"b1": [("a", "A")]}
+
+
+def test_stream_backup_invalid_returns_none(backup_path):
+    backup_path.write_text('{"a": [["x", ""]], "b": ', encoding="utf-8")
+    assert NeoAnki._stream_backup(str(backup_path)) is None
+    assert NeoAnki._stream_backup(str(backup_path) + ".missing") is None
+
+
+@pytest.mark.parametrize("tables", [{}, {"a": [("x", "ż")], "b": []}])
+def test_write_backup_stream_matches_json_dump(tables):
+    to_repeat = {"a": [("x", "ż")]} if tables else {}
+    out = io.StringIO()
+    NeoAnki._write_backup_stream(out, tables, to_repeat)
+    expected = {n: NeoAnki._board_payload(t, to_repeat.get(n, [])) for n, t in tables.items()}
+    assert out.getvalue() == json.dumps(expected, ensure_ascii=False, indent=2)
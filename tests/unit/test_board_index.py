@@ -0,0 +1,67 @@
+"""Unit tests for board summaries (list_boards) and delete_boards across storage backends."""
+import json
+
+import NeoAnki
+
+
+def _forbid_full_load(monkeypatch):
+    def fail():
+        raise AssertionError("full backup parse")
+    monkeypatch.setattr(NeoAnki, "_load_backup_files", fail)
+    monkeypatch.setattr(NeoAnki, "_dir_load_all", fail)
+    monkeypatch.setattr(NeoAnki, "_db_load_all", fail)
+    NeoAnki._backup_store.invalidate()
+
+
+def test_list_boards_from_index_only(monkeypatch, backend):
+    NeoAnki.save_backup({"b": [("x", "X"), ("y", "")], "a": []}, {"b": [("y", "")]})
+    _forbid_full_load(monkeypatch)
+    boards = NeoAnki.list_boards()
+    assert [b.name for b in boards] == ["a", "b"]
+    assert (boards[1].rows, boards[1].to_repeat) == (2, 1)
+    assert boards[1].preview == "x (X), y"
+    assert boards[0].rows == 0
+
+
+def test_list_boards_sees_single_board_saves(monkeypatch, backend):
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    NeoAnki.save_board("n", [("p", ""), ("q", "")], [("q", "")])
+    _forbid_full_load(monkeypatch)
+    summaries = {b.name: b for b in NeoAnki.list_boards()}
+    assert set(summaries) == {"a", "n"}
+    assert (summaries["n"].rows, summaries["n"].to_repeat) == (2, 1)
+
+
+def test_delete_boards_keeps_others(backend):
+    NeoAnki.save_backup({"keep": [("x", "")], "drop": [("y", "")]}, {})
+    NeoAnki.delete_boards(["drop"])
+    assert [b.name for b in NeoAnki.list_boards()] == ["keep"]
+    tables, _, _ = NeoAnki.load_backup()
+    assert tables == {"keep": [("x", "")]}
+
+
+def test_unchanged_board_keeps_modified_time(backend):
+    NeoAnki.save_backup({"a": [("x", "")], "b": [("y", "")]}, {})
+    before = {b.name: b.modified for b in NeoAnki.list_boards()}
+    tables, to_repeat, _ = NeoAnki.load_backup()
+    tables["b"] = [("y", ""), ("z", "")]
+    NeoAnki.save_backup(tables, to_repeat)
+    after = {b.name: b.modified for b in NeoAnki.list_boards()}
+    if backend != "sqlite":
+        assert after["a"] == before["a"]
+    assert after["b"] >= before["b"]
+
+
+def test_json_stale_index_is_rebuilt(backup_path):
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    backup_path.write_text(json.dumps({"other": [["q", ""]]}), encoding="utf-8")
+    assert [b.name for b in NeoAnki.list_boards()] == ["other"]
+
+
+def test_print_board_summaries(capsys):
+    boards = [NeoAnki.BoardSummary("Lista1", 3, 1, 0.0, "słowo (tłum), b, c")]
+    NeoAnki._print_board_summaries(boards)
+    out = capsys.readouterr().out
+    assert "Lista1" in out
+    assert "3 rows, 1 to repeat" in out
+    assert "słowo (tłum)" in out
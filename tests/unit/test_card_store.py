@@ -0,0 +1,199 @@
+"""Unit tests for CardStore (compact table rows) and loading boards into it."""
+import json
+import random
+
+import pytest
+
+import NeoAnki
+
+
+def test_card_store_behaves_like_list_of_rows():
+    cards = NeoAnki.CardStore([("a", "1"), ("b", "")])
+    cards.append(("c", "3"))
+    cards.insert(0, ("z", ""))
+    assert len(cards) == 4
+    assert cards[0] == ("z", "")
+    assert cards[-1] == ("c", "3")
+    assert cards[1:3] == [("a", "1"), ("b", "")]
+    assert list(cards) == [("z", ""), ("a", "1"), ("b", ""), ("c", "3")]
+    assert ("b", "") in cards
+    cards[1] = ("a", "one")
+    del cards[0]
+    assert cards.pop() == ("c", "3")
+    assert cards == [("a", "one"), ("b", "")]
+    assert [("a", "one"), ("b", "")] == cards
+    assert cards != [("a", "one")]
+
+
+def test_card_store_rejects_invalid_rows():
+    cards = NeoAnki.CardStore()
+    with pytest.raises(TypeError):
+        cards.append(("only",))
+    with pytest.raises(TypeError):
+        cards.append(("a", 1))
+    assert len(cards) == 0
+
+
+def test_card_store_copy_is_independent():
+    cards = NeoAnki.CardStore([("a", "1")])
+    copy = cards.copy()
+    copy.append(("b", ""))
+    assert cards == [("a", "1")]
+    assert copy == NeoAnki.CardStore([("a", "1"), ("b", "")])
+
+
+def test_display_helpers_accept_card_store():
+    cards = NeoAnki.CardStore([("a", "1"), ("b", "")])
+    assert NeoAnki._validate_table(cards)
+    assert NeoAnki._table_display(cards, 1) == "a (1)..."
+    assert NeoAnki.format_translations_display(cards) == "  a: 1\n  b: (no translation)"
+    out = NeoAnki._table_display_with_revealed(cards, 1, {("b", "")})
+    assert "a (1)" in out and f"{NeoAnki._YELLOW}b{NeoAnki._RESET}" in out
+
+
+def test_loaded_board_shares_to_repeat_strings(backup_path):
+    backup_path.write_text(json.dumps({"B": {"table": [["a", "1"], ["b", "2"]], "to_repeat": [["b", "2"]]}}))
+    tables, to_repeat, _ = NeoAnki.load_backup()
+    assert isinstance(tables["B"], NeoAnki.CardStore)
+    assert tables["B"] == [("a", "1"), ("b", "2")]
+    (word, trans), = to_repeat["B"]
+    assert word is tables["B"][1][0] and trans is tables["B"][1][1]
+
+
+def test_shuffle_keeps_rows(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "clearScreen", lambda: None)
+    cards = NeoAnki.CardStore([(str(i), "") for i in range(20)])
+    NeoAnki.getShuffledTable(cards)
+    assert sorted(cards) == [(str(i), "") for i in sorted(range(20), key=str)]
+
+
+def test_repeat_set_tracks_cards_not_text():
+    cards = NeoAnki.CardStore([("a", ""), ("b", ""), ("a", "")])
+    flags = NeoAnki.RepeatSet(cards)
+    flags.flag(2)
+    assert flags.is_flagged(2) and not flags.is_flagged(0)
+    cards.shuffle()
+    assert [cards[i] for i in range(3) if flags.is_flagged(i)] == [("a", "")]
+    assert flags.rows() == [("a", "")]
+    first = next(i for i in range(3) if flags.is_flagged(i))
+    flags.unflag(first)
+    assert len(flags) == 0 and flags.rows() == []
+
+
+def test_repeat_set_from_rows_claims_one_card_per_row():
+    cards = NeoAnki.CardStore([("a", ""), ("b", ""), ("a", "")])
+    flags = NeoAnki.RepeatSet(cards, [("a", "")])
+    assert [flags.is_flagged(i) for i in range(3)] == [True, False, False]
+    flags = NeoAnki.RepeatSet(cards, [("a", ""), ("a", ""), ("x", "")])
+    assert [flags.is_flagged(i) for i in range(3)] == [True, False, True]
+
+
+def test_to_repeat_persisted_as_positions(backup_path):
+    NeoAnki.save_backup({"B": [("a", ""), ("b", ""), ("a", "")]}, {"B": [("a", ""), ("a", "")]})
+    assert json.loads(backup_path.read_text())["B"]["to_repeat"] == [0, 2]
+    _, to_repeat, _ = NeoAnki.load_backup()
+    assert to_repeat["B"] == [("a", ""), ("a", "")]
+
+
+def test_flagged_duplicate_keeps_its_flag_through_save_and_load(backend):
+    cards = NeoAnki.CardStore([("a", "x"), ("b", ""), ("a", "x")])
+    session = NeoAnki.SessionOrder(cards)
+    session.shuffle(random.Random(3))
+    flags = NeoAnki.RepeatSet(session)
+    flags.flag(session.index(("b", "")))
+    flags.flag([session.position(i) for i in range(3)].index(2))  # the second ("a", "x") of the table
+    assert sorted(flags.rows().positions) == [1, 2]
+    NeoAnki.save_board("B", cards, flags.rows())
+    NeoAnki._backup_store.invalidate()
+    table, to_repeat = NeoAnki.load_board("B")
+    reloaded = NeoAnki.RepeatSet(table, to_repeat)
+    assert [reloaded.is_flagged(i) for i in range(3)] == [False, True, True]
+    NeoAnki.save_board("B", table, NeoAnki.RepeatSet(table, [("a", "x")]).rows())  # rows only: first match
+    assert NeoAnki.load_board("B")[1].positions == [0]
+
+
+def test_repeat_set_rows_do_not_scan_the_table(monkeypatch):
+    cards = NeoAnki.CardStore([(str(i), "") for i in range(1000)])
+    session = NeoAnki.SessionOrder(cards)
+    session.shuffle(random.Random(2))
+    flags = NeoAnki.RepeatSet(session)
+    marked = [session.position(i) for i in range(3)]
+    for i in range(3):
+        flags.flag(i)
+    removed = flags.delete(3)
+    calls = []
+    real = NeoAnki.CardStore.card_id
+    monkeypatch.setattr(NeoAnki.CardStore, "card_id", lambda self, i: calls.append(i) or real(self, i))
+    rows = flags.rows()
+    assert len(calls) == 3
+    removed_at = int(removed[0])
+    assert rows.positions == [p - (p > removed_at) for p in marked]
+    assert rows == [cards[p] for p in rows.positions]
+    cards.insert(0, ("new", ""))  # behind the set's back: found again
+    assert flags.rows().positions == [p + 1 for p in rows.positions]
+
+
+def test_merge_drops_repeat_positions():
+    table = NeoAnki.CardStore([("a", ""), ("a", ""), ("b", "")])
+    base = NeoAnki._BoardBase(1, table.copy(), [], True)
+    ours = NeoAnki.RepeatRows([("a", "")], [1])
+    merged, to_repeat = NeoAnki._merge_board(base, table, ours, table.copy(), [])
+    assert type(to_repeat) is list and to_repeat == [("a", "")]
+    assert NeoAnki._repeat_positions(merged, to_repeat) == [0]  # the first equal row, not the one marked
+
+
+def test_cli_mark_by_position_keeps_duplicates_apart(capsys):
+    NeoAnki.save_backup({"B": [("a", ""), ("a", "")]}, {})
+    assert NeoAnki.cli(["mark", "B", "1"]) == 0
+    capsys.readouterr()
+    assert NeoAnki.load_board("B")[1].positions == [1]
+
+
+def test_to_repeat_positions_out_of_range_are_ignored(backup_path):
+    backup_path.write_text(json.dumps({"B": {"table": [["a", ""], ["b", ""]], "to_repeat": [1, 1, 5, -1]}}))
+    _, to_repeat, _ = NeoAnki.load_backup()
+    assert to_repeat["B"] == [("b", "")]
+
+
+def test_shuffle_is_lazy_and_settles_only_what_is_read():
+    cards = NeoAnki.CardStore([(str(i), "") for i in range(1000)])
+    cards.shuffle(random.Random(1))
+    assert cards._settled == 0
+    first = cards[0]
+    cards.card_id(2)
+    assert cards._settled == 3
+    assert cards[0] == first
+    assert sorted(cards, key=lambda r: int(r[0])) == [(str(i), "") for i in range(1000)]
+    assert cards._draw is None
+
+
+def test_seeded_shuffles_replay_the_same_order(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "clearScreen", lambda: None)
+    orders = []
+    for _ in range(2):
+        monkeypatch.setattr(NeoAnki, "_shuffle_rng", random.Random("replay"))
+        cards = NeoAnki.CardStore([(str(i), "") for i in range(30)])
+        NeoAnki.getShuffledTable(cards)
+        first = cards[:5]
+        NeoAnki.getShuffledTable(cards)
+        orders.append((first, list(cards)))
+    assert orders[0] == orders[1]
+
+
+def test_changes_during_lazy_shuffle_settle_it_first():
+    cards = NeoAnki.CardStore([(str(i), "") for i in range(10)])
+    cards.shuffle(random.Random(2))
+    cards[0]
+    cards.append(("new", ""))
+    assert cards[-1] == ("new", "") and len(set(cards)) == 11
+    cards.shuffle(random.Random(2))
+    del cards[0]
+    assert len(set(cards)) == 10
+
+
+def test_weighted_shuffle_settles_lazily_in_step_with_sampler():
+    cards = NeoAnki.CardStore([(str(i), "") for i in range(100)])
+    sampler = NeoAnki.WeightedSampler([1.0] * 100)
+    cards.shuffle(random.Random(3), sampler)
+    cards[9]
+    assert sampler.drawn == cards._settled == 10
@@ -0,0 +1,128 @@
+"""Unit tests for the headless CLI subcommands (cli)."""
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import NeoAnki
+
+
+def _run(capsys, *argv):
+    code = NeoAnki.cli(list(argv))
+    out, err = capsys.readouterr()
+    return code, json.loads(out) if out else None, json.loads(err) if err else None
+
+
+def test_add_show_list_stats(capsys):
+    assert _run(capsys, "add", "pl", "on|kare", "ona|kanojo", "oni")[1] == {"name": "pl", "added": 3, "rows": 3}
+    _run(capsys, "add", "pl", "my|")
+    code, board, _ = _run(capsys, "show", "pl")
+    assert code == 0
+    assert board == {"name": "pl", "table": [["on", "kare"], ["ona", "kanojo"], ["oni", ""], ["my", ""]], "to_repeat": []}
+    _, boards, _ = _run(capsys, "list")
+    assert [(b["name"], b["rows"], b["to_repeat"]) for b in boards] == [("pl", 4, 0)]
+    _, stats, _ = _run(capsys, "stats")
+    assert (stats["boards"], stats["rows"], stats["to_repeat"]) == (1, 4, 0)
+
+
+def test_add_reads_stdin(capsys, monkeypatch):
+    monkeypatch.setattr(sys, "stdin", type("In", (), {"read": lambda _: "a|A\n\nb\n"})())
+    assert _run(capsys, "add", "x", "-")[1]["added"] == 2
+    assert NeoAnki.load_board("x")[0] == [("a", "A"), ("b", "")]
+
+
+def test_mark_and_unmark_by_position_and_word(capsys):
+    NeoAnki.save_backup({"b": [("a", ""), ("b", ""), ("a", "")]}, {})
+    assert _run(capsys, "mark", "b", "1")[1] == {"name": "b", "to_repeat": [1]}
+    assert _run(capsys, "mark", "b", "a")[1] == {"name": "b", "to_repeat": [0, 1, 2]}
+    assert _run(capsys, "unmark", "b", "2")[1] == {"name": "b", "to_repeat": [0, 1]}
+    assert NeoAnki.load_board("b")[1] == [("a", ""), ("b", "")]
+
+
+def test_numbers_that_are_words(capsys):
+    NeoAnki.save_backup({"b": [("1984", ""), ("x", "")]}, {})
+    assert _run(capsys, "mark", "b", "1984")[1]["to_repeat"] == [0]  # no row 1984: the word
+    assert _run(capsys, "mark", "b", "1")[1]["to_repeat"] == [0, 1]
+    assert _run(capsys, "unmark", "b", "--word", "1984")[1]["to_repeat"] == [1]
+    assert _run(capsys, "unmark", "b", "--word", "1")[2] == {"error": "No row with word: 1"}
+    assert _run(capsys, "mark", "b", "--pos", "x")[2] == {"error": "Not a position: x"}
+
+
+def test_errors_are_json_on_stderr(capsys):
+    code, out, err = _run(capsys, "show", "missing")
+    assert code == 1 and out is None
+    assert err == {"error": "No such table: missing"}
+    NeoAnki.save_backup({"b": [("a", "")]}, {})
+    assert _run(capsys, "mark", "b", "5")[2] == {"error": "No row at position 5"}
+    assert _run(capsys, "unmark", "b", "zzz")[2] == {"error": "No row with word: zzz"}
+
+
+def test_import_export_roundtrip(capsys, tmp_path):
+    NeoAnki.save_backup({"b": [("a", "A")]}, {"b": [("a", "A")]})
+    path = str(tmp_path / "out.json")
+    assert _run(capsys, "export", path)[1] == {"path": path, "boards": 1}
+    NeoAnki.save_backup({}, {})
+    assert _run(capsys, "import", path)[1] == {"boards": 1}
+    assert NeoAnki.load_board("b") == ([("a", "A")], [("a", "A")])
+
+
+def test_import_of_missing_or_corrupt_file_keeps_the_backup(capsys, tmp_path):
+    NeoAnki.save_backup({"b": [("a", "A")]}, {})
+    code, out, err = _run(capsys, "import", str(tmp_path / "missing.json"))
+    assert code == 1 and out is None and "missing.json" in err["error"]
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text('{"b": [["a", ', encoding="utf-8")
+    code, out, err = _run(capsys, "import", str(corrupt))
+    assert code == 1 and out is None and "corrupt.json" in err["error"]
+    assert NeoAnki.load_board("b")[0] == [("a", "A")]
+
+
+def test_cli_does_not_import_questionary(tmp_path):
+    code = textwrap.dedent(f"""
+        import sys
+        import NeoAnki
+        NeoAnki.BACKUP_PATH = {str(tmp_path / "b.json")!r}
+        NeoAnki.BACKUP_BACKUP_PATH = NeoAnki.BACKUP_PATH + ".bak"
+        NeoAnki.BACKUP_JOURNAL_PATH = NeoAnki.BACKUP_PATH + ".journal"
+        NeoAnki.BACKUP_INDEX_PATH = NeoAnki.BACKUP_PATH + ".index"
+        NeoAnki.cli(["add", "b", "x|y"])
+        NeoAnki.cli(["list"])
+        print(sorted(m for m in sys.modules if m.split(".")[0] in ("questionary", "prompt_toolkit")))
+    """)
+    repo = os.path.dirname(os.path.abspath(NeoAnki.__file__))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=repo).stdout
+    assert out.splitlines()[-1] == "[]"
+
+
+def test_launcher_reuses_cached_bytecode(tmp_path):
+    repo = os.path.dirname(os.path.abspath(NeoAnki.__file__))
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=str(tmp_path))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    out = subprocess.run(
+        [sys.executable, os.path.join(repo, "neoanki"), "--help"], capture_output=True, text=True, check=True, env=env
+    ).stdout
+    assert out.startswith("usage: neoanki")
+    assert [p.name for p in tmp_path.rglob("NeoAnki.*.pyc")]
+
+
+def test_stats_leaves_the_event_index_alone(capsys, monkeypatch):
+    NeoAnki._event_log.record("pl", "reveal", ("a", "A"), ts=5.0)
+    NeoAnki._event_log.sync()
+    with open(NeoAnki.EVENTS_PATH, "a", encoding="utf-8") as f:  # another process, not synced yet
+        f.write('[6,"mark","pl","a","A"]\n')
+    before = os.stat(NeoAnki.EVENTS_STATS_PATH).st_mtime_ns
+    monkeypatch.setattr(NeoAnki, "_event_log", NeoAnki.EventLog())
+    assert _run(capsys, "stats")[1]["reviews"] == 1
+    NeoAnki._event_log.sync()  # as at exit
+    assert os.stat(NeoAnki.EVENTS_STATS_PATH).st_mtime_ns == before
+
+
+def test_misses_lists_most_missed_cards(capsys):
+    NeoAnki._event_log.record("pl", "reveal", ("a", "A"), ts=5.0)
+    NeoAnki._event_log.record("pl", "mark", ("a", "A"), ts=6.0)
+    NeoAnki._event_log.record("pl", "reveal", ("b", "B"), ts=7.0)
+    _, cards, _ = _run(capsys, "misses", "pl", "--limit", "1")
+    assert cards == [{"board": "pl", "word": "a", "translation": "A", "reviews": 1, "misses": 1,
+                      "miss_rate": 1.0, "last_seen": 6.0}]
+    assert _run(capsys, "stats")[1]["reviews"] == 2
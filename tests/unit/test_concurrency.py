@@ -0,0 +1,124 @@
+"""Unit tests for board versions, merging concurrent saves and the cross-process storage lock."""
+import multiprocessing
+import sys
+
+import pytest
+
+import NeoAnki
+
+
+@pytest.fixture(autouse=True)
+def fresh_bases(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "_board_bases", {})
+
+
+def _version(name):
+    return {s.name: s.version for s in NeoAnki.list_boards()}[name]
+
+
+def _other_process():
+    """Forgets what this process has read, as a second NeoAnki instance would not know it."""
+    saved = dict(NeoAnki._board_bases)
+    NeoAnki._board_bases.clear()
+    NeoAnki._backup_store.invalidate()
+    return saved
+
+
+def test_each_change_bumps_the_version(backend):
+    NeoAnki.save_board("pl", [("a", "")], [])
+    assert _version("pl") == 1
+    NeoAnki.save_board("pl", [("a", "")], [])  # unchanged: not written
+    assert _version("pl") == 1
+    NeoAnki.save_board("pl", [("a", ""), ("b", "")], [("a", "")])
+    assert _version("pl") == 2
+    NeoAnki.save_backup({"pl": [("a", "")], "de": [("x", "")]}, {})
+    assert _version("pl") == 3 and _version("de") == 1
+
+
+def test_json_save_does_not_reread_the_journal(monkeypatch):
+    NeoAnki.save_board("pl", [("a", "")], [])
+    NeoAnki.save_board("de", [("x", "")], [])
+    with monkeypatch.context() as m:
+        m.setattr(NeoAnki, "_json_list_boards", lambda: pytest.fail("journal re-read"))
+        m.setattr(NeoAnki, "_parse_board_payload", lambda *a: pytest.fail("board parsed"))
+        for i in range(3):
+            NeoAnki.save_board("pl", [("a", ""), ("b", str(i))], [])
+        NeoAnki.delete_boards(["de"])
+    assert _version("pl") == 4 and NeoAnki._board_version("pl") == 4
+    assert NeoAnki._board_version("de") is None
+
+
+def test_concurrent_edits_of_one_board_are_merged(backend):
+    NeoAnki.save_board("pl", [("a", "1"), ("b", "2"), ("c", "3")], [])
+    mine, _ = NeoAnki.load_board("pl")
+    mine_bases = _other_process()
+    theirs, _ = NeoAnki.load_board("pl")
+    theirs.append(("d", "4"))
+    del theirs[theirs.index(("a", "1"))]
+    NeoAnki.save_board("pl", theirs, [("d", "4")])
+    NeoAnki._board_bases.clear()
+    NeoAnki._board_bases.update(mine_bases)
+    NeoAnki._backup_store.invalidate()
+    mine.append(("e", "5"))
+    NeoAnki.save_board("pl", mine, [("b", "2")])
+    table, to_repeat = NeoAnki.load_board("pl")
+    assert table == [("b", "2"), ("c", "3"), ("d", "4"), ("e", "5")]
+    assert sorted(to_repeat) == [("b", "2"), ("d", "4")]
+    assert _version("pl") == 3
+
+
+def test_merge_keeps_the_schedule_that_changed():
+    base_table = NeoAnki.CardStore([("a", ""), ("b", "")])
+    base = NeoAnki._BoardBase(1, base_table, [], True)
+    ours, theirs = base_table.copy(), base_table.copy()
+    ours.set_schedule(0, NeoAnki.CardSchedule(due=5.0))
+    theirs.set_schedule(1, NeoAnki.CardSchedule(due=7.0))
+    merged, _ = NeoAnki._merge_board(base, ours, [], theirs, [])
+    assert merged.schedules() == [(0, NeoAnki.CardSchedule(due=5.0)), (1, NeoAnki.CardSchedule(due=7.0))]
+
+
+def test_merge_rows_counts_duplicates():
+    base = [("a", ""), ("a", "")]
+    assert NeoAnki._merge_rows(base, [("a", "")] * 3, [("a", "")] * 3) == [("a", "")] * 3  # same add once
+    assert NeoAnki._merge_rows(base, [("a", "")], base + [("b", "")]) == [("a", ""), ("b", "")]
+    assert NeoAnki._merge_rows(base, [], [("a", "")]) == []
+
+
+def _append_rows(backend, worker, count):
+    NeoAnki.BACKUP_BACKEND = backend
+    NeoAnki._board_bases.clear()
+    NeoAnki._backup_store.invalidate()
+    for i in range(count):
+        table, to_repeat = NeoAnki.load_board("pl")
+        table.append((f"w{worker}-{i}", ""))
+        NeoAnki.save_board("pl", table, to_repeat)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs fork and flock")
+def test_processes_saving_one_board_lose_no_rows(backend):
+    NeoAnki.save_board("pl", [("seed", "")], [])
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_append_rows, args=(backend, w, 15)) for w in range(8)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(60)
+        assert p.exitcode == 0
+    NeoAnki._backup_store.invalidate()
+    table, _ = NeoAnki.load_board("pl")
+    assert sorted(table) == sorted([("seed", "")] + [(f"w{w}-{i}", "") for w in range(8) for i in range(15)])
+    assert _version("pl") == 1 + 8 * 15
+
+
+def test_board_base_is_a_named_tuple_and_load_backup_is_locked(monkeypatch):
+    base = NeoAnki._BoardBase(1, NeoAnki.CardStore(), [], True)
+    assert isinstance(base, NeoAnki._BoardBase) and base.version == 1
+    held = []
+    real = NeoAnki._load_backup_files
+    monkeypatch.setattr(
+        NeoAnki, "_load_backup_files", lambda *a, **k: held.append(NeoAnki._STORAGE_LOCK._depth) or real(*a, **k)
+    )
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    NeoAnki._backup_store.invalidate()
+    NeoAnki.load_backup()
+    assert held and all(depth > 0 for depth in held)
@@ -0,0 +1,110 @@
+"""Unit tests for SessionOrder (shuffling without moving rows) and skipping saves of unchanged boards."""
+import random
+
+import pytest
+
+import NeoAnki
+
+
+def _count_calls(monkeypatch, name):
+    calls = []
+    real = getattr(NeoAnki, name)
+    monkeypatch.setattr(NeoAnki, name, lambda *a, **k: calls.append(a) or real(*a, **k))
+    return calls
+
+
+def test_session_order_shuffles_positions_not_rows():
+    rows = [(str(i), "") for i in range(100)]
+    cards = NeoAnki.CardStore(rows)
+    session = NeoAnki.SessionOrder(cards)
+    session.shuffle(random.Random(4))
+    first = session[0]
+    assert session._settled == 1
+    assert sorted(session, key=lambda r: int(r[0])) == rows
+    assert list(session) != rows
+    assert cards == rows
+    assert session[0] == first == cards[session.position(0)]
+    assert session.card_id(0) == cards.card_id(session.position(0))
+
+
+def test_session_order_flags_and_edits_reach_the_table():
+    cards = NeoAnki.CardStore([("a", ""), ("b", ""), ("c", ""), ("d", "")])
+    session = NeoAnki.SessionOrder(cards)
+    session.shuffle(random.Random(1))
+    flags = NeoAnki.RepeatSet(session)
+    i = list(session).index(("c", ""))
+    flags.flag(i)
+    session.set_schedule(i, NeoAnki.CardSchedule(due=1.0))
+    assert flags.rows() == [("c", "")] and cards.schedule(2) == NeoAnki.CardSchedule(due=1.0)
+    removed = session.pop(list(session).index(("b", "")))
+    assert removed == ("b", "") and cards == [("a", ""), ("c", ""), ("d", "")]
+    session.append(("e", ""))
+    assert cards[-1] == ("e", "") and session[-1] == ("e", "")
+    assert sorted(session) == sorted(cards)
+    assert flags.is_flagged(list(session).index(("c", "")))
+
+
+def test_saving_an_unchanged_board_writes_nothing(monkeypatch, backend):
+    cards = NeoAnki.CardStore([("a", "1"), ("b", "2")])
+    NeoAnki.save_board("pl", cards, [])
+    written = {
+        "json": _count_calls(monkeypatch, "_journal_append"),
+        "dir": _count_calls(monkeypatch, "_dir_write_manifest"),
+        "sqlite": _count_calls(monkeypatch, "_db_write_summary"),
+    }[backend]
+    table, _ = NeoAnki.load_board("pl")
+    session = NeoAnki.SessionOrder(table)
+    session.shuffle(random.Random(0))
+    list(session)
+    NeoAnki.save_board("pl", table, [])
+    assert written == []
+    NeoAnki.save_board("pl", table, [("b", "2")])
+    assert len(written) == 1
+    assert NeoAnki.load_board("pl")[1] == [("b", "2")]
+
+
+def test_save_backup_skips_the_file_when_no_board_changed(monkeypatch):
+    boards = {"a": [("x", "1")], "b": [("y", "")]}
+    NeoAnki.save_backup(boards, {"a": [("x", "1")]})
+    writes = _count_calls(monkeypatch, "_atomic_write")
+    NeoAnki.save_backup({"b": [("y", "")], "a": NeoAnki.CardStore([("x", "1")])}, {"a": [("x", "1")]})
+    assert writes == []
+    NeoAnki.save_backup(boards, {})
+    assert len(writes) == 2  # main file and index
+    monkeypatch.setattr(NeoAnki, "BACKUP_FORMAT", "compact")
+    NeoAnki.save_backup(boards, {})
+    assert len(writes) == 4
+
+
+def test_save_backup_serializes_each_board_once(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "BACKUP_FORMAT", "compact")
+    NeoAnki.save_backup({"a": [("x", "1")], "b": [("y", "")]}, {})
+    digest = NeoAnki._board_digest
+    monkeypatch.setattr(NeoAnki, "_board_digest", lambda *a: pytest.fail("board serialized twice"))
+    NeoAnki.save_backup({"a": [("x", "1"), ("z", "")], "b": [("y", "")]}, {})
+    NeoAnki._backup_store.invalidate()
+    tables, to_repeat, _ = NeoAnki.load_backup()
+    assert NeoAnki._json_read_hashes() == {n: digest(t, to_repeat.get(n, [])) for n, t in tables.items()}
+
+
+def test_save_backup_still_folds_in_the_journal(monkeypatch, backup_path):
+    boards = {"a": [("x", "")]}
+    NeoAnki.save_backup(boards, {})
+    NeoAnki.journal_board("a", [("x", "")], [])
+    NeoAnki.save_backup(boards, {})
+    assert not backup_path.with_name(backup_path.name + ".journal").exists()
+
+
+def test_sqlite_v3_database_gains_content_hash(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "BACKUP_BACKEND", "sqlite")
+    NeoAnki.save_board("pl", [("a", "")], [])
+    conn = NeoAnki.sqlite3.connect(NeoAnki.BACKUP_DB_PATH)
+    conn.execute("UPDATE boards SET content_hash = ''")
+    conn.execute("PRAGMA user_version = 3")
+    conn.commit()
+    conn.close()
+    assert NeoAnki.load_board("pl")[0] == [("a", "")]
+    written = _count_calls(monkeypatch, "_db_write_summary")
+    NeoAnki.save_board("pl", [("a", "")], [])
+    NeoAnki.save_board("pl", [("a", "")], [])
+    assert len(written) == 1
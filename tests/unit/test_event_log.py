@@ -0,0 +1,137 @@
+"""Unit tests for the review event log (EventLog) and the statistics kept in its side index."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import NeoAnki
+
+
+def _lines(path):
+    """Parsed log lines; torn ones are left out."""
+    out = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                pass
+    return out
+
+
+def test_events_are_buffered_then_appended_in_one_write(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "EVENT_BUFFER_SIZE", 3)
+    log = NeoAnki.EventLog()
+    log.record("pl", "reveal", ("on", "he"), ts=10.0)
+    log.record("pl", "mark", ("on", "he"), ts=11.0)
+    assert not os.path.exists(NeoAnki.EVENTS_PATH)
+    log.record("pl", "reveal", ("ona", "she"), ts=12.0)
+    assert _lines(NeoAnki.EVENTS_PATH) == [
+        [10.0, "reveal", "pl", "on", "he"], [11.0, "mark", "pl", "on", "he"], [12.0, "reveal", "pl", "ona", "she"],
+    ]
+    with pytest.raises(ValueError):
+        log.record("pl", "skip", ("on", "he"))
+
+
+def test_stats_count_reviews_and_misses_per_card_and_board():
+    log = NeoAnki._event_log
+    for ts, op, row in [
+        (1, "reveal", ("a", "")), (2, "mark", ("a", "")), (3, "reveal", ("a", "")), (4, "unmark", ("a", "")),
+        (5, "reveal", ("b", "")), (6, "add", ("c", "")), (7, "reveal", ("c", "")), (8, "mark", ("c", "")),
+    ]:
+        log.record("pl", op, row, ts=ts)
+    log.record("de", "reveal", ("x", ""), ts=9)
+    most_missed = NeoAnki.card_stats("pl")
+    assert [(s.word, s.reviews, s.misses, s.last_seen) for s in most_missed] == [
+        ("c", 1, 1, 8), ("a", 2, 1, 3), ("b", 1, 0, 5),
+    ]
+    assert most_missed[1].miss_rate == 0.5
+    assert len(NeoAnki.card_stats(limit=2)) == 2
+    boards = NeoAnki.board_stats()
+    assert boards["pl"] == NeoAnki.BoardStats("pl", 4, 2, 8)
+    assert boards["de"].miss_rate == 0.0
+    log.record("pl", "remove", ("c", ""))
+    assert [s.word for s in NeoAnki.card_stats("pl")] == ["a", "b"]
+    assert NeoAnki.board_stats()["pl"].misses == 2  # removed cards still count for the board
+
+
+def _new_process(monkeypatch):
+    """A fresh EventLog, as another NeoAnki process would have."""
+    monkeypatch.setattr(NeoAnki, "_event_log", NeoAnki.EventLog())
+    return NeoAnki._event_log
+
+
+def test_queries_read_the_side_index_not_the_log(monkeypatch):
+    NeoAnki._event_log.record("pl", "reveal", ("a", ""), ts=1)
+    NeoAnki._event_log.sync()
+    _new_process(monkeypatch)
+    monkeypatch.setattr(NeoAnki._EventTotals, "apply", lambda *a: pytest.fail("log was replayed"))
+    assert NeoAnki.card_stats()[0].reviews == 1
+
+
+def test_totals_stay_in_memory_between_flushes(monkeypatch):
+    log = NeoAnki._event_log
+    log.record("pl", "reveal", ("a", ""), ts=1)
+    log.flush()
+    monkeypatch.setattr(NeoAnki, "_read_event_totals", lambda: pytest.fail("index re-read"))
+    writes = []
+    monkeypatch.setattr(NeoAnki, "_atomic_write", lambda *a, **k: writes.append(a))
+    for ts in range(2, 200):
+        log.record("pl", "reveal", ("a", ""), ts=ts)
+    log.flush()
+    assert writes == [] and NeoAnki.card_stats()[0].reviews == 199
+
+
+def test_lines_past_the_index_are_replayed_once(monkeypatch):
+    NeoAnki._event_log.record("pl", "reveal", ("a", ""), ts=1)
+    NeoAnki._event_log.sync()
+    with open(NeoAnki.EVENTS_PATH, "a", encoding="utf-8") as f:  # another process, not synced yet
+        f.write('[2,"mark","pl","a",""]\n[3,"reveal","pl","a"')
+    assert NeoAnki.card_stats()[0][3:5] == (1, 1)
+    NeoAnki._event_log.save_index()
+    with open(NeoAnki.EVENTS_STATS_PATH, encoding="utf-8") as f:
+        assert json.load(f)["offset"] == os.path.getsize(NeoAnki.EVENTS_PATH)
+    NeoAnki._event_log.record("pl", "reveal", ("a", ""), ts=4)
+    assert NeoAnki.card_stats()[0][3:6] == (2, 1, 4)
+    assert _lines(NeoAnki.EVENTS_PATH)[-1] == [4, "reveal", "pl", "a", ""]
+    assert _new_process(monkeypatch).totals().cards == NeoAnki.EventLog().totals().cards
+
+
+def test_missing_index_is_rebuilt_from_the_log(monkeypatch):
+    NeoAnki._event_log.record("pl", "mark", ("a", ""), ts=1)
+    NeoAnki._event_log.sync()
+    os.unlink(NeoAnki.EVENTS_STATS_PATH)
+    _new_process(monkeypatch)
+    assert NeoAnki.board_stats()["pl"].misses == 1
+
+
+def test_empty_flush_does_not_take_the_storage_lock(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "_STORAGE_LOCK", None)  # entering it would fail
+    NeoAnki._event_log.sync()
+
+
+def test_import_creates_no_lock_file(tmp_path):
+    repo = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    path = str(tmp_path / "neoanki_backup.json")
+    code = f"import sys; sys.path.insert(0, {repo!r}); import NeoAnki; NeoAnki.BACKUP_PATH = {path!r}"
+    subprocess.run([sys.executable, "-c", code], check=True)  # the atexit handlers run too
+    assert not os.path.exists(path + ".lock")
+
+
+def test_shuffle_session_logs_events(monkeypatch):
+    NeoAnki.save_board("pl", [("a", "1"), ("b", "2")], [])
+    answers = iter([
+        "Load table from backup", "pl", "Shuffle",
+        "Show next translation", "Mark last as to repeat", "Show next translation", "Back to menu", "Exit",
+    ])
+    monkeypatch.setattr(NeoAnki, "clearScreen", lambda: None)
+    monkeypatch.setattr(NeoAnki, "_screen", NeoAnki.Screen())
+    monkeypatch.setattr(NeoAnki, "getShuffledTable", lambda t: t)
+    monkeypatch.setattr(NeoAnki.questionary, "select", lambda *a, **k: type("Q", (), {"ask": lambda _: next(answers)})())
+    NeoAnki.main()
+    assert [e[1:] for e in _lines(NeoAnki.EVENTS_PATH)] == [
+        ["reveal", "pl", "a", "1"], ["mark", "pl", "a", "1"], ["reveal", "pl", "b", "2"],
+    ]
+    assert [(s.word, s.misses) for s in NeoAnki.card_stats("pl")] == [("a", 1), ("b", 0)]
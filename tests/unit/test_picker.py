@@ -0,0 +1,74 @@
+"""Unit tests for the paged, filtered pickers (pick_one / pick_many)."""
+import NeoAnki
+
+
+def _prompt(answers, seen=None):
+    """Fake questionary prompt: records the choices it was given and returns the next answer."""
+    it = iter(answers)
+
+    def prompt(message, choices=None, **k):
+        if seen is not None:
+            seen.append((message, choices))
+
+        class Q:
+            def ask(_):
+                return next(it, None)
+        return Q()
+    return prompt
+
+
+def _page_size(monkeypatch, rows):
+    monkeypatch.setenv("LINES", str(rows + NeoAnki.PICKER_RESERVED_LINES))
+
+
+def test_pick_one_single_page_has_no_navigation(monkeypatch):
+    seen = []
+    monkeypatch.setattr(NeoAnki.questionary, "select", _prompt([("key", "b")], seen))
+    assert NeoAnki.pick_one("Pick", ["a", "b"], str.upper) == "b"
+    (message, choices), = seen
+    assert message == "Pick"
+    assert [c.title for c in choices] == ["A", "B", "Cancel"]
+
+
+def test_pick_one_builds_only_visible_page(monkeypatch):
+    _page_size(monkeypatch, 5)
+    labelled = []
+    seen = []
+    monkeypatch.setattr(NeoAnki.questionary, "select", _prompt([("nav", NeoAnki.Picker.NEXT), ("key", 7)], seen))
+    result = NeoAnki.pick_one("Pick", range(100_000), lambda i: labelled.append(i) or f"row {i}")
+    assert result == 7
+    assert labelled == [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+    assert seen[0][0] == "Pick (page 1/20000)"
+    assert [c.title for c in seen[1][1]][-4:] == [NeoAnki.Picker.NEXT, NeoAnki.Picker.PREVIOUS, NeoAnki.Picker.FILTER, "Cancel"]
+
+
+def test_pick_one_filter_narrows_matches(monkeypatch):
+    _page_size(monkeypatch, 5)
+    seen = []
+    nav = ("nav", NeoAnki.Picker.FILTER)
+    monkeypatch.setattr(NeoAnki.questionary, "select", _prompt([nav, nav, None], seen))
+    texts = iter(["WORD1", "word12"])
+    monkeypatch.setattr(NeoAnki.questionary, "text", lambda *a, **k: type("Q", (), {"ask": lambda _: next(texts)})())
+    keys = [f"word{i}" for i in range(200)]
+    assert NeoAnki.pick_one("Pick", keys, str) is None
+    assert seen[1][0] == "Pick (page 1/23, 111 matching 'word1')"
+    assert [c.title for c in seen[2][1]][:2] == ["word12", "word120"]
+    assert seen[2][0] == "Pick (page 1/3, 11 matching 'word12')"
+
+
+def test_pick_many_tracks_changes_across_pages(monkeypatch):
+    _page_size(monkeypatch, 5)
+    seen = []
+    monkeypatch.setattr(NeoAnki.questionary, "checkbox", _prompt([[1, 3], [6]], seen))
+    monkeypatch.setattr(NeoAnki.questionary, "select", _prompt([NeoAnki.Picker.NEXT, "Done"]))
+    changes = NeoAnki.pick_many("Mark", range(12), str, lambda i: i in (0, 1, 5))
+    assert [c.checked for c in seen[0][1]] == [True, True, False, False, False]
+    assert [c.checked for c in seen[1][1]] == [True, False, False, False, False]
+    assert changes == {0: False, 1: True, 2: False, 3: True, 4: False, 5: False, 6: True, 7: False, 8: False, 9: False}
+
+
+def test_pick_many_cancel(monkeypatch):
+    _page_size(monkeypatch, 5)
+    monkeypatch.setattr(NeoAnki.questionary, "checkbox", _prompt([[1]]))
+    monkeypatch.setattr(NeoAnki.questionary, "select", _prompt(["Cancel"]))
+    assert NeoAnki.pick_many("Mark", range(12), str) is None
@@ -0,0 +1,62 @@
+"""Unit tests for SaveWorker (debounced background saves)."""
+import threading
+
+import pytest
+
+import NeoAnki
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "SAVE_DEBOUNCE_SECONDS", 60)
+    w = NeoAnki.SaveWorker()
+    yield w
+    w.flush()
+
+
+def test_burst_is_coalesced_into_one_write(monkeypatch, worker):
+    calls = []
+    monkeypatch.setattr(NeoAnki, "save_board", lambda name, table, rep: calls.append((name, table, rep)))
+    for i in range(1, 6):
+        worker.submit("a", [("x", "")] * i, [])
+    worker.flush()
+    assert calls == [("a", [("x", "")] * 5, [])]
+
+
+def test_flush_persists_each_board(worker):
+    NeoAnki.save_backup({"a": [("x", "")], "b": [("y", "")]}, {})
+    worker.submit("a", [("x", ""), ("z", "")], [("z", "")])
+    worker.submit("b", [], [])
+    worker.flush()
+    tables, to_repeat, _ = NeoAnki.load_backup()
+    assert tables == {"a": [("x", ""), ("z", "")], "b": []}
+    assert to_repeat["a"] == [("z", "")]
+
+
+def test_submit_snapshots_table(monkeypatch, worker):
+    calls = []
+    monkeypatch.setattr(NeoAnki, "save_board", lambda name, table, rep: calls.append(table))
+    table = [("a", "")]
+    worker.submit("t", table, [])
+    table.append(("b", ""))
+    worker.flush()
+    assert calls == [[("a", "")]]
+
+
+def test_write_happens_after_debounce_without_flush(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "SAVE_DEBOUNCE_SECONDS", 0.01)
+    done = threading.Event()
+    monkeypatch.setattr(NeoAnki, "save_board", lambda *a: done.set())
+    w = NeoAnki.SaveWorker()
+    w.submit("a", [], [])
+    assert done.wait(5)
+
+
+def test_write_errors_are_reported(monkeypatch, worker):
+    def fail(*a):
+        raise OSError("disk full")
+    monkeypatch.setattr(NeoAnki, "save_board", fail)
+    worker.submit("a", [], [])
+    worker.flush()
+    assert worker.take_errors() == ["a: disk full"]
+    assert worker.take_errors() == []
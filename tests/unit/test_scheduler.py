@@ -0,0 +1,119 @@
+"""Unit tests for SM-2 review scheduling: review_card, ReviewQueue, persistence and review_session."""
+import json
+import sqlite3
+
+import pytest
+
+import NeoAnki
+
+DAY = 86400
+
+
+def test_review_card_follows_sm2():
+    s = NeoAnki.review_card(None, 4, 1000.0)
+    assert s == NeoAnki.CardSchedule(2.5, 1.0, 1000.0 + DAY, 1, 0)
+    s = NeoAnki.review_card(s, 5, 2000.0)
+    assert (s.interval, s.due, s.reps) == (6.0, 2000.0 + 6 * DAY, 2)
+    assert s.ease == pytest.approx(2.6)
+    s = NeoAnki.review_card(s, 3, 3000.0)
+    assert s.interval == pytest.approx(15.6)
+    assert s.ease == pytest.approx(2.46)
+
+
+def test_failed_card_starts_over_and_keeps_ease():
+    s = NeoAnki.CardSchedule(1.35, 30.0, 0.0, 5, 1)
+    failed = NeoAnki.review_card(s, 1, 1000.0)
+    assert failed == NeoAnki.CardSchedule(1.35, 0.0, 1000.0 + NeoAnki.REVIEW_RELEARN_SECONDS, 0, 2)
+    assert NeoAnki.review_card(failed, 3, 2000.0).ease == 1.3  # floor
+
+
+def test_schedules_follow_cards_through_shuffle_copy_and_delete():
+    cards = NeoAnki.CardStore([(str(i), "") for i in range(20)])
+    s = NeoAnki.CardSchedule(due=5.0)
+    cards.set_schedule(3, s)
+    cards.shuffle()
+    assert [cards[i] for i, _ in cards.schedules()] == [("3", "")]
+    copy = cards.copy()
+    assert copy == cards
+    copy.set_schedule(0, NeoAnki.CardSchedule())
+    assert copy != cards  # rows equal, schedules differ
+    del cards[cards.index(("3", ""))]
+    assert cards.schedules() == [] and cards._sched == {}
+
+
+def test_queue_holds_only_due_cards_in_due_order():
+    cards = NeoAnki.CardStore([(str(i), "") for i in range(6)])
+    cards.set_schedule(0, NeoAnki.CardSchedule(due=300.0))
+    cards.set_schedule(1, NeoAnki.CardSchedule(due=100.0))
+    cards.set_schedule(2, NeoAnki.CardSchedule(due=900.0))  # not due yet
+    queue = NeoAnki.ReviewQueue(cards, now=500.0, new_limit=2)
+    assert len(queue) == 4
+    assert [queue.pop() for _ in range(4)] == [3, 4, 1, 0]
+    queue.push(2, 1.0)
+    assert queue.pop() == 2
+    assert not queue
+
+
+def test_schedules_persist_in_every_backend(backend):
+    cards = NeoAnki.CardStore([("a", "1"), ("b", "2"), ("c", "")])
+    cards.set_schedule(1, NeoAnki.CardSchedule(2.36, 6.0, 1234.5, 2, 1))
+    NeoAnki.save_board("pl", cards, [("a", "1")])
+    NeoAnki.save_backup({"pl": cards, "de": [("x", "")]}, {"pl": [("a", "1")]})
+    NeoAnki._backup_store.invalidate()
+    table, to_repeat = NeoAnki.load_board("pl")
+    assert table.schedules() == [(1, NeoAnki.CardSchedule(2.36, 6.0, 1234.5, 2, 1))]
+    assert table.schedule(0) is None
+    assert to_repeat == [("a", "1")]
+    assert NeoAnki.load_board("de")[0].schedules() == []
+
+
+def test_json_payload_omits_schedule_until_reviewed(backup_path):
+    NeoAnki.save_backup({"a": [("x", "")]}, {})
+    assert json.loads(backup_path.read_text()) == {"a": {"table": [["x", ""]], "to_repeat": []}}
+    cards = NeoAnki.CardStore([("x", ""), ("y", "")])
+    cards.set_schedule(1, NeoAnki.CardSchedule(2.5, 1.0, 10.0, 1, 0))
+    NeoAnki.save_backup({"a": cards}, {})
+    assert json.loads(backup_path.read_text())["a"]["schedule"] == [[1, 2.5, 1.0, 10.0, 1, 0]]
+
+
+def test_malformed_schedule_entries_are_skipped():
+    table, _ = NeoAnki._parse_board_payload({
+        "table": [["x", ""], ["y", ""]],
+        "schedule": [[0, 2.5, 1, 10, 1, 0], [5, 2.5, 1, 10, 1, 0], [1, "2.5", 1, 10, 1, 0], "junk"],
+    })
+    assert table.schedules() == [(0, NeoAnki.CardSchedule(2.5, 1.0, 10.0, 1, 0))]
+
+
+def test_sqlite_v2_database_gains_schedule_columns(monkeypatch, tmp_path):
+    monkeypatch.setattr(NeoAnki, "BACKUP_BACKEND", "sqlite")
+    conn = sqlite3.connect(NeoAnki.BACKUP_DB_PATH)
+    conn.executescript(
+        "CREATE TABLE boards (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, rows_count INTEGER NOT NULL DEFAULT 0,"
+        " repeat_count INTEGER NOT NULL DEFAULT 0, modified REAL NOT NULL DEFAULT 0, preview TEXT NOT NULL DEFAULT '');"
+        "CREATE TABLE rows (board_id INTEGER NOT NULL, pos INTEGER NOT NULL, word TEXT NOT NULL, trans TEXT NOT NULL,"
+        " to_repeat INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (board_id, pos)) WITHOUT ROWID;"
+        "INSERT INTO boards(id, name, rows_count) VALUES (1, 'pl', 1);"
+        "INSERT INTO rows VALUES (1, 0, 'ona', 'she', 0);"
+        "PRAGMA user_version = 2;"
+    )
+    conn.close()
+    table, _ = NeoAnki.load_board("pl")
+    assert table == [("ona", "she")] and table.schedules() == []
+    table.set_schedule(0, NeoAnki.CardSchedule(due=7.0))
+    NeoAnki.save_board("pl", table, [])
+    assert NeoAnki.load_board("pl")[0].schedule(0) == NeoAnki.CardSchedule(due=7.0)
+
+
+def test_review_session_grades_due_cards_and_requeues_failures(monkeypatch):
+    cards = NeoAnki.CardStore([("a", "1"), ("b", "2")])
+    cards.set_schedule(1, NeoAnki.CardSchedule(due=10 ** 12))  # not due
+    answers = iter(["Show translation", "Again", "Show translation", "Good"])
+    monkeypatch.setattr(NeoAnki, "_screen", NeoAnki.Screen())
+    monkeypatch.setattr("builtins.input", lambda _: None)
+    monkeypatch.setattr(NeoAnki.questionary, "select", lambda *a, **k: type("Q", (), {"ask": lambda _: next(answers)})())
+    saves = []
+    assert NeoAnki.review_session(cards, lambda: saves.append(1)) == 2
+    assert len(saves) == 2
+    s = cards.schedule(0)
+    assert (s.reps, s.lapses, s.interval) == (1, 1, 1.0)
+    assert cards.schedule(1).due == 10 ** 12
@@ -0,0 +1,67 @@
+"""Unit tests for Screen (frame-diffing terminal output) and clearScreen."""
+import pytest
+
+import NeoAnki
+
+
+@pytest.fixture
+def ansi(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "_ansi_terminal", lambda: True)
+    monkeypatch.setenv("LINES", "40")
+    monkeypatch.setenv("COLUMNS", "80")
+
+
+def test_first_frame_clears_and_writes_everything(ansi, capsys):
+    screen = NeoAnki.Screen()
+    screen.draw("a\nb")
+    assert capsys.readouterr().out == NeoAnki._CLEAR + "a\nb\n"
+
+
+def test_next_frame_rewrites_only_changed_lines(ansi, capsys):
+    screen = NeoAnki.Screen()
+    screen.draw("a\nb\nc")
+    capsys.readouterr()
+    screen.draw("a\nB\nc\nd")
+    assert capsys.readouterr().out == "\033[2;1HB\033[K\033[4;1Hd\033[K\033[5;1H\033[J"
+
+
+def test_paged_table_frame_is_diffed(ansi, capsys):
+    table = [(f"w{i}", f"t{i}") for i in range(100)]
+    view = NeoAnki.TableViewport()
+    screen = NeoAnki.Screen()
+    screen.draw(view.render(table, 1))
+    capsys.readouterr()
+    screen.draw(view.render(table, 2))
+    out = capsys.readouterr().out
+    assert not out.startswith(NeoAnki._CLEAR)
+    assert out.count("\033[K") == 1 and "t1" in out
+
+
+def test_reset_or_oversized_frame_redraws_fully(ansi, capsys, monkeypatch):
+    screen = NeoAnki.Screen()
+    screen.draw("a")
+    screen.reset()
+    capsys.readouterr()
+    screen.draw("a")
+    assert capsys.readouterr().out.startswith(NeoAnki._CLEAR)
+    screen.draw("x" * 80)  # would wrap
+    assert capsys.readouterr().out.startswith(NeoAnki._CLEAR)
+    monkeypatch.setenv("COLUMNS", "20")
+    screen.draw("彼女 (かのじょ kanojo)")  # 16 characters, 22 columns
+    assert capsys.readouterr().out.startswith(NeoAnki._CLEAR)
+
+
+def test_plain_output_when_not_a_terminal(capsys):
+    screen = NeoAnki.Screen()
+    screen.draw("a\nb")
+    screen.draw("a\nc")
+    assert capsys.readouterr().out == "a\nb\na\nc\n"
+
+
+def test_clear_screen_uses_escape_sequence_not_a_process(ansi, capsys, monkeypatch):
+    monkeypatch.setattr(NeoAnki.os, "system", lambda cmd: pytest.fail(f"spawned {cmd!r}"))
+    NeoAnki._screen.draw("frame")
+    NeoAnki.clearScreen()
+    assert capsys.readouterr().out.endswith(NeoAnki._CLEAR)
+    NeoAnki._screen.draw("frame")
+    assert capsys.readouterr().out == NeoAnki._CLEAR + "frame\n"
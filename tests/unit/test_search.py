@@ -0,0 +1,74 @@
+"""Unit tests for the trigram search index (search_cards) and the Search menu entry."""
+from prompt_toolkit.document import Document
+
+import NeoAnki
+
+
+def _count_indexed(monkeypatch):
+    indexed = []
+    real = NeoAnki.SearchIndex._add
+    monkeypatch.setattr(NeoAnki.SearchIndex, "_add", lambda self, name, table: indexed.append(name) or real(self, name, table))
+    return indexed
+
+
+def test_search_words_and_translations_across_boards(backend):
+    NeoAnki.save_backup({"pl": [("ona", "Kanojo"), ("on", "kare")], "de": [("Sie", "kanojo-san")]}, {})
+    assert sorted(NeoAnki.search_cards("KANOJO")) == [("de", ("Sie", "kanojo-san")), ("pl", ("ona", "Kanojo"))]
+    assert NeoAnki.search_cards("on") == [("pl", ("ona", "Kanojo")), ("pl", ("on", "kare"))]
+    assert NeoAnki.search_cards("xyz") == []
+    assert NeoAnki.search_cards("  ") == []
+    assert len(NeoAnki.search_cards("a", limit=2)) == 2
+
+
+def test_index_updated_incrementally_on_saves(monkeypatch, backend):
+    big = [(f"z{i}", "") for i in range(20)]  # keeps retired ids below the rebuild threshold
+    NeoAnki.save_backup({"a": [("apple", "")], "b": [("banana", "")], "z": big}, {})
+    indexed = _count_indexed(monkeypatch)
+    assert NeoAnki.search_cards("apple") == [("a", ("apple", ""))]
+    assert sorted(indexed) == ["a", "b", "z"]
+    indexed.clear()
+    NeoAnki.save_board("a", [("apricot", "")], [])
+    NeoAnki.save_backup({"a": [("apricot", "")], "c": [("cherry", "")], "z": big}, {})
+    assert indexed == ["a", "c"]
+    assert NeoAnki.search_cards("apple") == []
+    assert NeoAnki.search_cards("apricot") == [("a", ("apricot", ""))]
+    assert NeoAnki.search_cards("banana") == []
+    NeoAnki.delete_boards(["c"])
+    assert NeoAnki.search_cards("cherry") == []
+
+
+def test_retired_ids_are_compacted():
+    NeoAnki.save_backup({"a": []}, {})
+    NeoAnki.search_cards("word")
+    for i in range(10):
+        NeoAnki.save_board("a", [(f"word{i}", ""), ("same", "")], [])
+    assert len(NeoAnki._search_index._docs) < 10
+    assert NeoAnki.search_cards("word9") == [("a", ("word9", ""))]
+    assert NeoAnki.search_cards("word1") == []
+
+
+def test_index_rebuilt_after_outside_change(backup_path):
+    NeoAnki.save_backup({"a": [("apple", "")]}, {})
+    assert NeoAnki.search_cards("apple")
+    NeoAnki._atomic_write(str(backup_path), lambda f: f.write('{"a": {"table": [["pear", ""]], "to_repeat": []}}'))
+    assert NeoAnki.search_cards("apple") == []
+    assert NeoAnki.search_cards("pear") == [("a", ("pear", ""))]
+
+
+def test_completer_yields_hits_while_typing():
+    NeoAnki.save_backup({"pl": [("ona", "kanojo")]}, {})
+    completions = list(NeoAnki._search_completer().get_completions(Document("kano"), None))
+    assert [c.text for c in completions] == ["ona"]
+    assert completions[0].start_position == -4
+
+
+def test_backup_submenu_search_prints_hits(capsys, monkeypatch):
+    NeoAnki.save_backup({"pl": [("ona", "kanojo")], "en": [("she", "")]}, {})
+    monkeypatch.setattr(NeoAnki, "clearScreen", lambda: None)
+    monkeypatch.setattr("builtins.input", lambda _: None)
+    monkeypatch.setattr(NeoAnki.questionary, "select", lambda *a, **k: type("Q", (), {"ask": lambda _: "Search"})())
+    monkeypatch.setattr(NeoAnki.questionary, "autocomplete", lambda *a, **k: type("Q", (), {"ask": lambda _: "kano"})())
+    NeoAnki.backup_submenu([], None, {})
+    out = capsys.readouterr().out
+    assert "pl" in out and "ona: kanojo" in out
+    assert "she" not in out
@@ -0,0 +1,27 @@
+"""Startup: heavy modules are imported on first use, not by `import NeoAnki`."""
+import os
+import subprocess
+import sys
+
+import NeoAnki
+
+DEFERRED = ("questionary", "prompt_toolkit", "argparse", "sqlite3", "subprocess", "tempfile", "datetime", "hashlib")
+
+
+def test_import_defers_heavy_modules():
+    code = (
+        "import sys, NeoAnki; "
+        f"print(sorted(m for m in sys.modules if m.split('.')[0] in {DEFERRED!r}))"
+    )
+    repo = os.path.dirname(os.path.abspath(NeoAnki.__file__))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=repo).stdout
+    assert out.strip() == "[]"
+
+
+def test_lazy_module_imports_on_first_use_and_forwards_assignment(monkeypatch):
+    proxy = NeoAnki._LazyModule("colorsys")
+    assert proxy.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    import colorsys
+    monkeypatch.setattr(proxy, "ONE_THIRD", 0.5)
+    assert colorsys.ONE_THIRD == 0.5
+    assert NeoAnki._LazyModule("datetime", "datetime").fromtimestamp(0).year in (1969, 1970)
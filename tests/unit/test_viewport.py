@@ -0,0 +1,65 @@
+"""Unit tests for TableViewport (windowed review table)."""
+import NeoAnki
+
+
+def _rows(n):
+    return [(f"w{i}", f"t{i}") for i in range(n)]
+
+
+def _page_size(monkeypatch, rows):
+    monkeypatch.setenv("LINES", str(rows + NeoAnki.VIEWPORT_RESERVED_LINES))
+
+
+def test_small_table_renders_like_full_display(monkeypatch):
+    _page_size(monkeypatch, 10)
+    table = _rows(4)
+    view = NeoAnki.TableViewport()
+    assert not view.paged(len(table))
+    assert view.render(table, 2, {("w3", "t3")}) == NeoAnki._table_display_with_revealed(table, 2, {("w3", "t3")})
+
+
+def test_large_table_renders_only_window_around_reveal(monkeypatch):
+    _page_size(monkeypatch, 10)
+    table = _rows(5000)
+    view = NeoAnki.TableViewport()
+    out = view.render(table, 2000)
+    lines = [ln for ln in out.splitlines() if ". " in ln]
+    assert len(lines) == 10
+    assert "1996. w1995 (t1995)" in out and "2000. w1999 (t1999)" in out
+    assert "2001. w2000\n" in out
+    assert "Rows 1996-2005 of 5000" in out
+
+
+def test_scroll_pages_and_follow_returns(monkeypatch):
+    _page_size(monkeypatch, 10)
+    table = _rows(25)
+    view = NeoAnki.TableViewport()
+    assert view.window(25, 0) == (0, 10)
+    view.scroll(1, 25, 0)
+    assert view.window(25, 0) == (10, 20)
+    view.scroll(5, 25, 0)
+    assert view.window(25, 0) == (15, 25)
+    view.scroll(-9, 25, 0)
+    assert view.window(25, 0) == (0, 10)
+    view.scroll(1, 25, 0)
+    view.follow()
+    assert view.window(25, 0) == (0, 10)
+    assert "Rows 1-10 of 25" in view.render(table, 0)
+
+
+def test_cached_lines_rebuilt_only_for_changed_rows(monkeypatch):
+    _page_size(monkeypatch, 10)
+    calls = []
+    real = NeoAnki._revealed_line
+    monkeypatch.setattr(NeoAnki, "_revealed_line", lambda *a: calls.append(a[0]) or real(*a))
+    table = _rows(100)
+    view = NeoAnki.TableViewport()
+    view.render(table, 0)
+    assert calls == list(range(10))
+    calls.clear()
+    view.render(table, 1)
+    assert calls == [0]
+    calls.clear()
+    table[3] = ("new", "")
+    view.render(table, 1, {("w5", "t5")})
+    assert calls == [3, 5]
@@ -0,0 +1,86 @@
+"""Unit tests for WeightedSampler (Fenwick tree) and the weighted shuffle."""
+import random
+
+import pytest
+
+import NeoAnki
+
+
+def _counted(sampler):
+    """Counted weight per position, read back from the tree."""
+    return [sampler._prefix(i + 1) - sampler._prefix(i) for i in range(len(sampler))]
+
+
+def test_draws_are_a_permutation_and_swap_weights():
+    sampler = NeoAnki.WeightedSampler([1, 2, 3, 4, 5])
+    order = list(range(5))
+    rng = random.Random(1)
+    for k in range(5):
+        j = sampler.draw(rng)
+        assert j >= k
+        order[k], order[j] = order[j], order[k]
+    assert sorted(order) == [0, 1, 2, 3, 4]
+    assert [sampler.weight(i) for i in range(5)] == [order[i] + 1 for i in range(5)]
+    assert _counted(sampler) == [0] * 5
+    with pytest.raises(IndexError):
+        sampler.draw(rng)
+    sampler.reset()
+    assert _counted(sampler) == [order[i] + 1 for i in range(5)]
+
+
+def _first_drawn(sampler, rows, rng):
+    """Starts a pass and returns the row drawn first, applying the swap to `rows` like the table would."""
+    sampler.reset()
+    j = sampler.draw(rng)
+    rows[0], rows[j] = rows[j], rows[0]
+    return rows[0]
+
+
+def test_heavier_positions_come_first_more_often():
+    rng = random.Random(7)
+    rows = ["light", "heavy"]
+    sampler = NeoAnki.WeightedSampler([1.0, 9.0])
+    firsts = [_first_drawn(sampler, rows, rng) for _ in range(2000)]
+    assert 0.85 < firsts.count("heavy") / 2000 < 0.95
+
+
+def test_set_weight_and_append_update_the_tree_incrementally():
+    sampler = NeoAnki.WeightedSampler([1.0] * 6)
+    sampler.set_weight(2, 4.0)
+    sampler.append(2.0)
+    sampler.append(3.0)
+    assert _counted(sampler) == [1, 1, 4, 1, 1, 1, 2, 3]
+    sampler.draw(random.Random(0))
+    drawn = sampler.weight(0)
+    sampler.set_weight(0, drawn + 10)  # drawn: stays out of the tree until reset
+    assert _counted(sampler)[0] == 0
+    sampler.reset()
+    assert _counted(sampler)[0] == drawn + 10
+
+
+def test_zero_weight_positions_are_never_drawn():
+    rows = ["a", "b", "c"]
+    sampler = NeoAnki.WeightedSampler([0.0, 1.0, 0.0])
+    assert {_first_drawn(sampler, rows, random.Random(s)) for s in range(20)} == {"b"}
+
+
+def test_weighted_shuffle_keeps_card_ids_and_flags(monkeypatch):
+    monkeypatch.setattr(NeoAnki, "clearScreen", lambda: None)
+    cards = NeoAnki.CardStore([(str(i), "") for i in range(50)])
+    to_repeat = NeoAnki.RepeatSet(cards, [("7", "")])
+    sampler = NeoAnki.WeightedSampler(NeoAnki._draw_weight(cards, to_repeat, i) for i in range(len(cards)))
+    assert sampler.weight(7) == NeoAnki.DRAW_REPEAT_WEIGHT
+    ids = {cards.card_id(i): cards[i] for i in range(len(cards))}
+    NeoAnki.getWeightedShuffledTable(cards, sampler)
+    assert {cards.card_id(i): cards[i] for i in range(len(cards))} == ids
+    assert to_repeat.rows() == [("7", "")]
+    position = cards.index(("7", ""))
+    assert to_repeat.is_flagged(position) and sampler.weight(position) == NeoAnki.DRAW_REPEAT_WEIGHT
+
+
+def test_lapses_raise_the_weight():
+    cards = NeoAnki.CardStore([("a", ""), ("b", "")])
+    cards.set_schedule(1, NeoAnki.CardSchedule(lapses=99))
+    to_repeat = NeoAnki.RepeatSet(cards)
+    assert NeoAnki._draw_weight(cards, to_repeat, 0) == 1.0
+    assert NeoAnki._draw_weight(cards, to_repeat, 1) == 1.0 + NeoAnki.DRAW_LAPSE_WEIGHT * NeoAnki.DRAW_MAX_LAPSES